@@ -0,0 +1,167 @@
+"""
+In-process runner for side effects that must not hold up a response.
+
+Work that follows a successful write but whose failure is only logged
+(collection counters, repairs) is submitted here instead of awaited: a
+bounded queue feeds BACKGROUND_WORKERS worker tasks, a failed task is
+retried with exponential backoff up to its attempt limit, and shutdown
+drains the queue for up to BACKGROUND_DRAIN_SECONDS before the database
+clients close.
+
+Tasks may run more than once when a retry follows a failure the
+dependency did not report cleanly, so prefer idempotent work. When the
+queue is full the task is dropped and counted, never awaited inline:
+the queue bound is what keeps a slow dependency from turning into
+unbounded memory. Tasks live in this process only; anything that must
+survive a crash belongs in Mongo, not here.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import BACKGROUND_QUEUE_DEPTH, BACKGROUND_TASKS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackgroundTask:
+    name: str  # short, fixed label for logs and metrics; never a user or document ID
+    func: Callable[..., Awaitable[Any]]
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 3
+    attempt: int = 0
+
+
+class BackgroundTaskRunner:
+    """Bounded queue plus a fixed pool of worker tasks on the running loop"""
+
+    def __init__(self, workers: int = 4, max_queue: int = 1000, retry_delay: float = 0.5):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Dict[asyncio.Task, BackgroundTask] = {}
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        return (self._queue.qsize() if self._queue else 0) + len(self._retries)
+
+    def start(self) -> None:
+        """Start the workers on the running loop; called from the app lifespan"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        if self._queue is not None and self.pending:
+            # The previous loop is gone (only happens outside the app lifespan, e.g. scripts)
+            logger.warning("⚙️ BACKGROUND: Discarding %d tasks left on a closed event loop", self.pending)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._retries = {}
+        self._closing = False
+        self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.debug("⚙️ BACKGROUND: Started %d workers", self.workers)
+
+    def submit(self, name: str, func: Callable[..., Awaitable[Any]], *args, attempts: int = 3, **kwargs) -> bool:
+        """Queue `func(*args, **kwargs)`; returns False when the task was dropped"""
+        if self._closing:
+            logger.warning("⚙️ BACKGROUND: Dropped %s, runner is shutting down", name)
+            BACKGROUND_TASKS.labels(name, "dropped").inc()
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("⚙️ BACKGROUND: Dropped %s, no running event loop", name)
+            BACKGROUND_TASKS.labels(name, "dropped").inc()
+            return False
+        if self._loop is not loop or not self._tasks:
+            self.start()
+        return self._enqueue(BackgroundTask(name, func, args, kwargs, attempts=max(1, attempts)))
+
+    def _enqueue(self, task: BackgroundTask) -> bool:
+        try:
+            self._queue.put_nowait(task)
+        except asyncio.QueueFull:
+            logger.warning("⚙️ BACKGROUND: Queue full (%d), dropped %s", self.max_queue, task.name)
+            BACKGROUND_TASKS.labels(task.name, "dropped").inc()
+            return False
+        BACKGROUND_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def _retry_later(self, task: BackgroundTask, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            self._enqueue(task)
+        finally:
+            self._retries.pop(asyncio.current_task(), None)
+
+    async def _run(self, task: BackgroundTask) -> None:
+        task.attempt += 1
+        start = time.perf_counter()
+        try:
+            await task.func(*task.args, **task.kwargs)
+        except Exception as e:
+            if task.attempt < task.attempts and not self._closing:
+                delay = self.retry_delay * 2 ** (task.attempt - 1)
+                logger.warning(
+                    "⚙️ BACKGROUND: %s failed (attempt %d/%d), retrying in %.1fs: %s",
+                    task.name, task.attempt, task.attempts, delay, e,
+                )
+                BACKGROUND_TASKS.labels(task.name, "retried").inc()
+                retry = asyncio.get_running_loop().create_task(self._retry_later(task, delay))
+                self._retries[retry] = task
+            else:
+                logger.error("⚙️ BACKGROUND: %s failed after %d attempts: %s", task.name, task.attempt, e)
+                BACKGROUND_TASKS.labels(task.name, "failed").inc()
+            return
+        BACKGROUND_TASKS.labels(task.name, "success").inc()
+        logger.debug("⚙️ BACKGROUND: %s done in %.1fms", task.name, (time.perf_counter() - start) * 1000)
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            task = await self._queue.get()
+            BACKGROUND_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._run(task)
+            except Exception:
+                logger.exception("⚙️ BACKGROUND: Worker %d crashed running %s", number, task.name)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued tasks, then stop the workers; returns False on timeout"""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        timeout = settings.BACKGROUND_DRAIN_SECONDS if timeout is None else timeout
+        # Tasks waiting out a retry backoff get their last attempt now
+        for retry, task in list(self._retries.items()):
+            retry.cancel()
+            task.attempts = task.attempt + 1
+            self._enqueue(task)
+        self._retries.clear()
+        self._closing = True
+        drained = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            drained = False
+            logger.warning("⚙️ BACKGROUND: %d tasks left undone after %.1fs drain", self._queue.qsize(), timeout)
+        for worker in self._tasks:
+            worker.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        return drained
+
+
+background_tasks = BackgroundTaskRunner(
+    workers=settings.BACKGROUND_WORKERS,
+    max_queue=settings.BACKGROUND_QUEUE_SIZE,
+    retry_delay=settings.BACKGROUND_RETRY_DELAY,
+)
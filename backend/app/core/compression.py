@@ -0,0 +1,255 @@
+"""
+Negotiated response compression.
+
+gzip is always available; brotli and zstd are used when the optional
+`brotli` / `zstandard` packages are installed. Buffered responses below
+COMPRESSION_MIN_SIZE go out as they are. Streamed responses (NDJSON
+exports and the like) are compressed chunk by chunk, with a flush after
+every chunk so each record reaches the client as soon as it is produced.
+"""
+import asyncio
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+_PREFERENCE = ("zstd", "br", "gzip")
+
+# Content types whose chunks are flushed to the client as they are produced
+_STREAMING_TYPES = ("application/x-ndjson", "text/event-stream")
+
+# Bodies at least this large are compressed in a worker thread (the codecs
+# release the GIL) so a full-library response does not stall the event loop
+_THREAD_THRESHOLD = 256 * 1024
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_encodings() -> List[str]:
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: Optional[str], encodings: List[str]) -> Optional[str]:
+    """Highest q-value encoding we support, ties broken by server preference"""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in _PREFERENCE:
+        if coding not in encodings:
+            continue
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a uniform interface across codecs"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._obj = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "gzip":
+            out = self._obj.compress(data)
+            return out + self._obj.flush(zlib.Z_SYNC_FLUSH) if flush else out
+        if self.encoding == "br":
+            out = self._obj.process(data)
+            return out + self._obj.flush() if flush else out
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.flush(zlib.Z_FINISH)
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """One-shot compression of a complete body"""
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in _COMPRESSIBLE_TYPES)
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the best encoding the client
+    accepts. ETags on compressed responses are marked weak, as nginx does,
+    since the bytes differ from the identity representation; the app's
+    If-None-Match check uses weak comparison, so revalidation still works.
+
+    Other bodies are buffered to the end before compressing in one shot,
+    because the HTTP middleware re-chunks even fully rendered responses;
+    streaming content types skip the buffering and flush after every chunk.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope.get("headers") or [])
+        accept = request_headers.get(b"accept-encoding", b"").decode("latin-1")
+        encoding = choose_encoding(accept, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+        streaming = False
+        pending: List[bytes] = []
+        pending_size = 0
+
+        async def start_compressed(body: bytes, more_body: bool):
+            nonlocal compressor
+            compressor = _Compressor(encoding)
+            headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name.lower() != b"content-length"
+            ]
+            for i, (name, value) in enumerate(headers):
+                if name.lower() == b"etag" and not value.startswith(b"W/"):
+                    headers[i] = (name, b"W/" + value)
+            headers.append((b"content-encoding", encoding.encode()))
+            headers = _with_vary(headers)
+
+            if more_body:
+                start_message["headers"] = headers
+                await send(start_message)
+                chunk = compressor.compress(body, flush=streaming)
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                return
+
+            if len(body) >= _THREAD_THRESHOLD:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compressor.compress(body) + compressor.finish()
+            headers.append((b"content-length", str(len(compressed)).encode()))
+            start_message["headers"] = headers
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough, streaming, pending_size
+
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or b"content-encoding" in headers
+                    or not _is_compressible(content_type)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                    streaming = content_type.startswith(_STREAMING_TYPES)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                chunk = compressor.compress(body, flush=streaming and more_body)
+                if not more_body:
+                    chunk += compressor.finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+
+            pending.append(body)
+            pending_size += len(body)
+            if more_body and not streaming:
+                return
+
+            buffered = b"".join(pending)
+            pending.clear()
+            if not more_body and pending_size < self.minimum_size:
+                start_message["headers"] = _with_vary(list(start_message.get("headers", [])))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": buffered})
+                return
+
+            await start_compressed(buffered, more_body)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -15,6 +17,81 @@ class Settings(BaseSettings):
     MONGODB_COLLECTION_NOTES: str
     MONGODB_COLLECTION_MEMORIES: str
 
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # per-module overrides, e.g. "app.services=DEBUG,pymongo=WARNING"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # fraction of DEBUG records kept
+
+    # Bearer token the Prometheus scraper sends to /metrics; empty disables the endpoint
+    METRICS_TOKEN: str = ""
+
+    WEB_CONCURRENCY: int = 1  # worker processes; set it instead of --workers (uvicorn and gunicorn read it too) so the app knows
+
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URL: str = "memory://"  # use redis://host:6379/0 to share limits across workers
+    RATE_LIMIT_USER_BUDGET: str = "200/minute"  # tokens per caller, charged by route cost
+    RATE_LIMIT_MAX_ENTRIES: int = 100_000  # hard cap on buckets held by the in-process store
+
+    # Conditional requests
+    DATA_VERSION_STORAGE_URL: str = "memory://"  # per process: redis://... is required with several workers
+    DATA_VERSION_MAX_ENTRIES: int = 100_000  # users tracked by the in-process store
+
+    # Response compression (brotli / zstd need the optional brotli / zstandard packages)
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller buffered responses are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Embedding versions: name -> {"model", "dimension", optional "index" and "namespace"}.
+    # A version without "index" lives in PINECONE_INDEX; "namespace" defaults to the default namespace.
+    EMBEDDING_VERSIONS: Dict[str, Dict[str, Any]] = {"v1": {"model": "multilingual-e5-large", "dimension": 1024}}
+    EMBEDDING_ACTIVE_VERSION: str = "v1"  # searched and written; overridden at runtime by `python -m app.jobs.reindex activate`
+    EMBEDDING_STATE_TTL: float = 30.0  # seconds workers cache the runtime active/pending versions
+
+    # Re-index job (app/jobs/reindex.py)
+    REINDEX_BATCH_SIZE: int = 96  # texts per embed call (Pinecone inference limit)
+    REINDEX_TOKENS_PER_MINUTE: int = 200_000  # estimated embedding tokens the job may spend per minute
+
+    # Batch search
+    SEARCH_BATCH_MAX_QUERIES: int = 20  # queries accepted by /links/search/batch
+    SEARCH_BATCH_CONCURRENCY: int = 4  # Pinecone queries in flight per batch
+    SIMILAR_CACHE_SIZE: int = 5000  # /links/{doc_id}/similar results cached in memory
+    PINECONE_RECHECK_SECONDS: float = 30.0  # /links/search uses keyword search this long after Pinecone fails
+
+    # Near-duplicate saves (see Link.on_duplicate): similarity to an existing bookmark
+    # from which /links/save treats a save as a repeat; None skips the check
+    SAVE_DUPLICATE_THRESHOLD: Optional[float] = None
+
+    # Autocomplete
+    SUGGEST_MAX_USERS: int = 1000  # per-user prefix indexes kept in memory
+    SUGGEST_IDLE_SECONDS: int = 900  # drop an index after this long without lookups
+    SUGGEST_MAX_RESULTS: int = 20
+
+    # Dashboard facets (/stats/facets)
+    FACETS_MAX_USERS: int = 1000  # per-user facet results cached in memory
+    FACETS_SITE_LIMIT: int = 50  # most frequent sites returned
+
+    # Library export/import
+    EXPORT_FETCH_BATCH: int = 100  # vectors per Pinecone fetch while exporting
+    IMPORT_BATCH_SIZE: int = 100  # documents per insert_many and vector upsert while importing
+    IMPORT_MAX_BYTES: int = 100 * 1024 * 1024  # largest archive accepted by /library/import
+
+    # Background side effects (app/core/background.py)
+    BACKGROUND_WORKERS: int = 4
+    BACKGROUND_QUEUE_SIZE: int = 1000  # tasks beyond this are dropped and counted
+    BACKGROUND_RETRY_DELAY: float = 0.5  # first retry delay, doubled per attempt
+    BACKGROUND_DRAIN_SECONDS: float = 10.0  # shutdown wait for queued tasks
+
+    # Trash (app/services/trash_service.py, app/jobs/purge_trash.py)
+    TRASH_RETENTION_DAYS: int = 30  # trashed items can be restored this long, then they are purged
+    TRASH_PURGE_INTERVAL_SECONDS: float = 3600.0  # how often each worker purges expired trash; 0 disables
+    TRASH_PURGE_BATCH: int = 1000  # documents per purge batch (Pinecone deletes at most 1000 IDs per call)
+
+    # Startup
+    PREWARM_ON_STARTUP: bool = True  # open connections and warm Pinecone before serving
+    MONGODB_PREWARM_CONNECTIONS: int = 4  # pooled Mongo connections opened at startup
 
     class Config:
         env_file = ".env"
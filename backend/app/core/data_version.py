@@ -0,0 +1,238 @@
+"""
+Per-user data versions for HTTP conditional requests.
+
+Every write that changes what a user's read endpoints return (saving or
+deleting a bookmark or note) replaces the user's version with a fresh
+random token. Collection counters, updated in the background after a
+save, have a version of their own (see user_collections_service). Read endpoints derive a strong
+ETag from the version, so a client holding a matching ETag gets a 304
+without the endpoint touching Mongo.
+
+Versions are random rather than counters so a lost or evicted entry can
+never reproduce an ETag a client already holds; it only costs a refetch.
+The in-memory store is per process: another worker never sees a bump,
+so it would keep answering 304 to stale ETags. Running several workers
+(WEB_CONCURRENCY > 1) therefore requires DATA_VERSION_STORAGE_URL to be
+redis://..., and startup fails without it.
+"""
+import asyncio
+import logging
+import secrets
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses that carry a version ETag are per user and must be revalidated
+USER_CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def _new_version() -> str:
+    return secrets.token_hex(8)
+
+
+class DataVersionStore:
+    """Backend interface: current version per user"""
+
+    async def get(self, user_id: str) -> str:
+        raise NotImplementedError
+
+    async def bump(self, user_id: str) -> str:
+        raise NotImplementedError
+
+
+class MemoryVersionStore(DataVersionStore):
+    """In-process store, bounded by evicting the least recently used users"""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._versions: "OrderedDict[str, str]" = OrderedDict()
+
+    def _set(self, user_id: str, version: str) -> str:
+        self._versions[user_id] = version
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_entries:
+            self._versions.popitem(last=False)
+        return version
+
+    async def get(self, user_id: str) -> str:
+        version = self._versions.get(user_id)
+        if version is None:
+            return self._set(user_id, _new_version())
+        self._versions.move_to_end(user_id)
+        return version
+
+    async def bump(self, user_id: str) -> str:
+        return self._set(user_id, _new_version())
+
+
+class RedisVersionStore(DataVersionStore):
+    """Redis-backed store shared by every worker"""
+
+    def __init__(self, url: str, key_prefix: str = "hc:dv:", ttl: int = 30 * 86400, client=None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self._key_prefix = key_prefix
+        self._ttl = ttl
+
+    async def get(self, user_id: str) -> str:
+        key = self._key_prefix + user_id
+        version = await self._client.getex(key, ex=self._ttl)
+        if version is None:
+            await self._client.set(key, _new_version(), ex=self._ttl, nx=True)
+            version = await self._client.get(key)
+        return version.decode() if isinstance(version, bytes) else version
+
+    async def bump(self, user_id: str) -> str:
+        version = _new_version()
+        await self._client.set(self._key_prefix + user_id, version, ex=self._ttl)
+        return version
+
+
+def create_version_store(url: str, max_entries: int = 100_000, workers: int = 1) -> DataVersionStore:
+    """Build the store for a DATA_VERSION_STORAGE_URL, serving `workers` processes"""
+    if not url or url.startswith("memory://"):
+        if workers > 1:
+            raise ValueError(
+                f"DATA_VERSION_STORAGE_URL={url or 'memory://'} is per process and cannot serve "
+                f"{workers} workers; use redis://..."
+            )
+        return MemoryVersionStore(max_entries=max_entries)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisVersionStore(url)
+    raise ValueError(f"Unsupported data version storage URL: {url}")
+
+
+_store: Optional[DataVersionStore] = None
+
+
+def get_version_store() -> DataVersionStore:
+    global _store
+    if _store is None:
+        _store = create_version_store(
+            settings.DATA_VERSION_STORAGE_URL, settings.DATA_VERSION_MAX_ENTRIES, settings.WEB_CONCURRENCY
+        )
+    return _store
+
+
+def set_version_store(store: DataVersionStore) -> None:
+    global _store
+    _store = store
+
+
+async def get_data_version(user_id: str) -> Optional[str]:
+    """Current version for a user, or None when the store is unavailable"""
+    try:
+        return await get_version_store().get(user_id)
+    except Exception as e:
+        logger.warning("Data version lookup failed, skipping ETag: %s", e)
+        return None
+
+
+async def bump_data_version(user_id: str) -> Optional[str]:
+    """
+    Invalidate every ETag issued for a user. Call after the write has
+    completed, so a read racing the write can never get the new ETag
+    with the old data. Returns the new version, or None on failure.
+    """
+    try:
+        return await get_version_store().bump(user_id)
+    except Exception as e:
+        logger.error("Data version bump failed for user %s: %s", user_id, e)
+        return None
+
+
+def make_etag(resource: str, version: str) -> str:
+    return f'"{resource}-{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check using the weak comparison RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+async def user_etag(resource: str, user_id: str) -> Optional[str]:
+    """
+    ETag for a user-scoped resource. Read it before querying Mongo: if a
+    write lands in between, the ETag is older than the data and the next
+    request simply refetches.
+    """
+    version = await get_data_version(user_id)
+    return make_etag(resource, version) if version else None
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **(headers or USER_CACHE_HEADERS)})
+
+
+def cache_headers(etag: Optional[str]) -> dict:
+    """Headers for a full response carrying a version ETag"""
+    headers = dict(USER_CACHE_HEADERS)
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+
+class VersionedCache:
+    """
+    Results computed from a user's data, each stored with the data version
+    it was computed at: after the user's next write (which bumps the
+    version) every entry is stale without the cache hearing about the
+    write. Each worker holds its own entries; they go stale on every
+    worker only because several workers share a Redis version store.
+    Least recently used entries are evicted.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[str, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _cached(self, key: Hashable, version: Optional[str]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or version is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def get(self, key: Hashable, version: Optional[str], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """The value for `key` at `version`; without a version (store unavailable) nothing is cached"""
+        value = self._cached(key, version)
+        if value is not None:
+            return value
+
+        # One computation per key at a time; concurrent requests share it
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                value = self._cached(key, version)
+                if value is not None:
+                    return value
+                value = await compute()
+                if version is not None:
+                    self._entries[key] = (version, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                return value
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,20 +1,65 @@
-from app.core.config import settings
+import threading
+from typing import Dict, Optional
+
+from pymongo.collection import Collection
+from pymongo.database import Database
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
+from app.core.config import settings
+
+# Clients are created on first use (normally from the app lifespan) so that
+# importing the app never touches the network.
+_client: Optional[MongoClient] = None
+_collections: Dict[str, Collection] = {}
+_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    """Return the shared MongoClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = MongoClient(settings.MONGODB_URI, server_api=ServerApi('1'))
+    return _client
+
+
+def get_db() -> Database:
+    return get_client()[settings.MONGODB_DB]
+
+
+def get_collection(name: str) -> Collection:
+    """Return a cached handle to a collection of the configured database"""
+    collection = _collections.get(name)
+    if collection is None:
+        collection = _collections.setdefault(name, get_db()[name])
+    return collection
 
-uri = settings.MONGODB_URI
 
-# Create a new client and connect to the server
-client = MongoClient(uri, server_api=ServerApi('1'))
+def close_client() -> None:
+    """Close the shared client; the next get_client() creates a new one"""
+    global _client
+    with _lock:
+        client, _client = _client, None
+        _collections.clear()
+    if client is not None:
+        client.close()
 
-db = client[settings.MONGODB_DB]
 
-# Create a new collection
-collection = db[settings.MONGODB_COLLECTION_USER]
-collection_memories = db[settings.MONGODB_COLLECTION_MEMORIES]
-collection_notes = db[settings.MONGODB_COLLECTION_NOTES]
-collection_user_collections = db["user_collections"]
+# Collection names
+COLLECTION_USERS = settings.MONGODB_COLLECTION_USER
+COLLECTION_MEMORIES = settings.MONGODB_COLLECTION_MEMORIES
+COLLECTION_NOTES = settings.MONGODB_COLLECTION_NOTES
+COLLECTION_USER_COLLECTIONS = "user_collections"
+COLLECTION_EMBEDDING_STATE = "embedding_state"
 
+# Soft delete: trashed bookmarks and notes carry this field (see app/services/trash_service.py)
+DELETED_AT = "deleted_at"
+LIVE = {DELETED_AT: {"$exists": False}}
+TRASHED = {DELETED_AT: {"$exists": True}}
 
 
+def live(query: dict) -> dict:
+    """`query` restricted to documents that are not in the trash"""
+    return {**query, **LIVE}
@@ -1,10 +1,21 @@
+import asyncio
 import logging
 import time
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from functools import wraps
 from pymongo.errors import PyMongoError, ConnectionFailure, ServerSelectionTimeoutError
 from app.exceptions.global_exceptions import DatabaseConnectionError
-from app.core.database import client, db, collection, collection_memories, collection_notes, collection_user_collections
+from app.core.metrics import track_dependency, record_retry
+from app.core.database import (
+    get_client,
+    get_collection,
+    close_client,
+    COLLECTION_USERS,
+    COLLECTION_MEMORIES,
+    COLLECTION_NOTES,
+    COLLECTION_USER_COLLECTIONS,
+    COLLECTION_EMBEDDING_STATE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,24 +33,36 @@ class DatabaseWrapper:
         """Check if database connection is healthy"""
         try:
             # Simple ping to check connection
-            client.admin.command('ping')
+            get_client().admin.command('ping')
             self._connection_healthy = True
             return True
         except Exception as e:
-            logger.warning(f"Database connection check failed: {str(e)}")
+            logger.warning("Database connection check failed: %s", e)
             self._connection_healthy = False
             return False
     
-    def retry_on_connection_error(self, func):
-        """Decorator to retry database operations on connection errors"""
+    def retry_on_connection_error(self, func=None, *, target: str = "unknown"):
+        """
+        Decorator to retry database operations on connection errors.
+        Latency and retries are recorded per target collection and operation.
+        """
+        if func is None:
+            return lambda f: self.retry_on_connection_error(f, target=target)
+
+        operation = func.__name__.lstrip("_")
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            with track_dependency("mongodb", target, operation):
+                return await _attempt(*args, **kwargs)
+
+        async def _attempt(*args, **kwargs):
             last_exception = None
             
             for attempt in range(self.max_retries + 1):
                 try:
                     # Check connection before attempting operation
-                    if not self.check_connection():
+                    if not await asyncio.to_thread(self.check_connection):
                         raise DatabaseConnectionError("Database connection is not healthy")
                     
                     return await func(*args, **kwargs)
@@ -47,29 +70,30 @@ class DatabaseWrapper:
                 except (ConnectionFailure, ServerSelectionTimeoutError) as e:
                     last_exception = e
                     logger.warning(
-                        f"Database connection error on attempt {attempt + 1}/{self.max_retries + 1}: {str(e)}"
+                        "Database connection error on attempt %d/%d: %s", attempt + 1, self.max_retries + 1, e
                     )
                     
                     if attempt < self.max_retries:
                         wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                        logger.info(f"Retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
+                        logger.info("Retrying in %s seconds...", wait_time)
+                        record_retry("mongodb", target, operation)
+                        await asyncio.sleep(wait_time)
                     else:
-                        logger.error(f"All database retry attempts failed: {str(e)}")
+                        logger.error("All database retry attempts failed: %s", e)
                         raise DatabaseConnectionError(
                             "Database service is temporarily unavailable",
                             details={"attempts": self.max_retries + 1, "error": str(e)}
                         )
                         
                 except PyMongoError as e:
-                    logger.error(f"Database operation error: {str(e)}")
+                    logger.error("Database operation error: %s", e)
                     raise DatabaseConnectionError(
                         "Database operation failed",
                         details={"error": str(e), "operation": func.__name__}
                     )
                     
                 except Exception as e:
-                    logger.error(f"Unexpected error in database operation: {str(e)}")
+                    logger.error("Unexpected error in database operation: %s", e)
                     raise
             
             # This should never be reached, but just in case
@@ -91,76 +115,194 @@ db_wrapper = DatabaseWrapper()
 
 class SafeCollection:
     """
-    Safe collection wrapper that handles database errors gracefully
+    Safe collection wrapper that handles database errors gracefully.
+    The underlying collection is resolved on first use unless one is given.
+    pymongo is synchronous, so every call runs in a worker thread and
+    concurrent requests don't serialize on the event loop.
     """
     
-    def __init__(self, collection, wrapper: DatabaseWrapper):
-        self._collection = collection
+    def __init__(self, name: str, wrapper: DatabaseWrapper, collection=None):
+        self._name = name
         self._wrapper = wrapper
+        self._collection = collection
     
     @property
     def wrapper(self):
         return self._wrapper
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection(self._name)
+        return self._collection
     
     async def insert_one(self, document: Dict[str, Any], **kwargs):
         """Safely insert a document"""
-        @self._wrapper.retry_on_connection_error
-        async def _insert():
-            return self._collection.insert_one(document, **kwargs)
-        return await _insert()
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _insert_one():
+            return await asyncio.to_thread(self.collection.insert_one, document, **kwargs)
+        return await _insert_one()
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], **kwargs):
+        """Safely insert several documents in one round trip"""
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _insert_many():
+            return await asyncio.to_thread(self.collection.insert_many, documents, **kwargs)
+        return await _insert_many()
     
     async def find_one(self, filter_dict: Dict[str, Any] = None, **kwargs):
         """Safely find one document"""
-        @self._wrapper.retry_on_connection_error
+        @self._wrapper.retry_on_connection_error(target=self._name)
         async def _find_one():
-            return self._collection.find_one(filter_dict or {}, **kwargs)
+            return await asyncio.to_thread(self.collection.find_one, filter_dict or {}, **kwargs)
         return await _find_one()
     
     async def find(self, filter_dict: Dict[str, Any] = None, **kwargs):
         """Safely find documents"""
-        @self._wrapper.retry_on_connection_error
+        @self._wrapper.retry_on_connection_error(target=self._name)
         async def _find():
-            return list(self._collection.find(filter_dict or {}, **kwargs))
+            return await asyncio.to_thread(lambda: list(self.collection.find(filter_dict or {}, **kwargs)))
         return await _find()
     
     async def update_one(self, filter_dict: Dict[str, Any], update: Dict[str, Any], **kwargs):
         """Safely update one document"""
-        @self._wrapper.retry_on_connection_error
-        async def _update():
-            return self._collection.update_one(filter_dict, update, **kwargs)
-        return await _update()
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _update_one():
+            return await asyncio.to_thread(self.collection.update_one, filter_dict, update, **kwargs)
+        return await _update_one()
+    
+    async def update_many(self, filter_dict: Dict[str, Any], update: Dict[str, Any], **kwargs):
+        """Safely update all matching documents"""
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _update_many():
+            return await asyncio.to_thread(self.collection.update_many, filter_dict, update, **kwargs)
+        return await _update_many()
     
     async def delete_one(self, filter_dict: Dict[str, Any], **kwargs):
         """Safely delete one document"""
-        @self._wrapper.retry_on_connection_error
-        async def _delete():
-            return self._collection.delete_one(filter_dict, **kwargs)
-        return await _delete()
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _delete_one():
+            return await asyncio.to_thread(self.collection.delete_one, filter_dict, **kwargs)
+        return await _delete_one()
+    
+    async def delete_many(self, filter_dict: Dict[str, Any], **kwargs):
+        """Safely delete all matching documents"""
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _delete_many():
+            return await asyncio.to_thread(self.collection.delete_many, filter_dict, **kwargs)
+        return await _delete_many()
+    
+    async def create_index(self, keys, **kwargs):
+        """Safely create an index; a no-op when an identical one exists"""
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _create_index():
+            return await asyncio.to_thread(self.collection.create_index, keys, **kwargs)
+        return await _create_index()
+    
+    async def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs):
+        """Safely run an aggregation pipeline"""
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _aggregate():
+            return await asyncio.to_thread(lambda: list(self.collection.aggregate(pipeline, **kwargs)))
+        return await _aggregate()
     
     async def count_documents(self, filter_dict: Dict[str, Any] = None, **kwargs):
         """Safely count documents"""
-        @self._wrapper.retry_on_connection_error
-        async def _count():
-            return self._collection.count_documents(filter_dict or {}, **kwargs)
-        return await _count()
+        @self._wrapper.retry_on_connection_error(target=self._name)
+        async def _count_documents():
+            return await asyncio.to_thread(self.collection.count_documents, filter_dict or {}, **kwargs)
+        return await _count_documents()
 
 # Create safe collection wrappers
-safe_collection = SafeCollection(collection, db_wrapper)
-safe_collection_memories = SafeCollection(collection_memories, db_wrapper)
-safe_collection_notes = SafeCollection(collection_notes, db_wrapper)
-safe_collection_user_collections = SafeCollection(collection_user_collections, db_wrapper)
+safe_collection = SafeCollection(COLLECTION_USERS, db_wrapper)
+safe_collection_memories = SafeCollection(COLLECTION_MEMORIES, db_wrapper)
+safe_collection_notes = SafeCollection(COLLECTION_NOTES, db_wrapper)
+safe_collection_user_collections = SafeCollection(COLLECTION_USER_COLLECTIONS, db_wrapper)
+safe_collection_embedding_state = SafeCollection(COLLECTION_EMBEDDING_STATE, db_wrapper)
+
+
+async def prewarm_database(connections: int = 1) -> None:
+    """
+    Open `connections` pooled connections ahead of the first request.
+    Concurrent pings each check out their own socket from the pool.
+    """
+    client = await asyncio.to_thread(get_client)
+    await asyncio.gather(*(
+        asyncio.to_thread(client.admin.command, 'ping')
+        for _ in range(max(1, connections))
+    ))
+
+
+# Text index for keyword search (app/services/keyword_search_service.py).
+# A collection holds one text index; with the user_id prefix each search
+# reads one user's entries, so every $text query must match user_id exactly
+KEYWORD_INDEX = {
+    "keys": [("user_id", 1), ("title", "text"), ("site_name", "text"), ("note", "text")],
+    "weights": {"title": 5, "site_name": 2, "note": 1},
+    "name": "user_keywords",
+}
+
+# Indexes the queries in app/services rely on, per collection
+INDEXES = {
+    COLLECTION_MEMORIES: [
+        {"keys": [("user_id", 1), ("doc_id", 1)]},
+        # Only trashed documents carry deleted_at, so the purge scan stays small
+        {"keys": [("deleted_at", 1)], "sparse": True},
+        # Multikey: one entry per tag, for tag filters on listings
+        {"keys": [("user_id", 1), ("tags", 1)]},
+        # Date range filters on listings
+        {"keys": [("user_id", 1), ("ts", 1)]},
+        # Keyword search; title matches weigh most
+        KEYWORD_INDEX,
+    ],
+    COLLECTION_NOTES: [
+        {"keys": [("user_id", 1), ("doc_id", 1)]},
+        {"keys": [("deleted_at", 1)], "sparse": True},
+        {"keys": [("user_id", 1), ("tags", 1)]},
+        {"keys": [("user_id", 1), ("ts", 1)]},
+        KEYWORD_INDEX,
+    ],
+    # One counters document per user, even when first writes race
+    COLLECTION_USER_COLLECTIONS: [
+        {"keys": [("userId", 1)], "unique": True},
+    ],
+}
+
+
+async def ensure_indexes() -> None:
+    """Create missing indexes; run at startup, cheap when they all exist"""
+    collections = {
+        COLLECTION_MEMORIES: safe_collection_memories,
+        COLLECTION_NOTES: safe_collection_notes,
+        COLLECTION_USER_COLLECTIONS: safe_collection_user_collections,
+    }
+    await asyncio.gather(*(
+        collections[name].create_index(spec["keys"], **{k: v for k, v in spec.items() if k != "keys"})
+        for name, specs in INDEXES.items()
+        for spec in specs
+    ))
+
+
+def close_database() -> None:
+    """Close the Mongo client and drop cached collection handles"""
+    close_client()
+    for safe in (
+        safe_collection, safe_collection_memories, safe_collection_notes,
+        safe_collection_user_collections, safe_collection_embedding_state,
+    ):
+        safe._collection = None
 
 async def get_database_health() -> Dict[str, Any]:
     """Get database health status"""
     try:
-        is_healthy = db_wrapper.check_connection()
+        is_healthy = await asyncio.to_thread(db_wrapper.check_connection)
         return {
             "status": "healthy" if is_healthy else "unhealthy",
             "connection_healthy": is_healthy,
             "timestamp": time.time()
         }
     except Exception as e:
-        logger.error(f"Error checking database health: {str(e)}")
+        logger.error("Error checking database health: %s", e)
         return {
             "status": "error",
             "connection_healthy": False,
@@ -0,0 +1,299 @@
+"""
+Embedding versions: which model embeds documents and where the vectors live.
+
+A version names a model, its dimension, and the Pinecone index and
+namespace holding its vectors (EMBEDDING_VERSIONS). One version is active:
+search embeds queries with it and every write goes to it. While the
+re-index job (app/jobs/reindex.py) backfills another version, that version
+is pending and writes go to both, so it is complete when search switches.
+
+The active and pending versions are read from Mongo and cached for
+EMBEDDING_STATE_TTL seconds, so switching needs no restart; without a
+stored state the configured EMBEDDING_ACTIVE_VERSION is used.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.background import background_tasks
+from app.core.config import settings
+from app.core.database_wrapper import SafeCollection, safe_collection_embedding_state
+from app.core.pinecone_wrapper import SafePineconeIndex, get_safe_index, safe_pc
+from app.utils.collection_extractor import remove_collection_pattern_from_text
+
+logger = logging.getLogger(__name__)
+
+# Mongo field listing the versions a document has been embedded into
+EMBEDDED_VERSIONS = "embedded_versions"
+
+STATE_ID = "search"
+
+
+@dataclass(frozen=True)
+class EmbeddingVersion:
+    name: str
+    model: str
+    dimension: int
+    index: Optional[str] = None  # None: PINECONE_INDEX
+    namespace: Optional[str] = None  # None: the default namespace
+
+    @property
+    def safe_index(self) -> SafePineconeIndex:
+        return get_safe_index(self.index, self.dimension)
+
+
+def get_version(name: str) -> EmbeddingVersion:
+    config = settings.EMBEDDING_VERSIONS.get(name)
+    if config is None:
+        raise ValueError(f"Unknown embedding version '{name}'")
+    return EmbeddingVersion(
+        name=name,
+        model=config["model"],
+        dimension=int(config["dimension"]),
+        index=config.get("index") or None,
+        namespace=config.get("namespace") or None,
+    )
+
+
+def document_text(doc: Dict[str, Any]) -> str:
+    """Text embedded for a bookmark or note; the collection pattern is left out"""
+    note = doc.get("note")
+    clean_note = remove_collection_pattern_from_text(note) if note else note
+    if doc.get("type") == "Note":
+        return f"{doc.get('title')}, {clean_note}"
+    return f"{doc.get('title')}, {clean_note}, {doc.get('site_name')}"
+
+
+def vector_metadata(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Pinecone metadata for a stored document: Mongo-only fields, nulls and empty lists dropped"""
+    metadata = {
+        key: value for key, value in doc.items()
+        if key not in ("_id", EMBEDDED_VERSIONS) and value is not None and value != []
+    }
+    if doc.get("deleted_at"):
+        # Trashed documents stay out of search (see app/services/trash_service.py)
+        metadata["deleted"] = True
+    return metadata
+
+
+# Runtime state: (active, pending) version names and when they were read
+_state: Optional[Tuple[str, Optional[str]]] = None
+_state_loaded_at = 0.0
+
+
+async def load_state(force: bool = False) -> Tuple[str, Optional[str]]:
+    """Active and pending version names, cached for EMBEDDING_STATE_TTL"""
+    global _state, _state_loaded_at
+    now = time.monotonic()
+    if not force and _state is not None and now - _state_loaded_at < settings.EMBEDDING_STATE_TTL:
+        return _state
+    try:
+        doc = await safe_collection_embedding_state.find_one({"_id": STATE_ID})
+        active = (doc or {}).get("active") or settings.EMBEDDING_ACTIVE_VERSION
+        _state = (active, (doc or {}).get("pending") or None)
+    except Exception as e:
+        # Keep serving with the last known (or configured) versions
+        logger.warning("Embedding state lookup failed, using %s: %s", "cached state" if _state else "settings", e)
+        if _state is None:
+            _state = (settings.EMBEDDING_ACTIVE_VERSION, None)
+    _state_loaded_at = now
+    return _state
+
+
+async def save_state(active: str, pending: Optional[str]) -> None:
+    get_version(active)
+    if pending:
+        get_version(pending)
+    await safe_collection_embedding_state.update_one(
+        {"_id": STATE_ID},
+        {"$set": {"active": active, "pending": pending, "updated_at": time.time()}},
+        upsert=True
+    )
+    await load_state(force=True)
+
+
+async def search_version() -> EmbeddingVersion:
+    active, _ = await load_state()
+    return get_version(active)
+
+
+async def write_versions() -> List[EmbeddingVersion]:
+    """The active version first, then the pending one during a re-index"""
+    active, pending = await load_state()
+    versions = [get_version(active)]
+    if pending and pending != active:
+        versions.append(get_version(pending))
+    return versions
+
+
+async def embed_texts(version: EmbeddingVersion, texts: List[str], input_type: str) -> List[List[float]]:
+    embedding = await safe_pc.embed(
+        model=version.model,
+        inputs=texts,
+        parameters={"input_type": input_type, "truncate": "END"}
+    )
+    return [item['values'] for item in embedding]
+
+
+async def _for_write_versions(operation, description: str) -> Dict[str, Any]:
+    """
+    Run `operation(version)` for every write version concurrently and map
+    each version written to its result. A failure in the active version is
+    raised; one in the pending version is only logged, since the re-index
+    job catches that document up.
+    """
+    versions = await write_versions()
+    results = await asyncio.gather(*(operation(version) for version in versions), return_exceptions=True)
+    written = {}
+    for version, result in zip(versions, results):
+        if isinstance(result, BaseException):
+            if version is versions[0]:
+                raise result
+            logger.warning("Pending embedding version %s: %s failed: %s", version.name, description, result)
+        else:
+            written[version.name] = result
+    return written
+
+
+async def upsert_document(
+    doc_id: str,
+    metadata: Dict[str, Any],
+    embedded: Optional[Dict[str, List[float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Embed a document and upsert it into every write version; `embedded`
+    holds values already computed, by version name, which are not embedded again
+    """
+    text = document_text(metadata)
+    metadata = vector_metadata(metadata)
+    embedded = embedded or {}
+
+    async def upsert(version: EmbeddingVersion):
+        values = embedded.get(version.name)
+        if values is None:
+            values = (await embed_texts(version, [text], "passage"))[0]
+        return await version.safe_index.upsert(
+            vectors=[{"id": doc_id, "values": values, "metadata": metadata}],
+            namespace=version.namespace
+        )
+
+    return await _for_write_versions(upsert, f"upsert {doc_id}")
+
+
+async def update_document_metadata(doc_id: str, set_metadata: Dict[str, Any]) -> Dict[str, Any]:
+    async def update(version: EmbeddingVersion):
+        return await version.safe_index.update(id=doc_id, set_metadata=set_metadata, namespace=version.namespace)
+
+    return await _for_write_versions(update, f"metadata update {doc_id}")
+
+
+async def delete_vectors(ids: List[str]) -> Dict[str, Any]:
+    async def delete(version: EmbeddingVersion):
+        return await version.safe_index.delete(ids=ids, namespace=version.namespace)
+
+    return await _for_write_versions(delete, "delete by id")
+
+
+async def _compensate(description: str, operation: Callable[[], Awaitable[Any]]) -> None:
+    """Undo one half of a failed save now, or keep retrying it in the background"""
+    try:
+        await operation()
+        logger.info("↩️ SAVE: Rolled back %s", description)
+    except Exception as e:
+        logger.warning("↩️ SAVE: Rolling back %s failed, retrying in the background: %s", description, e)
+        background_tasks.submit("save_compensation", operation, attempts=5)
+
+
+async def store_document(
+    doc_id: str,
+    metadata: Dict[str, Any],
+    insert: Callable[[Dict[str, Any]], Awaitable[Any]],
+    collection: SafeCollection,
+    embedded: Optional[Dict[str, List[float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Embed and upsert a new document into every write version while
+    `insert` writes it to Mongo, concurrently, and return the upsert
+    results by version.
+
+    The two steps share nothing but the metadata, so neither waits for the
+    other. Both always run to completion, since cancelling a sibling cannot
+    stop a call already in a driver thread; if either fails, the one that
+    succeeded is undone (the vector deleted, or the document deleted from
+    `collection`) and the first error is raised, the upsert's before the
+    insert's. `embedded` is passed on to upsert_document.
+    """
+    versions = [version.name for version in await write_versions()]
+    upserted, inserted = await asyncio.gather(
+        upsert_document(doc_id, metadata, embedded),
+        insert({**metadata, EMBEDDED_VERSIONS: versions}),
+        return_exceptions=True,
+    )
+
+    upsert_failed = isinstance(upserted, BaseException)
+    insert_failed = isinstance(inserted, BaseException)
+    if upsert_failed or insert_failed:
+        if not upsert_failed:
+            await _compensate(f"vector {doc_id}", lambda: delete_vectors([doc_id]))
+        if not insert_failed:
+            await _compensate(f"document {doc_id}", lambda: collection.delete_one({"doc_id": doc_id}))
+        raise upserted if upsert_failed else inserted
+
+    if set(upserted) != set(versions):
+        # The pending version missed this write; leave it for the re-index job
+        await collection.update_one({"doc_id": doc_id}, {"$set": {EMBEDDED_VERSIONS: list(upserted)}})
+    return upserted
+
+
+def owns_document(user_id: str, doc_id: str) -> bool:
+    """Document IDs are "<user_id>-<timestamp>", so a vector ID's owner needs no lookup"""
+    return bool(user_id) and doc_id.startswith(f"{user_id}-")
+
+
+async def remove_document(doc_id: str, user_id: str, collection: SafeCollection) -> Dict[str, Any]:
+    """
+    Delete a user's document from every write version and from
+    `collection`, concurrently, by ID. The Mongo delete is scoped to the
+    user and doubles as the existence check: `deleted_count` is 0 when the
+    user has no such document (and nothing is touched for an ID that is
+    not theirs).
+
+    When only one side fails, the delete still counts as done and the
+    failed side is retried in the background; `repair` names it. When both
+    fail, the Pinecone error is raised.
+    """
+    if not owns_document(user_id, doc_id):
+        return {"deleted_count": 0, "repair": []}
+
+    vectors, stored = await asyncio.gather(
+        delete_vectors([doc_id]),
+        collection.delete_one({"doc_id": doc_id, "user_id": user_id}),
+        return_exceptions=True,
+    )
+    vector_failed = isinstance(vectors, BaseException)
+    stored_failed = isinstance(stored, BaseException)
+    if vector_failed and stored_failed:
+        raise vectors
+
+    repair = []
+    if vector_failed:
+        logger.warning("🗑️ DELETE: Vector delete for %s failed, repairing in the background: %s", doc_id, vectors)
+        background_tasks.submit("repair_vector_delete", delete_vectors, [doc_id], attempts=5)
+        repair.append("vector")
+    if stored_failed:
+        logger.warning("🗑️ DELETE: Mongo delete for %s failed, repairing in the background: %s", doc_id, stored)
+        background_tasks.submit(
+            "repair_document_delete", collection.delete_one, {"doc_id": doc_id, "user_id": user_id}, attempts=5
+        )
+        repair.append("database")
+    elif stored.deleted_count == 0:
+        return {"deleted_count": 0, "repair": repair}
+
+    return {
+        "vector_result": None if vector_failed else vectors,
+        # Unknown while the Mongo side is being repaired; the vector is gone either way
+        "deleted_count": None if stored_failed else stored.deleted_count,
+        "repair": repair,
+    }
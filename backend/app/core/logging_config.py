@@ -0,0 +1,152 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord carries; anything else on a record came from `extra=`
+_RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class lazy:
+    """
+    Defer an expensive log argument until the record is actually formatted.
+
+    Example:
+        logger.debug("Search results: %s", lazy(lambda: summarize(results)))
+    """
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+
+    def __str__(self) -> str:
+        return str(self._fn())
+
+    def __repr__(self) -> str:
+        return repr(self._fn())
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Render log records as single-line JSON objects.
+    Fields passed through `extra=` are emitted as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records so high-volume debug events
+    can stay enabled in production without flooding the pipeline.
+    Records at INFO and above always pass.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that hands the raw record to the listener thread.
+
+    The stock QueueHandler formats the message in the calling thread; here
+    formatting (and the lazy arguments) is left to the listener so the
+    event loop only pays for the enqueue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """
+    Parse a per-module level spec such as
+    "app.services.pinecone_service=DEBUG,pymongo=WARNING".
+    """
+    levels: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, _, level = item.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if name and level in logging._nameToLevel:
+            levels[name] = logging._nameToLevel[level]
+    return levels
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Configure the root logger with a queue-based handler.
+    Formatting and stream I/O run on a background listener thread.
+    Safe to call more than once; only the first call configures logging.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler()
+    if settings.LOG_FORMAT.lower() == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name, level in parse_module_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
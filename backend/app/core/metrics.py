@@ -0,0 +1,139 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# Buckets span fast Mongo reads (~ms) up to slow embed calls with retries (~s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label values below are all drawn from small fixed sets: route templates,
+# dependency operation names and status classes. Never add user or document IDs.
+REQUEST_LATENCY = Histogram(
+    "hippocampus_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DEPENDENCY_LATENCY = Histogram(
+    "hippocampus_dependency_call_duration_seconds",
+    "Latency of calls to external dependencies, including retries",
+    ["dependency", "target", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DEPENDENCY_RETRIES = Counter(
+    "hippocampus_dependency_retries_total",
+    "Retry attempts made by the dependency wrappers",
+    ["dependency", "target", "operation"],
+)
+
+RATE_LIMITER_ENTRIES = Gauge(
+    "hippocampus_rate_limiter_entries",
+    "Token buckets held by the in-process rate limiter store",
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMITER_MEMORY_BYTES = Gauge(
+    "hippocampus_rate_limiter_memory_bytes",
+    "Approximate memory used by the in-process rate limiter store",
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMITER_EVICTIONS = Counter(
+    "hippocampus_rate_limiter_evictions_total",
+    "Token buckets evicted from the in-process rate limiter store",
+    ["reason"],
+)
+
+
+BACKGROUND_TASKS = Counter(
+    "hippocampus_background_tasks_total",
+    "Background tasks by outcome: success, retried, failed or dropped",
+    ["task", "outcome"],
+)
+
+BACKGROUND_QUEUE_DEPTH = Gauge(
+    "hippocampus_background_queue_depth",
+    "Tasks waiting in the background runner queue",
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def track_dependency(dependency: str, target: str, operation: str) -> Iterator[None]:
+    """Time a dependency call and record it with its outcome"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        DEPENDENCY_LATENCY.labels(dependency, target, operation, outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+def record_retry(dependency: str, target: str, operation: str) -> None:
+    """Count one retry attempt for a dependency operation"""
+    DEPENDENCY_RETRIES.labels(dependency, target, operation).inc()
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+    Requests that never matched a route (404s, requests rejected by the
+    auth middleware) are grouped under "unmatched" to keep cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(
+                scope["method"], route_label, _status_class(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> tuple:
+    """
+    Render the metrics exposition payload.
+    Aggregates across uvicorn workers when PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,20 +1,68 @@
-from pinecone import Pinecone
-from app.core.config import settings
+import threading
+from typing import Any, Dict, Optional
+
 from pinecone import Pinecone, ServerlessSpec
-import os
+from app.core.config import settings
 
 index_name = settings.PINECONE_INDEX
 GEMINI_API_KEY = settings.GEMINI_API_KEY
-pc = Pinecone(api_key=settings.PINECONE_API_KEY)
 
+# The client and index handle are created on first use (normally from the
+# app lifespan) so that importing the app never touches the network.
+_pc: Optional[Pinecone] = None
+_index = None
+# Handles for other indexes (embedding versions with their own dimension)
+_indexes: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_pinecone_client() -> Pinecone:
+    """Return the shared Pinecone client, creating it on first use"""
+    global _pc
+    if _pc is None:
+        with _lock:
+            if _pc is None:
+                _pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+    return _pc
+
+
+def ensure_index(pc: Pinecone, name: str = index_name, dimension: int = 1024) -> None:
+    """Create the Pinecone index if it does not exist yet"""
+    if name not in pc.list_indexes().names():
+        pc.create_index(
+            name=name,
+            dimension=dimension,  # must match the embedding model (E5-large: 1024)
+            metric="cosine",  # E5 works best with cosine similarity
+            spec=ServerlessSpec(cloud='aws', region='us-east-1')
+        )
+
+
+def get_index(name: Optional[str] = None, dimension: int = 1024):
+    """Return the shared index handle, creating the index on first use if needed"""
+    global _index
+    if name and name != index_name:
+        handle = _indexes.get(name)
+        if handle is None:
+            pc = get_pinecone_client()
+            with _lock:
+                handle = _indexes.get(name)
+                if handle is None:
+                    ensure_index(pc, name, dimension)
+                    handle = _indexes[name] = pc.Index(name)
+        return handle
+    if _index is None:
+        pc = get_pinecone_client()
+        with _lock:
+            if _index is None:
+                ensure_index(pc)
+                _index = pc.Index(index_name)
+    return _index
 
-# Initialize Pinecone index
-if index_name not in pc.list_indexes().names():
-    pc.create_index(
-        name=index_name,
-        dimension=1024,  # E5-large requires 1024 dimensions
-        metric="cosine",  # E5 works best with cosine similarity
-        spec=ServerlessSpec(cloud='aws', region='us-east-1')
-    )
 
-index = pc.Index(index_name)
\ No newline at end of file
+def close_pinecone() -> None:
+    """Drop the cached client and index handle"""
+    global _pc, _index
+    with _lock:
+        _pc = None
+        _index = None
+        _indexes.clear()
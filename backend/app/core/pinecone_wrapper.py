@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import time
 from typing import Optional, Any, Dict, List
 from functools import wraps
 from pinecone.exceptions import PineconeException
 from app.exceptions.global_exceptions import ExternalServiceError
-from app.core.pineConeDB import pc, index
+from app.core.metrics import track_dependency, record_retry
+from app.core.config import settings
+from app.core.pineConeDB import get_pinecone_client, get_index, close_pinecone, index_name
 
 logger = logging.getLogger(__name__)
 
@@ -17,48 +20,70 @@ class PineconeWrapper:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self._connection_healthy = True
+        # While unhealthy, when the next operation may try Pinecone again
+        self._recheck_at = 0.0
+
+    def mark_unhealthy(self) -> None:
+        self._connection_healthy = False
+        self._recheck_at = time.monotonic() + settings.PINECONE_RECHECK_SECONDS
         
     def check_connection(self) -> bool:
         """Check if Pinecone connection is healthy"""
         try:
             # Try to get index stats as a health check
-            stats = index.describe_index_stats()
+            stats = safe_index.index.describe_index_stats()
             self._connection_healthy = True
             return True
         except Exception as e:
-            logger.warning(f"Pinecone connection check failed: {str(e)}")
-            self._connection_healthy = False
+            logger.warning("Pinecone connection check failed: %s", e)
+            self.mark_unhealthy()
             return False
     
-    def retry_on_connection_error(self, func):
-        """Decorator to retry Pinecone operations on connection errors"""
+    def retry_on_connection_error(self, func=None, *, target: str = "index"):
+        """
+        Decorator to retry Pinecone operations on connection errors.
+        Latency and retries are recorded per target and operation.
+        """
+        if func is None:
+            return lambda f: self.retry_on_connection_error(f, target=target)
+
+        operation = func.__name__.lstrip("_")
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            with track_dependency("pinecone", target, operation):
+                return await _attempt(*args, **kwargs)
+
+        async def _attempt(*args, **kwargs):
             last_exception = None
             
             for attempt in range(self.max_retries + 1):
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
+                    self._connection_healthy = True
+                    return result
                     
                 except PineconeException as e:
                     last_exception = e
                     logger.warning(
-                        f"Pinecone error on attempt {attempt + 1}/{self.max_retries + 1}: {str(e)}"
+                        "Pinecone error on attempt %d/%d: %s", attempt + 1, self.max_retries + 1, e
                     )
                     
                     if attempt < self.max_retries:
                         wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                        logger.info(f"Retrying Pinecone operation in {wait_time} seconds...")
-                        time.sleep(wait_time)
+                        logger.info("Retrying Pinecone operation in %s seconds...", wait_time)
+                        record_retry("pinecone", target, operation)
+                        await asyncio.sleep(wait_time)
                     else:
-                        logger.error(f"All Pinecone retry attempts failed: {str(e)}")
+                        logger.error("All Pinecone retry attempts failed: %s", e)
+                        self.mark_unhealthy()
                         raise ExternalServiceError(
                             "Vector database service is temporarily unavailable",
                             details={"attempts": self.max_retries + 1, "error": str(e)}
                         )
                         
                 except Exception as e:
-                    logger.error(f"Unexpected error in Pinecone operation: {str(e)}")
+                    logger.error("Unexpected error in Pinecone operation: %s", e)
                     # Don't retry on unexpected errors
                     raise ExternalServiceError(
                         "Vector database operation failed",
@@ -79,74 +104,158 @@ class PineconeWrapper:
         """Check if the Pinecone connection is currently healthy"""
         return self._connection_healthy
 
+    def allow_request(self) -> bool:
+        """
+        Whether an operation should try Pinecone. While it is marked
+        unhealthy, one caller per PINECONE_RECHECK_SECONDS gets True and
+        probes it; the others keep to their fallback until a probe succeeds.
+        """
+        if self._connection_healthy:
+            return True
+        now = time.monotonic()
+        if now < self._recheck_at:
+            return False
+        # Claim the probe; a failed one marks Pinecone unhealthy again
+        self._recheck_at = now + settings.PINECONE_RECHECK_SECONDS
+        return True
+
 # Create global Pinecone wrapper instance
 pinecone_wrapper = PineconeWrapper()
 
 class SafePineconeIndex:
     """
-    Safe Pinecone index wrapper that handles errors gracefully
+    Safe Pinecone index wrapper that handles errors gracefully.
+    The underlying index is resolved on first use unless one is given.
+    The SDK is synchronous, so every call runs in a worker thread and
+    concurrent requests don't serialize on the event loop.
     """
     
-    def __init__(self, index, wrapper: PineconeWrapper):
+    def __init__(self, wrapper: PineconeWrapper, index=None, name: Optional[str] = None, dimension: int = 1024):
         self._index = index
         self._wrapper = wrapper
+        self._name = name
+        self._dimension = dimension
     
     @property
     def wrapper(self):
         return self._wrapper
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = get_index(self._name, self._dimension)
+        return self._index
     
     async def upsert(self, vectors: List[Dict], namespace: str = None, **kwargs):
         """Safely upsert vectors"""
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+
         @self._wrapper.retry_on_connection_error
         async def _upsert():
-            return self._index.upsert(vectors=vectors, namespace=namespace, **kwargs)
+            return await asyncio.to_thread(self.index.upsert, vectors=vectors, **kwargs)
         return await _upsert()
     
     async def query(self, vector: List[float] = None, namespace: str = None, 
                    top_k: int = 10, include_metadata: bool = True, 
-                   filter: Dict = None, **kwargs):
+                   filter: Dict = None, include_values: bool = False, **kwargs):
         """Safely query vectors"""
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+
         @self._wrapper.retry_on_connection_error
         async def _query():
-            return self._index.query(
+            return await asyncio.to_thread(
+                self.index.query,
                 vector=vector,
-                namespace=namespace,
                 top_k=top_k,
                 include_metadata=include_metadata,
+                include_values=include_values,
                 filter=filter,
                 **kwargs
             )
         return await _query()
     
+    async def update(self, id: str, values: List[float] = None, set_metadata: Dict = None,
+                     namespace: str = None, **kwargs):
+        """Safely update a vector's values and/or merge fields into its metadata"""
+        if values is not None:
+            kwargs["values"] = values
+        if set_metadata is not None:
+            kwargs["set_metadata"] = set_metadata
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+
+        @self._wrapper.retry_on_connection_error
+        async def _update():
+            return await asyncio.to_thread(self.index.update, id=id, **kwargs)
+        return await _update()
+
     async def delete(self, ids: List[str] = None, namespace: str = None, 
                     filter: Dict = None, **kwargs):
         """Safely delete vectors"""
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+
         @self._wrapper.retry_on_connection_error
         async def _delete():
-            return self._index.delete(ids=ids, namespace=namespace, filter=filter, **kwargs)
+            return await asyncio.to_thread(self.index.delete, ids=ids, filter=filter, **kwargs)
         return await _delete()
+
+    async def fetch(self, ids: List[str], namespace: str = None, include_metadata: bool = False,
+                    **kwargs) -> Dict[str, Any]:
+        """
+        Safely fetch stored vectors; returns id -> values for the ids that exist,
+        or id -> {"values", "metadata"} with include_metadata
+        """
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+
+        @self._wrapper.retry_on_connection_error
+        async def _fetch():
+            return await asyncio.to_thread(self.index.fetch, ids=ids, **kwargs)
+        response = await _fetch()
+        vectors = response.vectors if hasattr(response, "vectors") else response.get("vectors", {})
+
+        def field(vector, name):
+            return vector.get(name) if isinstance(vector, dict) else getattr(vector, name, None)
+
+        if include_metadata:
+            return {
+                vector_id: {"values": list(field(vector, "values")), "metadata": field(vector, "metadata") or {}}
+                for vector_id, vector in vectors.items()
+            }
+        return {vector_id: list(field(vector, "values")) for vector_id, vector in vectors.items()}
     
     async def describe_index_stats(self, **kwargs):
         """Safely get index statistics"""
         @self._wrapper.retry_on_connection_error
-        async def _stats():
-            return self._index.describe_index_stats(**kwargs)
-        return await _stats()
+        async def _describe_index_stats():
+            return await asyncio.to_thread(self.index.describe_index_stats, **kwargs)
+        return await _describe_index_stats()
 
 class SafePineconeClient:
     """
-    Safe Pinecone client wrapper for embedding operations
+    Safe Pinecone client wrapper for embedding operations.
+    The underlying client is resolved on first use unless one is given.
     """
     
-    def __init__(self, client, wrapper: PineconeWrapper):
+    def __init__(self, wrapper: PineconeWrapper, client=None):
         self._client = client
         self._wrapper = wrapper
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_pinecone_client()
+        return self._client
     
     async def embed(self, model: str, inputs: List[str], parameters: Dict = None, **kwargs):
         """Safely generate embeddings"""
-        @self._wrapper.retry_on_connection_error
+        @self._wrapper.retry_on_connection_error(target="inference")
         async def _embed():
-            return self._client.inference.embed(
+            return await asyncio.to_thread(
+                self.client.inference.embed,
                 model=model,
                 inputs=inputs,
                 parameters=parameters or {},
@@ -155,8 +264,54 @@ class SafePineconeClient:
         return await _embed()
 
 # Create safe wrappers
-safe_index = SafePineconeIndex(index, pinecone_wrapper)
-safe_pc = SafePineconeClient(pc, pinecone_wrapper)
+safe_index = SafePineconeIndex(pinecone_wrapper)
+safe_pc = SafePineconeClient(pinecone_wrapper)
+
+# Wrappers for indexes other than PINECONE_INDEX, by index name
+_safe_indexes: Dict[str, SafePineconeIndex] = {}
+
+
+def get_safe_index(name: Optional[str] = None, dimension: int = 1024) -> SafePineconeIndex:
+    """Safe wrapper for an index by name; the configured index when None"""
+    if not name or name == index_name:
+        return safe_index
+    wrapper = _safe_indexes.get(name)
+    if wrapper is None:
+        wrapper = _safe_indexes.setdefault(name, SafePineconeIndex(pinecone_wrapper, name=name, dimension=dimension))
+    return wrapper
+
+
+async def prewarm_pinecone() -> None:
+    """
+    Resolve the index and run one embed plus one top_k=1 query so TLS
+    sessions and connection pools are open before the first request.
+    """
+    from app.core.embeddings import get_version
+
+    # The configured search version; a runtime switch is warmed by its first query
+    version = get_version(settings.EMBEDDING_ACTIVE_VERSION)
+    index = get_safe_index(version.index, version.dimension)
+    await asyncio.to_thread(lambda: index.index)
+    await asyncio.to_thread(lambda: safe_pc.client)
+    embedding = await safe_pc.embed(
+        model=version.model,
+        inputs=["warmup"],
+        parameters={"input_type": "query", "truncate": "END"}
+    )
+    await index.query(
+        vector=embedding[0]['values'],
+        namespace="__warmup__",
+        top_k=1,
+        include_metadata=False
+    )
+
+
+def close_pinecone_clients() -> None:
+    """Drop the cached Pinecone client and index handle"""
+    close_pinecone()
+    safe_index._index = None
+    safe_pc._client = None
+    _safe_indexes.clear()
 
 async def get_pinecone_health() -> Dict[str, Any]:
     """Get Pinecone health status"""
@@ -177,7 +332,7 @@ async def get_pinecone_health() -> Dict[str, Any]:
                 "timestamp": time.time()
             }
     except Exception as e:
-        logger.error(f"Error checking Pinecone health: {str(e)}")
+        logger.error("Error checking Pinecone health: %s", e)
         return {
             "status": "error",
             "connection_healthy": False,
@@ -1,23 +1,440 @@
+import logging
+import math
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
 from fastapi import Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse
 
-def get_user_route_key(request: Request) -> str:
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITER_ENTRIES, RATE_LIMITER_EVICTIONS, RATE_LIMITER_MEMORY_BYTES
+from app.exceptions.global_exceptions import create_error_response
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RouteCost:
     """
-    Generate a unique key for rate limiting based on user_id and route.
-    Falls back to IP address for unauthenticated requests.
+    Token cost of the dependency calls a route makes.
+    A route's cost is the sum of the calls on its request path and is
+    charged against the caller's shared budget.
+    """
+    MONGO_READ = 1
+    MONGO_WRITE = 1
+    VECTOR_QUERY = 1
+    VECTOR_WRITE = 1
+    EMBED = 3
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request does not fit in its route limit or the caller's budget"""
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class Bucket:
+    """One token bucket to charge: refills `capacity` tokens every `period` seconds"""
+    key: str
+    capacity: float
+    period: float
+    cost: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass
+class ConsumeResult:
+    allowed: bool
+    remaining: List[float]
+    retry_after: float
+
+
+@dataclass
+class RateLimitStatus:
+    """Outcome of the last limit check, exposed through response headers"""
+    limit: int
+    remaining: int
+    budget_limit: int
+    budget_remaining: int
+    cost: int
+    retry_after: float = 0.0
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse "10/minute" into (10, 60)"""
+    try:
+        count, _, period = rate.partition("/")
+        period = period.strip().lower().rstrip("s")
+        return int(count), _PERIODS[period]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit '{rate}', expected e.g. '10/minute'")
+
+
+def _refill(tokens: float, updated_at: float, now: float, bucket: Bucket) -> float:
+    return min(bucket.capacity, tokens + max(0.0, now - updated_at) * bucket.refill_rate)
+
+
+class RateLimitStorage:
+    """
+    Storage backend for token buckets.
+    `consume` must be atomic across all buckets passed to it: either every
+    bucket is charged or none is.
+    """
+
+    async def consume(self, buckets: List[Bucket]) -> ConsumeResult:
+        raise NotImplementedError
+
+
+# Rough per-entry cost of an OrderedDict slot plus its (tokens, updated_at, expires_at) tuple
+_ENTRY_OVERHEAD = 104 + sys.getsizeof((0.0, 0.0, 0.0)) + 3 * sys.getsizeof(0.0)
+
+
+class MemoryStorage(RateLimitStorage):
+    """
+    In-process storage. Atomic because the check-and-charge runs without
+    yielding to the event loop, but limits are per worker.
+
+    Memory is bounded: a bucket left idle long enough to refill completely
+    is indistinguishable from a new one, so it expires at that point, and
+    once `max_entries` is reached the least recently used bucket is evicted.
+    """
+
+    # Expired entries swept per consume call, keeping the cost per request flat
+    SWEEP_BATCH = 32
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._memory_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _remove(self, key: str, reason: str) -> None:
+        del self._buckets[key]
+        self._memory_bytes -= sys.getsizeof(key) + _ENTRY_OVERHEAD
+        RATE_LIMITER_EVICTIONS.labels(reason).inc()
+
+    def _evict(self, now: float) -> None:
+        # Least recently used entries sit at the front; expired ones are dropped first
+        for _ in range(self.SWEEP_BATCH):
+            if not self._buckets:
+                break
+            key, (_, _, expires_at) = next(iter(self._buckets.items()))
+            if expires_at > now:
+                break
+            self._remove(key, "expired")
+        while len(self._buckets) > self.max_entries:
+            self._remove(next(iter(self._buckets)), "capacity")
+
+    async def consume(self, buckets: List[Bucket]) -> ConsumeResult:
+        now = time.monotonic()
+        levels = []
+        retry_after = 0.0
+        for bucket in buckets:
+            tokens, updated_at, _ = self._buckets.get(bucket.key, (bucket.capacity, now, now))
+            tokens = _refill(tokens, updated_at, now, bucket)
+            levels.append(tokens)
+            if tokens < bucket.cost:
+                retry_after = max(retry_after, (bucket.cost - tokens) / bucket.refill_rate)
+
+        allowed = retry_after == 0.0
+        remaining = []
+        for bucket, tokens in zip(buckets, levels):
+            if allowed:
+                tokens -= bucket.cost
+            if bucket.key not in self._buckets:
+                self._memory_bytes += sys.getsizeof(bucket.key) + _ENTRY_OVERHEAD
+            # Time until the bucket is full again; after that the entry carries no state
+            expires_at = now + (bucket.capacity - tokens) / bucket.refill_rate
+            self._buckets[bucket.key] = (tokens, now, expires_at)
+            self._buckets.move_to_end(bucket.key)
+            remaining.append(tokens)
+
+        self._evict(now)
+        RATE_LIMITER_ENTRIES.set(len(self._buckets))
+        RATE_LIMITER_MEMORY_BYTES.set(self._memory_bytes)
+        return ConsumeResult(allowed, remaining, retry_after)
+
+
+# Refills and charges every bucket in KEYS in one atomic step using the
+# server clock, so all workers share one view of time.
+# ARGV holds (capacity, refill_rate, cost) for each key in order.
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i = 1, #KEYS do
+  local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+  local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+  local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < cost then
+    retry_after = math.max(retry_after, (cost - tokens) / rate)
+  end
+end
+local allowed = 0
+if retry_after == 0 then allowed = 1 end
+local out = {allowed, tostring(retry_after)}
+for i = 1, #KEYS do
+  local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+  local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+  local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+  local tokens = levels[i]
+  if allowed == 1 then tokens = tokens - cost end
+  redis.call('HSET', KEYS[i], 'tokens', tostring(tokens), 'ts', tostring(now))
+  redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate * 1000))
+  out[#out + 1] = tostring(tokens)
+end
+return out
+"""
+
+
+class RedisStorage(RateLimitStorage):
+    """
+    Redis-backed storage shared by every worker. Works with any server that
+    speaks the Redis protocol and supports Lua scripting (Redis, Valkey,
+    KeyDB, or fakeredis for local testing).
+    """
+
+    def __init__(self, url: str, key_prefix: str = "hc:rl:", client=None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self._key_prefix = key_prefix
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    async def consume(self, buckets: List[Bucket]) -> ConsumeResult:
+        keys = [self._key_prefix + b.key for b in buckets]
+        args = []
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.refill_rate, bucket.cost]
+        raw = await self._script(keys=keys, args=args)
+        values = [v.decode() if isinstance(v, bytes) else v for v in raw]
+        return ConsumeResult(
+            allowed=int(values[0]) == 1,
+            remaining=[float(v) for v in values[2:]],
+            retry_after=float(values[1]),
+        )
+
+
+def create_storage(url: str, max_entries: int = 100_000) -> RateLimitStorage:
+    """Build the storage backend for a RATE_LIMIT_STORAGE_URL"""
+    if not url or url.startswith("memory://"):
+        return MemoryStorage(max_entries=max_entries)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStorage(url)
+    raise ValueError(f"Unsupported rate limit storage URL: {url}")
+
+
+def get_remote_address(request: Request) -> str:
+    """Client IP address, or 127.0.0.1 when the transport does not expose one"""
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def get_principal_key(request: Request) -> str:
+    """
+    Identify the caller: user_id for authenticated requests,
+    IP address otherwise.
     """
     # Get user_id from request state (set by auth middleware)
     user_id = getattr(request.state, 'user_id', None)
-    route_path = request.url.path
-    
     if user_id:
-        # For authenticated users: use user_id + route for rate limiting
-        return f"user:{user_id}:route:{route_path}"
-    else:
-        # For unauthenticated requests: use IP + route
-        client_ip = get_remote_address(request)
-        return f"ip:{client_ip}:route:{route_path}"
-
-# Initialize rate limiter with in-memory storage (no Redis)
-limiter = Limiter(key_func=get_user_route_key) 
\ No newline at end of file
+        return f"user:{user_id}"
+    return f"ip:{get_remote_address(request)}"
+
+
+def get_route_template(request: Request) -> str:
+    """
+    The matched route's path template (e.g. "/notes/{note_id}"), so every
+    note ID shares one bucket. Falls back to the raw path outside routing.
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
+def get_user_route_key(request: Request) -> str:
+    """
+    Generate a unique key for rate limiting based on user_id and route template.
+    Falls back to IP address for unauthenticated requests.
+    """
+    return f"{get_principal_key(request)}:route:{request.method}:{get_route_template(request)}"
+
+
+class TokenBucketLimiter:
+    """
+    Cost-weighted token bucket rate limiter.
+
+    Every decorated route charges two buckets atomically:
+    - its own bucket, refilled at the route's declared rate, one token per request
+    - the caller's shared budget, charged the route's declared cost
+    """
+
+    def __init__(
+        self,
+        key_func: Callable[[Request], str],
+        storage_url: str = "memory://",
+        budget: str = "200/minute",
+        enabled: bool = True,
+        max_entries: int = 100_000,
+    ):
+        self.key_func = key_func
+        self.storage_url = storage_url
+        self.max_entries = max_entries
+        self.budget_capacity, self.budget_period = parse_rate(budget)
+        self.enabled = enabled
+        self._storage: Optional[RateLimitStorage] = None
+
+    @property
+    def storage(self) -> RateLimitStorage:
+        if self._storage is None:
+            self._storage = create_storage(self.storage_url, self.max_entries)
+        return self._storage
+
+    @storage.setter
+    def storage(self, storage: RateLimitStorage) -> None:
+        self._storage = storage
+
+    async def hit(self, request: Request, rate: str, cost: int = 1) -> Optional[RateLimitStatus]:
+        """Charge the route and budget buckets for one request, raising when either is empty"""
+        capacity, period = parse_rate(rate)
+        buckets = [
+            Bucket(self.key_func(request), capacity, period, 1),
+            Bucket(f"{get_principal_key(request)}:budget", self.budget_capacity, self.budget_period, cost),
+        ]
+
+        try:
+            result = await self.storage.consume(buckets)
+        except Exception as e:
+            # Fail open: an unavailable limiter backend must not take the API down
+            logger.warning("Rate limit storage unavailable, allowing request: %s", e)
+            return None
+
+        status = RateLimitStatus(
+            limit=capacity,
+            remaining=max(0, math.floor(result.remaining[0])),
+            budget_limit=self.budget_capacity,
+            budget_remaining=max(0, math.floor(result.remaining[1])),
+            cost=cost,
+            retry_after=result.retry_after,
+        )
+        request.state.rate_limit = status
+
+        if not result.allowed:
+            raise RateLimitExceeded(f"Rate limit exceeded: {rate}, cost {cost}", result.retry_after)
+        return status
+
+    def limit(self, rate: str, cost: Union[int, Callable[[dict], int]] = 1):
+        """
+        Decorator limiting a route to `rate` requests and charging `cost`
+        tokens against the caller's budget. The route must take a
+        `request: Request` parameter. `cost` may be a callable taking the
+        route's keyword arguments, for routes whose work depends on the body.
+        """
+        parse_rate(rate)  # fail at import time on a malformed rate
+
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if request is None:
+                    request = next((a for a in args if isinstance(a, Request)), None)
+                if request is None:
+                    raise RuntimeError(f"{func.__name__} needs a 'request: Request' parameter to be rate limited")
+                if self.enabled:
+                    await self.hit(request, rate, cost(kwargs) if callable(cost) else cost)
+                return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def rate_limit_headers(status: RateLimitStatus) -> Dict[str, str]:
+    """Response headers reporting the remaining route and budget allowance"""
+    headers = {
+        "X-RateLimit-Limit": str(status.limit),
+        "X-RateLimit-Remaining": str(status.remaining),
+        "X-RateLimit-Budget-Limit": str(status.budget_limit),
+        "X-RateLimit-Budget-Remaining": str(status.budget_remaining),
+        "X-RateLimit-Cost": str(status.cost),
+    }
+    if status.retry_after:
+        headers["Retry-After"] = str(math.ceil(status.retry_after))
+    return headers
+
+
+RATE_LIMIT_HEADERS = [
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Budget-Limit",
+    "X-RateLimit-Budget-Remaining",
+    "X-RateLimit-Cost",
+    "Retry-After",
+]
+
+
+class RateLimitHeadersMiddleware:
+    """ASGI middleware copying the request's rate limit status onto the response headers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status = scope.get("state", {}).get("rate_limit")
+                if status is not None:
+                    existing = {name.lower() for name, _ in message.get("headers", [])}
+                    headers = list(message.get("headers", []))
+                    for name, value in rate_limit_headers(status).items():
+                        if name.lower().encode() not in existing:
+                            headers.append((name.lower().encode(), value.encode()))
+                    message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """Return a 429 with a Retry-After header"""
+    response = create_error_response(
+        exc.detail,
+        status_code=429,
+        details={"retry_after": math.ceil(exc.retry_after)},
+        error_type="rate_limit_error"
+    )
+    response.headers["Retry-After"] = str(math.ceil(exc.retry_after))
+    return response
+
+
+limiter = TokenBucketLimiter(
+    key_func=get_user_route_key,
+    storage_url=settings.RATE_LIMIT_STORAGE_URL,
+    budget=settings.RATE_LIMIT_USER_BUDGET,
+    enabled=settings.RATE_LIMIT_ENABLED,
+    max_entries=settings.RATE_LIMIT_MAX_ENTRIES,
+)
@@ -0,0 +1,32 @@
+from typing import Any, Dict, List, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    """Serialize the few non-JSON types that reach responses from Mongo"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson.
+
+    Return an instance directly from the endpoint (rather than the raw data)
+    so FastAPI skips jsonable_encoder; the content must already be plain
+    dicts, lists, strings and numbers, as produced by the app models.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def paged_response(items: List[Dict], next_offset: Optional[int]) -> FastJSONResponse:
+    """A page of results, with the next page's offset in X-Next-Offset when there is one"""
+    headers = {"X-Next-Offset": str(next_offset)} if next_offset is not None else None
+    return FastJSONResponse(items, headers=headers)
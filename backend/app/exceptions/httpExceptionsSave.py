@@ -4,11 +4,6 @@ from typing import Optional
 from datetime import datetime
 from pydantic import ValidationError
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class DocumentSaveError(Exception):
@@ -33,4 +28,8 @@ class DocumentStorageError(DocumentSaveError):
 
 class DatabaseError(DocumentSaveError):
     """Raised when a database operation fails"""
+    pass
+
+class DocumentNotFoundError(DocumentSaveError):
+    """Raised when the document to change does not exist for the user"""
     pass
\ No newline at end of file
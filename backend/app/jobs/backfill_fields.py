@@ -0,0 +1,120 @@
+"""
+Give bookmarks and notes saved before a field was stored that field.
+
+Run from the backend directory:
+    python -m app.jobs.backfill_fields             # every field below
+    python -m app.jobs.backfill_fields ts --batch-size 200
+
+Each field in DERIVED_FIELDS is computed from the stored document the
+same way new saves compute it: `tags` from the note and collection, `ts`
+(epoch seconds) from the ISO `date`. Documents missing any of the
+requested fields are read in _id order; each batch sets the vectors'
+metadata first, then the Mongo fields, grouping documents that get the
+same value into one update_many. A document whose vector update failed
+keeps its fields missing, so a rerun picks it up again. Empty values skip
+Pinecone, where a missing field filters the same way.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.database_wrapper import safe_collection_memories, safe_collection_notes
+from app.core.embeddings import update_document_metadata
+from app.utils.collection_extractor import document_tags
+from app.utils.timestamps import date_to_ts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+# Field -> its value for a stored document (None when it cannot be derived)
+DERIVED_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "tags": lambda doc: document_tags(doc.get("note"), doc.get("collection")),
+    "ts": lambda doc: date_to_ts(doc.get("date")),
+}
+
+_SOURCE_FIELDS = {"_id": 1, "doc_id": 1, "note": 1, "collection": 1, "date": 1}
+
+
+async def backfill_batch(collection, docs: List[Dict[str, Any]], fields: Sequence[str]) -> Dict[str, int]:
+    derived = [
+        (doc, {field: DERIVED_FIELDS[field](doc) for field in fields if field not in doc})
+        for doc in docs
+    ]
+    # Unreadable sources (a missing date) have nothing to store
+    derived = [(doc, {k: v for k, v in values.items() if v is not None}) for doc, values in derived]
+    skipped = sum(1 for _, values in derived if not values)
+    derived = [(doc, values) for doc, values in derived if values]
+
+    def searchable(values: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in values.items() if v != []}
+
+    results = await asyncio.gather(
+        *(update_document_metadata(doc["doc_id"], searchable(values)) for doc, values in derived if searchable(values)),
+        return_exceptions=True,
+    )
+    failures = iter(results)
+
+    groups: Dict[Tuple[str, str], Tuple[Any, List[Any]]] = {}
+    retried = 0
+    for doc, values in derived:
+        if searchable(values) and isinstance(next(failures), BaseException):
+            retried += 1
+            continue
+        for field, value in values.items():
+            groups.setdefault((field, repr(value)), (value, []))[1].append(doc["_id"])
+
+    # A save or update since the read has set the field already; keep theirs
+    await asyncio.gather(*(
+        collection.update_many({"_id": {"$in": ids}, field: {"$exists": False}}, {"$set": {field: value}})
+        for (field, _), (value, ids) in groups.items()
+    ))
+    return {"processed": len(derived) - retried, "retried": retried, "skipped": skipped}
+
+
+async def backfill(fields: Optional[Sequence[str]] = None, batch_size: Optional[int] = None) -> Dict[str, int]:
+    fields = list(fields or DERIVED_FIELDS)
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    totals = {"processed": 0, "retried": 0, "skipped": 0}
+    missing = {"$or": [{field: {"$exists": False}} for field in fields]}
+    for collection in (safe_collection_memories, safe_collection_notes):
+        last_id = None
+        while True:
+            query: Dict[str, Any] = dict(missing)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            projection = {**_SOURCE_FIELDS, **dict.fromkeys(fields, 1)}
+            docs = await collection.find(query, projection=projection, sort=[("_id", 1)], limit=batch_size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            counts = await backfill_batch(collection, docs, fields)
+            for key, value in counts.items():
+                totals[key] += value
+            logger.info(
+                "🧩 BACKFILL: %s on %d documents so far (%d to retry, %d skipped)",
+                ", ".join(fields), totals["processed"], totals["retried"], totals["skipped"],
+            )
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fields", nargs="*", help=f"fields to backfill: {', '.join(DERIVED_FIELDS)} (default: all)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    unknown = set(args.fields) - set(DERIVED_FIELDS)
+    if unknown:
+        parser.error(f"unknown fields: {', '.join(sorted(unknown))}")
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(message)s")
+
+    totals = asyncio.run(backfill(args.fields, args.batch_size))
+    print(f"{', '.join(args.fields or DERIVED_FIELDS)}: {totals}")
+    return 0 if not totals["retried"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Purge trashed bookmarks and notes older than TRASH_RETENTION_DAYS.
+
+The app runs this every TRASH_PURGE_INTERVAL_SECONDS (0 disables it); it
+can also be run by hand from the backend directory:
+    python -m app.jobs.purge_trash
+
+Expired documents are read TRASH_PURGE_BATCH at a time (at most 1000,
+Pinecone's limit for a delete by IDs). Each batch's vectors are deleted
+with one call per embedding version being written, then the documents
+with one delete_many. Vectors go first, so a failure leaves documents
+that the next run picks up again rather than orphaned vectors. Restores
+are refused past the same cutoff, so a batch cannot race a restore.
+
+Several workers may run the collector at once; the deletes are
+idempotent, so that only costs duplicate calls.
+"""
+import asyncio
+import logging
+import sys
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.database import DELETED_AT
+from app.core.database_wrapper import safe_collection_memories, safe_collection_notes
+from app.core.embeddings import delete_vectors
+from app.services.trash_service import retention_cutoff
+
+logger = logging.getLogger(__name__)
+
+# Pinecone deletes at most this many IDs per call
+_MAX_DELETE_IDS = 1000
+
+
+async def purge_expired(batch_size: Optional[int] = None) -> Dict[str, int]:
+    batch_size = min(batch_size or settings.TRASH_PURGE_BATCH, _MAX_DELETE_IDS)
+    expired = {DELETED_AT: {"$lt": retention_cutoff()}}
+    totals = {"bookmarks": 0, "notes": 0}
+
+    for key, collection in (("bookmarks", safe_collection_memories), ("notes", safe_collection_notes)):
+        while True:
+            docs = await collection.find(expired, projection={"_id": 1, "doc_id": 1}, limit=batch_size)
+            if not docs:
+                break
+            doc_ids = [doc["doc_id"] for doc in docs if doc.get("doc_id")]
+            if doc_ids:
+                await delete_vectors(doc_ids)
+            result = await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, **expired})
+            totals[key] += result.deleted_count
+            if len(docs) < batch_size:
+                break
+
+    if any(totals.values()):
+        logger.info("🗑️ TRASH: Purged %d bookmarks and %d notes", totals["bookmarks"], totals["notes"])
+    return totals
+
+
+async def run_collector(interval: float) -> None:
+    """Purge expired trash every `interval` seconds until cancelled"""
+    while True:
+        start = time.monotonic()
+        try:
+            await purge_expired()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("🗑️ TRASH: Purge failed, retrying next interval: %s", e)
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(message)s")
+    totals = asyncio.run(purge_expired())
+    print(f"purged: {totals}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Re-embed every bookmark and note into another embedding version.
+
+Run from the backend directory:
+    python -m app.jobs.reindex start v2      # dual-write v2, then backfill it
+    python -m app.jobs.reindex resume v2     # continue an interrupted backfill
+    python -m app.jobs.reindex status v2
+    python -m app.jobs.reindex activate v2   # switch search and writes to v2
+
+`start` marks the version pending, so every worker also writes new and
+changed documents to it, then waits EMBEDDING_STATE_TTL for the workers
+to notice before scanning. Documents are read from Mongo in _id order,
+embedded REINDEX_BATCH_SIZE at a time within REINDEX_TOKENS_PER_MINUTE,
+and upserted into the version's index and namespace. Each finished
+document gets the version added to its `embedded_versions` field, which
+is what makes the job resumable: a rerun only picks up documents without
+the mark.
+
+A document edited, trashed, restored or deleted while its batch is in
+flight is not marked (a deleted one also has its new vector removed) and
+is redone by the next pass; the job ends after a pass with nothing left
+to do.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import DELETED_AT
+from app.core.database_wrapper import (
+    safe_collection_embedding_state,
+    safe_collection_memories,
+    safe_collection_notes,
+)
+from app.core.embeddings import (
+    EMBEDDED_VERSIONS,
+    EmbeddingVersion,
+    document_text,
+    embed_texts,
+    get_version,
+    load_state,
+    save_state,
+    vector_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+# e5 truncates inputs at 512 tokens; ~4 characters per token is close enough for budgeting
+_MAX_TOKENS_PER_TEXT = 512
+_CHARS_PER_TOKEN = 4
+
+# Fields whose change during a batch means the new vector may be stale:
+# the embedded text, and the trash flag carried in the vector metadata
+_CHANGE_FIELDS = ("updated_at", "title", "note", DELETED_AT)
+
+
+def estimate_tokens(text: str) -> int:
+    return min(_MAX_TOKENS_PER_TEXT, len(text) // _CHARS_PER_TOKEN + 1)
+
+
+class RateBudget:
+    """Token bucket holding at most one minute of budget"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def spend(self, amount: int) -> None:
+        amount = min(float(amount), self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+async def _update_progress(version: EmbeddingVersion, **fields) -> None:
+    counters = {key: value for key, value in fields.items() if isinstance(value, int)}
+    values = {key: value for key, value in fields.items() if not isinstance(value, int)}
+    update: Dict[str, Any] = {"$set": {**values, "updated_at": time.time()}}
+    if counters:
+        update["$inc"] = counters
+    await safe_collection_embedding_state.update_one({"_id": f"reindex:{version.name}"}, update, upsert=True)
+
+
+async def reindex_batch(collection, version: EmbeddingVersion, docs: List[Dict[str, Any]], budget: RateBudget) -> Dict[str, int]:
+    """Embed and upsert one batch, then mark the documents that did not change meanwhile"""
+    texts = [document_text(doc) for doc in docs]
+    await budget.spend(sum(estimate_tokens(text) for text in texts))
+    vectors = await embed_texts(version, texts, "passage")
+    await version.safe_index.upsert(
+        vectors=[
+            {"id": doc["doc_id"], "values": values, "metadata": vector_metadata(doc)}
+            for doc, values in zip(docs, vectors)
+        ],
+        namespace=version.namespace
+    )
+
+    # Re-read the batch: deleted documents lose their new vector, edited ones wait for the next pass
+    ids = [doc["_id"] for doc in docs]
+    current = {
+        doc["_id"]: doc
+        for doc in await collection.find({"_id": {"$in": ids}}, projection=dict.fromkeys(_CHANGE_FIELDS, 1))
+    }
+    deleted = [doc["doc_id"] for doc in docs if doc["_id"] not in current]
+    if deleted:
+        await version.safe_index.delete(ids=deleted, namespace=version.namespace)
+    unchanged = [
+        doc["_id"] for doc in docs
+        if doc["_id"] in current and all(current[doc["_id"]].get(field) == doc.get(field) for field in _CHANGE_FIELDS)
+    ]
+    if unchanged:
+        await collection.update_many({"_id": {"$in": unchanged}}, {"$addToSet": {EMBEDDED_VERSIONS: version.name}})
+    return {"processed": len(unchanged), "deleted": len(deleted), "retried": len(docs) - len(unchanged) - len(deleted)}
+
+
+async def backfill(version: EmbeddingVersion, batch_size: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> Dict[str, int]:
+    batch_size = batch_size or settings.REINDEX_BATCH_SIZE
+    budget = RateBudget(tokens_per_minute or settings.REINDEX_TOKENS_PER_MINUTE)
+    totals = {"processed": 0, "deleted": 0, "retried": 0}
+    pending_filter = {EMBEDDED_VERSIONS: {"$ne": version.name}}
+
+    await _update_progress(version, status="running", started_at=time.time())
+    try:
+        while True:
+            pass_work = 0
+            for collection in (safe_collection_memories, safe_collection_notes):
+                last_id = None
+                while True:
+                    query = dict(pending_filter)
+                    if last_id is not None:
+                        query["_id"] = {"$gt": last_id}
+                    docs = await collection.find(query, sort=[("_id", 1)], limit=batch_size)
+                    if not docs:
+                        break
+                    last_id = docs[-1]["_id"]
+                    counts = await reindex_batch(collection, version, docs, budget)
+                    for key, value in counts.items():
+                        totals[key] += value
+                    pass_work += len(docs)
+                    await _update_progress(version, **counts)
+                    logger.info(
+                        "🔁 REINDEX %s: %d embedded, %d deleted, %d to retry so far",
+                        version.name, totals["processed"], totals["deleted"], totals["retried"],
+                    )
+            if pass_work == 0:
+                break
+    except Exception as e:
+        await _update_progress(version, status="failed", last_error=str(e))
+        raise
+    await _update_progress(version, status="complete", finished_at=time.time())
+    return totals
+
+
+async def remaining(version: EmbeddingVersion) -> Dict[str, int]:
+    pending_filter = {EMBEDDED_VERSIONS: {"$ne": version.name}}
+    memories, notes = await asyncio.gather(
+        safe_collection_memories.count_documents(pending_filter),
+        safe_collection_notes.count_documents(pending_filter),
+    )
+    return {"bookmarks": memories, "notes": notes}
+
+
+async def start(version_name: str, resume: bool = False) -> Dict[str, int]:
+    version = get_version(version_name)
+    active, pending = await load_state(force=True)
+    if version.name == active:
+        raise ValueError(f"{version.name} is already the active version")
+    if pending != version.name:
+        if pending and not resume:
+            logger.warning("Replacing pending version %s with %s", pending, version.name)
+        await save_state(active, version.name)
+        # Let every worker pick up the pending version before scanning,
+        # so documents saved from now on are dual-written
+        await asyncio.sleep(settings.EMBEDDING_STATE_TTL)
+    return await backfill(version)
+
+
+async def activate(version_name: str, force: bool = False) -> None:
+    version = get_version(version_name)
+    left = await remaining(version)
+    if any(left.values()) and not force:
+        raise ValueError(f"{version.name} is missing documents ({left}); finish the backfill or pass --force")
+    await save_state(version.name, None)
+
+
+async def status(version_name: str) -> Dict[str, Any]:
+    version = get_version(version_name)
+    active, pending = await load_state(force=True)
+    progress = await safe_collection_embedding_state.find_one({"_id": f"reindex:{version.name}"}) or {}
+    progress.pop("_id", None)
+    return {"active": active, "pending": pending, "progress": progress, "remaining": await remaining(version)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("start", "resume", "status", "activate"))
+    parser.add_argument("version", help="embedding version name from EMBEDDING_VERSIONS")
+    parser.add_argument("--force", action="store_true", help="activate even if documents are missing")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command in ("start", "resume"):
+        totals = asyncio.run(start(args.version, resume=args.command == "resume"))
+        print(f"{args.version}: {totals}")
+    elif args.command == "activate":
+        asyncio.run(activate(args.version, force=args.force))
+        print(f"{args.version} is now the active embedding version")
+    else:
+        print(asyncio.run(status(args.version)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
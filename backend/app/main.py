@@ -1,6 +1,6 @@
 from jose import jwt, JWTError
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 from app.core.config import settings
 from app.routers.bookmarkRouters import router as bookmark_router
@@ -10,24 +10,34 @@ from app.routers.get_quotes import router as get_quotes_router
 from app.routers.notesRouter import router as notes_router
 from app.routers.auth_router import router as auth_router
 from app.routers.collections_router import router as collections_router
+from app.routers.library_router import router as library_router
+from app.routers.trash_router import router as trash_router
+from app.routers.stats_router import router as stats_router
 from app.exceptions.global_exceptions import (
     global_exception_handler,
     AuthenticationError,
     create_error_response
 )
-from app.core.database_wrapper import get_database_health
-from app.core.pinecone_wrapper import get_pinecone_health
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from app.core.database_wrapper import get_database_health, prewarm_database, close_database, ensure_indexes
+from app.core.pinecone_wrapper import get_pinecone_health, prewarm_pinecone, close_pinecone_clients
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.compression import CompressionMiddleware
+from app.core.background import background_tasks
+from app.core.data_version import get_version_store
+from app.jobs.purge_trash import run_collector
 
 load_dotenv()
 
+import asyncio
 import logging
+import secrets
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from app.core.logging_config import setup_logging
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO)
+# Configure queue-based structured logging
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +45,7 @@ logger = logging.getLogger(__name__)
 def validate_user_id(payload, context="token"):
     user_id = payload.get("sub")
     if not user_id:
-        logger.warning(f"Missing user ID in {context}")
+        logger.warning("Missing user ID in %s", context)
         return None, create_error_response("Invalid payload", 401, "auth_error")
     return user_id, None
 
@@ -49,10 +59,60 @@ def create_auth_error_response(message, status_code=401):
 
 
 # Import the limiter from the dedicated module to avoid circular imports
-from app.core.rate_limiter import limiter
+from app.core.rate_limiter import (
+    limiter,
+    RateLimitExceeded,
+    RateLimitHeadersMiddleware,
+    rate_limit_exceeded_handler,
+    RATE_LIMIT_HEADERS
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the Mongo and Pinecone clients and warm them up before the app
+    accepts traffic. A failed warm-up is logged, not fatal: the clients are
+    created lazily again on first use and /health/detailed reports the state.
+    Indexes are checked, and background workers and the trash collector
+    start with the app; queued work is drained before shutdown.
+    """
+    if settings.PREWARM_ON_STARTUP:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            prewarm_database(settings.MONGODB_PREWARM_CONNECTIONS),
+            prewarm_pinecone(),
+            return_exceptions=True
+        )
+        for name, result in zip(("mongodb", "pinecone"), results):
+            if isinstance(result, BaseException):
+                logger.warning("Prewarm of %s failed: %s", name, result)
+        logger.info("Startup prewarm finished in %.3fs", time.perf_counter() - start)
+
+    # Build the data version store now, so a per-process store configured
+    # for several workers fails startup rather than serving stale 304s
+    get_version_store()
+
+    background_tasks.start()
+    # Index builds can take a while on a large collection; don't hold startup for them
+    background_tasks.submit("ensure_indexes", ensure_indexes)
+    collector = None
+    if settings.TRASH_PURGE_INTERVAL_SECONDS > 0:
+        collector = asyncio.create_task(run_collector(settings.TRASH_PURGE_INTERVAL_SECONDS))
+
+    yield
+
+    if collector is not None:
+        collector.cancel()
+        await asyncio.gather(collector, return_exceptions=True)
+    # Let queued side effects finish while the clients are still open
+    await background_tasks.drain()
+    close_database()
+    close_pinecone_clients()
+
 
 # Create FastAPI app with enhanced error handling and disabled documentation
 app = FastAPI(
+    lifespan=lifespan,
     title="HippoCampus API",
     description="I help you remember everything",
     version="1.0.0",
@@ -63,15 +123,25 @@ app = FastAPI(
 
 # Add rate limiter to app state and configure middleware
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+app.add_middleware(RateLimitHeadersMiddleware)
 
 @app.middleware("http")
 async def authorisation_middleware(request: Request, call_next):
     """
     Simplified authentication middleware using direct JWT handling
     """
-    logger.info(f"Incoming request: {request.method} {request.url.path}")
+    logger.debug("Incoming request: %s %s", request.method, request.url.path)
+
+    # Metrics are for the scraper, which holds METRICS_TOKEN rather than a user JWT
+    if request.url.path == "/metrics":
+        if not settings.METRICS_TOKEN:
+            return create_error_response("Not Found", status_code=404, error_type="not_found")
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            logger.warning("❌ AUTH: Invalid metrics token")
+            return create_auth_error_response("Invalid metrics token")
+        return await call_next(request)
 
     # Skip auth for some public endpoints
     if request.url.path in ["/health", "/health/detailed"] or request.url.path.startswith("/quotes") or request.url.path.startswith("/auth"):
@@ -80,15 +150,12 @@ async def authorisation_middleware(request: Request, call_next):
     try:
         # Check both cookies and Authorization header
         auth_header = request.headers.get("authorization")
-        
-        logger.info(f"🔍 AUTH CHECK: Request details:")
-        logger.info(f"   ├─ Authorization header: {auth_header[:50] + '...' if auth_header else 'None'}")
-        
+        access_token = None
+
         # If no cookie, try to extract from Authorization header
         if auth_header:
             if auth_header.lower().startswith("bearer "):
                 access_token = auth_header[7:].strip()
-                logger.info(f"   └─ Extracted token from Authorization header")
         
         if not access_token:
             logger.warning("❌ AUTH: Access token missing from Authorization header")
@@ -109,7 +176,7 @@ async def authorisation_middleware(request: Request, call_next):
             logger.warning("JWT missing subject (user ID)")
             return create_auth_error_response("Invalid JWT payload")
 
-        logger.info(f"Access token valid for user: {user_id}")
+        logger.debug("Access token valid for user: %s", user_id)
 
         # Set user_id in the request state
         request.state.user_id = user_id
@@ -119,15 +186,15 @@ async def authorisation_middleware(request: Request, call_next):
         return response
 
     except JWTError as e:
-        logger.error(f"JWT validation failed: {str(e)}")
+        logger.error("JWT validation failed: %s", e)
         return create_auth_error_response("Invalid token")
 
     except HTTPException as e:
-        logger.error(f"HTTP exception during token validation: {e.detail}")
+        logger.error("HTTP exception during token validation: %s", e.detail)
         return create_error_response(e.detail, status_code=e.status_code, error_type="auth_error")
 
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         return create_error_response("Authentication service temporarily unavailable", status_code=503, error_type="auth_service_error")
 
 
@@ -140,8 +207,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=RATE_LIMIT_HEADERS + ["ETag", "X-Next-Offset"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+# Outermost middleware so request latency covers auth, rate limiting and compression
+app.add_middleware(MetricsMiddleware)
+
 # Health check endpoints
 @app.get("/health")
 async def health_check():
@@ -170,10 +243,11 @@ async def detailed_health_check():
             "services": {
                 "database": db_health,
                 "vector_db": pinecone_health
-            }
+            },
+            "background_tasks": {"pending": background_tasks.pending}
         }
     except Exception as e:
-        logger.error(f"Error in detailed health check: {str(e)}")
+        logger.error("Error in detailed health check: %s", e)
         return JSONResponse(
             status_code=503,
             content={
@@ -183,8 +257,17 @@ async def detailed_health_check():
             }
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint; needs METRICS_TOKEN (see authorisation_middleware)"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 app.include_router(bookmark_router)
 app.include_router(get_quotes_router)
 app.include_router(notes_router)
 app.include_router(auth_router)
 app.include_router(collections_router)
+app.include_router(library_router)
+app.include_router(trash_router)
+app.include_router(stats_router)
@@ -1,16 +1,17 @@
+BOOKMARK_FIELDS = ('doc_id', 'user_id', 'title', 'type', 'note', 'source_url', 'site_name', 'date', 'ts', 'collection', 'tags')
+
+# Mongo projection returning only the fields the API exposes
+BOOKMARK_PROJECTION = dict.fromkeys(BOOKMARK_FIELDS, 1)
+
+# Missing fields come back as None; 'id' first to keep the response key order
+_BOOKMARK_DEFAULTS = dict.fromkeys(('id',) + BOOKMARK_FIELDS)
+
+
 def bookmarkModel(item):
-    return {
-        'id': str(item.get('_id', '')) if item.get('_id') else None,
-        'doc_id': item.get('doc_id', None),
-        'user_id': item.get('user_id', None),
-        'title': item.get('title', None),
-        'type': item.get('type', None),
-        'note': item.get('note', None),
-        'source_url': item.get('source_url', None),
-        'site_name': item.get('site_name', None),
-        'date': item.get('date', None),
-        'collection': item.get('collection', None)
-    }
+    doc = {**_BOOKMARK_DEFAULTS, **item}
+    _id = doc.pop('_id', None)
+    doc['id'] = str(_id) if _id else None
+    return doc
 
 def bookmarkModels(items):
-    return [bookmarkModel(item) for item in items]
\ No newline at end of file
+    return [bookmarkModel(item) for item in items]
@@ -1,15 +1,18 @@
+NOTE_FIELDS = ('doc_id', 'user_id', 'type', 'title', 'note', 'date', 'ts', 'collection', 'tags')
+
+# Mongo projection returning only the fields the API exposes
+NOTE_PROJECTION = dict.fromkeys(NOTE_FIELDS, 1)
+
+# Missing fields come back as None; 'id' first to keep the response key order
+_NOTE_DEFAULTS = dict.fromkeys(('id',) + NOTE_FIELDS)
+
+
 def note_model(item):
-    return {
-        'id': str(item.get('_id', '')) if item.get('_id') else None,
-        'doc_id': item.get('doc_id', None),
-        'user_id': item.get('user_id', None),
-        'type' : item.get('type', None),
-        'title': item.get('title', None),
-        'note': item.get('note', None),
-        'date': item.get('date', None),
-        'collection': item.get('collection', None)
-    }
+    doc = {**_NOTE_DEFAULTS, **item}
+    _id = doc.pop('_id', None)
+    doc['id'] = str(_id) if _id else None
+    return doc
 
 
 def note_models(items):
-    return [note_model(item) for item in items]
\ No newline at end of file
+    return [note_model(item) for item in items]
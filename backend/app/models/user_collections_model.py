@@ -64,7 +64,7 @@ def user_collections_model(user_collections_data: dict) -> dict:
             "collections": formatted_collections
         }
     except Exception as e:
-        logger.error(f"Error formatting user collections data: {str(e)}")
+        logger.error("Error formatting user collections data: %s", e)
         return {
             "userId": user_collections_data.get("userId"),
             "collections": []
@@ -77,5 +77,5 @@ def user_collections_models(user_collections_list: List[dict]) -> List[dict]:
     try:
         return [user_collections_model(user_collections) for user_collections in user_collections_list]
     except Exception as e:
-        logger.error(f"Error formatting user collections list: {str(e)}")
+        logger.error("Error formatting user collections list: %s", e)
         return []
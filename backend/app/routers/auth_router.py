@@ -28,10 +28,10 @@ async def auth_status(request: Request):
         auth_header = request.headers.get("authorization")
         if auth_header and auth_header.lower().startswith("bearer "):
             access_token = auth_header[7:].strip()
-            logger.info(f"   ├─ Access token extracted from Authorization header")
+            logger.debug("   ├─ Access token extracted from Authorization header")
     
-    logger.info(f"   ├─ Access token present: {bool(access_token)}")
-    logger.info(f"   ├─ Refresh token present: {bool(refresh_token)}")
+    logger.debug("   ├─ Access token present: %s", bool(access_token))
+    logger.debug("   ├─ Refresh token present: %s", bool(refresh_token))
 
     result = {
         "has_access_token": bool(access_token),
@@ -58,9 +58,9 @@ async def auth_status(request: Request):
                 "token_expires": payload.get("exp")
             })
         except Exception as e:  
-                logger.error(f"❌ AUTH STATUS: Access token validation failed: {str(e)}")
+                logger.error("❌ AUTH STATUS: Access token validation failed: %s", e)
                 result["token_error"] = str(e)
     else:
-        logger.info(f"ℹ️  AUTH STATUS: No access token to validate")
+        logger.debug("ℹ️  AUTH STATUS: No access token to validate")
     
     return result
@@ -1,14 +1,23 @@
 # links.py - API endpoints
-from fastapi import APIRouter , HTTPException , Request 
+from fastapi import APIRouter , HTTPException , Request , Query
 from app.exceptions.httpExceptionsSearch import *
 from app.exceptions.httpExceptionsSave import *
 from app.schema.link_schema import Link as link_schema
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 # from langchain_core.documents import Document
 from app.services.pinecone_service import *
 from app.services.memories_service import *
-from app.core.rate_limiter import limiter
-from pydantic import BaseModel
+from app.core.config import settings
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse, paged_response
+from app.core.data_version import get_data_version, make_etag, user_etag, etag_matches, not_modified, cache_headers
+from app.services.suggest_service import suggest_index
+from app.services.keyword_search_service import keyword_search_page
+from app.core.pinecone_wrapper import pinecone_wrapper
+from app.utils.collection_extractor import normalize_tags
+from app.utils.timestamps import RangeEnd, RangeStart
+from app.exceptions.global_exceptions import DatabaseConnectionError
+from pydantic import BaseModel, Field
 
 # https://hippocampus-backend.onrender.com/links/save for saving links
 # https://hippocampus-backend.onrender.com/links/search for searching links
@@ -21,9 +30,40 @@ router = APIRouter(
 class SearchRequest(BaseModel):
     query: str
     filter: Optional[Dict] = None
+    # Documents with any of these tags; @tags in the query are added to them
+    tags: Optional[List[str]] = None
+    # Saved in this range: epoch seconds or ISO 8601 dates, inclusive
+    date_from: Optional[RangeStart] = Field(default=None, alias="from")
+    date_to: Optional[RangeEnd] = Field(default=None, alias="to")
+    top_k: int = Field(default=10, ge=1, le=MAX_SEARCH_TOP_K)
+    offset: int = Field(default=0, ge=0)
+    min_score: Optional[float] = Field(default=None, ge=-1.0, le=1.0)
+    # True for all metadata, False for none, or a list of metadata fields
+    include_metadata: Union[bool, List[str]] = True
+
+class BatchQuery(BaseModel):
+    query: str
+    # Name the result is returned under; defaults to the query text
+    key: Optional[str] = None
+    collection: Optional[str] = None
+    tags: Optional[List[str]] = None
+    date_from: Optional[RangeStart] = Field(default=None, alias="from")
+    date_to: Optional[RangeEnd] = Field(default=None, alias="to")
+    filter: Optional[Dict] = None
+    top_k: int = Field(default=10, ge=1, le=MAX_SEARCH_TOP_K)
+    offset: int = Field(default=0, ge=0)
+    min_score: Optional[float] = Field(default=None, ge=-1.0, le=1.0)
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(min_length=1, max_length=settings.SEARCH_BATCH_MAX_QUERIES)
+    include_metadata: Union[bool, List[str]] = True
+
+def _batch_search_cost(kwargs) -> int:
+    # One embedding call for the whole batch, one vector query per entry
+    return RouteCost.EMBED + RouteCost.VECTOR_QUERY * len(kwargs["batch_request"].queries)
 
 @router.post("/save")
-@limiter.limit("10/minute")
+@limiter.limit("10/minute", cost=RouteCost.EMBED + RouteCost.VECTOR_WRITE + RouteCost.MONGO_WRITE)
 async def save_link(
     link_data: link_schema,
     request: Request
@@ -35,23 +75,21 @@ async def save_link(
         raise HTTPException(status_code=401, detail="Authentication required")
     
     try:
-        logger.info(f"Attempting to save document for user {user_id}")
         result = await save_to_vector_db(obj=link_data, namespace=user_id)
-        logger.info(f"Successfully saved document for user {user_id}")
         return result
     except DocumentSaveError as e:
-        logger.error(f"Document save failed for user {e.user_id}: {str(e)}", exc_info=True)
+        logger.error("Document save failed for user %s: %s", e.user_id, e, exc_info=True)
         status_code = 400 if isinstance(e, InvalidURLError) else 503
         raise HTTPException(status_code=status_code, detail=str(e))
     except ValidationError as e:
-        logger.error(f"Invalid document data for user {user_id}: {str(e)}")
+        logger.error("Invalid document data for user %s: %s", user_id, e)
         raise HTTPException(status_code=422, detail="Invalid document format")
     except Exception as e:
-        logger.critical(f"Unexpected error saving document for user {user_id}: {str(e)}", exc_info=True)
+        logger.critical("Unexpected error saving document for user %s: %s", user_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/search")
-@limiter.limit("15/minute")
+@router.post("/search", response_class=FastJSONResponse)
+@limiter.limit("15/minute", cost=RouteCost.EMBED + RouteCost.VECTOR_QUERY)
 async def search_links(
     search_request: SearchRequest,
     request: Request,
@@ -62,143 +100,270 @@ async def search_links(
         logger.warning("Unauthorized search attempt - missing user ID")
         raise HTTPException(status_code=401, detail="Authentication required")
 
+    # Pinecone marked unhealthy: answer from the text index instead of waiting out its retries
+    if not pinecone_wrapper.allow_request():
+        return await _keyword_fallback(search_request, user_id, "Vector database service unavailable")
+
     try:
-        logger.info(f"🔍 SEARCH: Starting search request for user {user_id}")
-        logger.info(f"📝 SEARCH: Original query received: '{search_request.query}'")
-        logger.info(f"🎯 SEARCH: Filter received: {search_request.filter}")
-        
-        # Extract @collection pattern if present
-        from app.utils.collection_extractor import extract_collection_from_text, remove_collection_pattern_from_text
-        
-        extracted_collection = extract_collection_from_text(search_request.query)
-        cleaned_query = remove_collection_pattern_from_text(search_request.query)
-        
-        logger.info(f"🔍 SEARCH: Extracted collection from query: '{extracted_collection}'")
-        logger.info(f"🧹 SEARCH: Cleaned query after removing @collection: '{cleaned_query}'")
-        
-        # Use cleaned query for search
-        final_query = cleaned_query if cleaned_query else search_request.query
-        final_filter = search_request.filter
+        # @tags in the query become a tag filter in search_page
+        result, next_offset = await search_page(
+            query=search_request.query,
+            namespace=user_id,
+            filter=search_request.filter,
+            top_k=search_request.top_k,
+            offset=search_request.offset,
+            min_score=search_request.min_score,
+            include_metadata=search_request.include_metadata,
+            tags=search_request.tags,
+            date_from=search_request.date_from,
+            date_to=search_request.date_to
+        )
         
-        # If collection was extracted and no filter exists, create one
-        if extracted_collection and not final_filter:
-            final_filter = {"collection": {"$eq": extracted_collection}}
-            logger.info(f"🎯 SEARCH: Created filter from extracted collection: {final_filter}")
-        elif extracted_collection and final_filter:
-            logger.info(f"🎯 SEARCH: Collection extracted but filter already exists, using existing filter")
+        logger.debug("📥 SEARCH: %s results for user %s", len(result), user_id)
         
-        logger.info(f"📤 SEARCH: Final search parameters:")
-        logger.info(f"   ├─ Query: '{final_query}'")
-        logger.info(f"   ├─ Filter: {final_filter}")
-        logger.info(f"   └─ Namespace: {user_id}")
-        
-        result = await search_vector_db(query=final_query, namespace=user_id, filter=final_filter)
-        
-        logger.info(f"📥 SEARCH: Search completed successfully for user {user_id}")
-        logger.info(f"📊 SEARCH: Results count: {len(result) if isinstance(result, list) else 'Unknown'}")
-        
-        return result
+        return paged_response(result, next_offset)
     except InvalidRequestError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except (MissingNamespaceError, SearchExecutionError) as e:
+    except MissingNamespaceError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except VectorDBConnectionError as e:
+    except (SearchExecutionError, VectorDBConnectionError) as e:
+        return await _keyword_fallback(search_request, user_id, str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+async def _keyword_fallback(search_request: SearchRequest, user_id: str, unavailable: str):
+    """
+    Degraded /links/search: keyword results, marked by X-Search-Mode: keyword.
+    min_score is not applied, text scores are not similarities. Answers 503
+    with `unavailable` when the query cannot be keyword searched either.
+    """
+    logger.warning("🔤 SEARCH: Pinecone unavailable, keyword search for user %s", user_id)
+    try:
+        result, next_offset = await keyword_search_page(
+            query=search_request.query,
+            namespace=user_id,
+            filter=search_request.filter,
+            top_k=search_request.top_k,
+            offset=search_request.offset,
+            include_metadata=search_request.include_metadata,
+            tags=search_request.tags,
+            date_from=search_request.date_from,
+            date_to=search_request.date_to
+        )
+    except Exception as e:
+        logger.error("Keyword fallback failed for user %s: %s", user_id, e)
+        raise HTTPException(status_code=503, detail=unavailable)
+    response = paged_response(result, next_offset)
+    response.headers["X-Search-Mode"] = "keyword"
+    return response
+
+@router.get("/search/keyword", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=2 * RouteCost.MONGO_READ)
+async def keyword_search_links(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=500),
+    tags: Optional[List[str]] = Query(default=None, description="Only results with any of these tags"),
+    date_from: Optional[RangeStart] = Query(default=None, alias="from", description="Saved at or after: epoch seconds or ISO 8601"),
+    date_to: Optional[RangeEnd] = Query(default=None, alias="to", description="Saved at or before: epoch seconds or ISO 8601"),
+    top_k: int = Query(default=10, ge=1, le=MAX_SEARCH_TOP_K),
+    offset: int = Query(default=0, ge=0)
+):
+    """
+    Search bookmarks and notes by their words, with no embedding or vector
+    query; "quoted phrases" match exactly and -word excludes. Pages like
+    /links/search.
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized keyword search attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        result, next_offset = await keyword_search_page(
+            query=q,
+            namespace=user_id,
+            top_k=top_k,
+            offset=offset,
+            tags=tags,
+            date_from=date_from,
+            date_to=date_to
+        )
+        logger.debug("📥 KEYWORD: %s results for user %s", len(result), user_id)
+        return paged_response(result, next_offset)
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    except Exception as e:
+        logger.error("Keyword search failed for user %s: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/search/batch", response_class=FastJSONResponse)
+@limiter.limit("10/minute", cost=_batch_search_cost)
+async def search_links_batch(
+    batch_request: BatchSearchRequest,
+    request: Request,
+):
+    """Run several searches at once; results are keyed by query (or its `key`)"""
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized batch search attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        results = await search_batch(
+            queries=[query.model_dump() for query in batch_request.queries],
+            namespace=user_id,
+            include_metadata=batch_request.include_metadata
+        )
+        return FastJSONResponse(results)
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (SearchExecutionError, VectorDBConnectionError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Batch search failed for user %s: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{doc_id}/similar", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=2 * RouteCost.VECTOR_QUERY)
+async def similar_links(
+    doc_id: str,
+    request: Request,
+    top_k: int = Query(default=10, ge=1, le=MAX_SEARCH_TOP_K)
+):
+    """
+    Bookmarks and notes most like one of the user's own, found with its
+    stored vector (no embedding). Cached until the user's next write.
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized similar attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    # One version read serves both the ETag and the cache lookup
+    version = await get_data_version(user_id)
+    etag = make_etag("similar", version) if version else None
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        result = await similar_cache.get(
+            (user_id, doc_id, top_k), version, lambda: similar_documents(doc_id, user_id, top_k)
+        )
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (SearchExecutionError, VectorDBConnectionError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Similar search failed for user %s: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return FastJSONResponse(result, headers=cache_headers(etag))
+
+@router.get("/suggest", response_class=FastJSONResponse)
+@limiter.limit("120/minute", cost=RouteCost.MONGO_READ)
+async def suggest_links(
+    request: Request,
+    q: str = Query(..., max_length=100),
+    limit: int = Query(default=8, ge=1, le=settings.SUGGEST_MAX_RESULTS),
+):
+    """Prefix suggestions over titles, site names and collections, for search-as-you-type"""
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized suggest attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        return FastJSONResponse(await suggest_index.suggest(user_id, q, limit))
+    except DatabaseConnectionError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.error("Suggest failed for user %s: %s", user_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/delete")
-@limiter.limit("15/minute")
+@limiter.limit("15/minute", cost=RouteCost.MONGO_WRITE)
 async def delete_link(
     doc_id_pincone: str,
     request: Request
 ):
-    """Delete a link/bookmark with comprehensive logging for debugging"""
-    # Log the initial request details
-    logger.info(f"=== DELETE REQUEST STARTED ===")
-    logger.info(f"Received delete request for doc_id_pincone: '{doc_id_pincone}'")
-    logger.info(f"Request URL: {request.url}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Query params: {dict(request.query_params)}")
-    
+    """Move a link/bookmark to the trash; see /trash to restore or purge it"""
     # Validate doc_id_pincone parameter
     if not doc_id_pincone or doc_id_pincone.strip() == "":
-        logger.error(f"Empty doc_id_pincone received: '{doc_id_pincone}'")
+        logger.error("Empty doc_id_pincone received: '%s'", doc_id_pincone)
         raise HTTPException(status_code=400, detail="Document ID is required and cannot be empty")
     
     if doc_id_pincone == "undefined" or doc_id_pincone == "null":
-        logger.error(f"Invalid doc_id_pincone received: '{doc_id_pincone}' - Frontend is sending undefined/null value")
+        logger.error("Invalid doc_id_pincone received: '%s' - Frontend is sending undefined/null value", doc_id_pincone)
         raise HTTPException(status_code=400, detail="Invalid document ID: Frontend sent undefined/null value")
     
-    logger.info(f"doc_id_pincone validation passed: '{doc_id_pincone}'")
-    
     # Validate user authentication
     user_id = getattr(request.state, 'user_id', None)
     if not user_id:
         logger.warning("Unauthorized delete attempt - missing user ID")
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    logger.info(f"User authentication passed - user_id: '{user_id}'")
-    
     try:
-        logger.info(f"=== STARTING DELETE OPERATIONS ===")
-        logger.info(f"Attempting to delete document '{doc_id_pincone}' for user '{user_id}'")
-        
-        # Step 1: Delete from vector database
-        logger.info(f"STEP 1: Deleting from vector database...")
-        vector_result = await delete_from_vector_db(doc_id=doc_id_pincone, namespace=user_id)
-        logger.info(f"STEP 1 SUCCESS: Vector database deletion completed: {vector_result}")
-        
-        # Step 2: Delete from regular database
-        logger.info(f"STEP 2: Deleting from regular database...")
-        db_result = await delete_from_db(doc_id_pincone)
-        logger.info(f"STEP 2 SUCCESS: Regular database deletion completed: {db_result}")
+        result = await delete_bookmark(doc_id=doc_id_pincone, namespace=user_id)
         
-        logger.info(f"=== DELETE OPERATIONS COMPLETED SUCCESSFULLY ===")
-        logger.info(f"Successfully deleted document '{doc_id_pincone}' for user '{user_id}'")
+        logger.info("Trashed document '%s' for user '%s'", doc_id_pincone, user_id)
         
         return {
             "status": "success",
-            "message": "Document deleted successfully",
+            "message": "Document moved to trash",
             "doc_id": doc_id_pincone,
-            "vector_result": vector_result,
-            "db_result": db_result
+            "deleted_at": result["deleted_at"],
+            "purge_after": result["purge_after"]
         }
         
     except InvalidRequestError as e:
-        logger.error(f"DELETE FAILED: Invalid request - {str(e)}")
+        logger.error("DELETE FAILED: Invalid request - %s", e)
         raise HTTPException(status_code=400, detail=str(e))
+    except DocumentNotFoundError as e:
+        logger.warning("DELETE FAILED: %s (%s)", e, doc_id_pincone)
+        raise HTTPException(status_code=404, detail="Document not found")
     except VectorDBConnectionError as e:
-        logger.error(f"DELETE FAILED: Vector database connection error - {str(e)}")
+        logger.error("DELETE FAILED: Vector database connection error - %s", e)
         raise HTTPException(status_code=503, detail=f"Vector database unavailable: {str(e)}")
     except DocumentStorageError as e:
-        logger.error(f"DELETE FAILED: Document storage error - {str(e)}")
+        logger.error("DELETE FAILED: Document storage error - %s", e)
         raise HTTPException(status_code=503, detail=f"Storage service error: {str(e)}")
     except Exception as e:
-        logger.critical(f"DELETE FAILED: Unexpected error deleting document '{doc_id_pincone}' for user '{user_id}': {str(e)}", exc_info=True)
+        logger.critical("DELETE FAILED: Unexpected error deleting document '%s' for user '%s': %s", doc_id_pincone, user_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error during deletion")
 
-@router.get("/get")
-@limiter.limit("20/minute")
-async def get_all_bookmarks(request: Request):
+@router.get("/get", response_class=FastJSONResponse)
+@limiter.limit("20/minute", cost=RouteCost.MONGO_READ)
+async def get_all_bookmarks(
+    request: Request,
+    tags: Optional[List[str]] = Query(default=None, description="Only bookmarks with any of these tags"),
+    date_from: Optional[RangeStart] = Query(default=None, alias="from", description="Saved at or after: epoch seconds or ISO 8601"),
+    date_to: Optional[RangeEnd] = Query(default=None, alias="to", description="Saved at or before: epoch seconds or ISO 8601")
+):
     user_id = getattr(request.state, 'user_id', None)
     if not user_id:
         logger.warning("Unauthorized get attempt - missing user ID")
         raise HTTPException(status_code=401, detail="Authentication required")
     
+    etag = await user_etag("links", user_id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
     try:
-        logger.info(f"Attempting to get all documents for user {user_id}")
-        result = await get_all_bookmarks_from_db(user_id)
-        logger.info(f"Successfully retrieved all documents for user {user_id}")
-        return result
+        result = await get_all_bookmarks_from_db(user_id, normalize_tags(tags), date_from, date_to)
+        logger.debug("Retrieved %d documents for user %s", len(result), user_id)
+        return FastJSONResponse(result, headers=cache_headers(etag))
     except DocumentSaveError as e:
-        logger.error(f"Document save failed for user {e.user_id}: {str(e)}", exc_info=True)
+        logger.error("Document save failed for user %s: %s", e.user_id, e, exc_info=True)
         status_code = 400 if isinstance(e, InvalidURLError) else 503
         raise HTTPException(status_code=status_code, detail=str(e))
     except ValidationError as e:
-        logger.error(f"Invalid document data for user {user_id}: {str(e)}")
+        logger.error("Invalid document data for user %s: %s", user_id, e)
         raise HTTPException(status_code=422, detail="Invalid document format")  
     except Exception as e:
-        logger.critical(f"Unexpected error saving document for user {user_id}: {str(e)}", exc_info=True)
+        logger.critical("Unexpected error saving document for user %s: %s", user_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
     
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Request
-from typing import List, Dict, Any
-from app.services.user_collections_service import get_user_collections
-from app.core.rate_limiter import limiter
+from app.services.user_collections_service import get_user_collections, collections_etag
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse
+from app.core.data_version import etag_matches, not_modified, cache_headers
 from app.exceptions.global_exceptions import DatabaseConnectionError
 import logging
 
@@ -12,8 +13,8 @@ router = APIRouter(
     tags=["Collections"]
 )
 
-@router.get("/", response_model=List[Dict[str, Any]])
-@limiter.limit("30/minute")
+@router.get("/", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=RouteCost.MONGO_READ)
 async def get_user_collections_endpoint(request: Request):
     """
     Get all collections with memory counts for the authenticated user.
@@ -28,20 +29,22 @@ async def get_user_collections_endpoint(request: Request):
             logger.warning("Unauthorized collections request - missing user ID")
             raise HTTPException(status_code=401, detail="Authentication required")
         
-        logger.info(f"📚 COLLECTIONS: Getting collections for user {user_id}")
-        
+        etag = await collections_etag(user_id)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+
         # Get user's collections from database
         collections = await get_user_collections(user_id)
         
-        logger.info(f"📚 COLLECTIONS: Successfully retrieved {len(collections)} collections for user {user_id}")
-        return collections
+        logger.debug("📚 COLLECTIONS: Retrieved %d collections for user %s", len(collections), user_id)
+        return FastJSONResponse(collections, headers=cache_headers(etag))
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise HTTPException(status_code=503, detail="Database service unavailable")
     except Exception as e:
-        logger.error(f"Unexpected error retrieving collections: {str(e)}", exc_info=True)
+        logger.error("Unexpected error retrieving collections: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,12 +1,39 @@
-from fastapi import APIRouter 
+from fastapi import APIRouter, Request, Response
 from app.services.quotesService import get_quotes
+from app.core.responses import FastJSONResponse
+from app.core.data_version import etag_matches, not_modified
+from app.core.compression import available_encodings, choose_encoding, compress
+import hashlib
 
 router = APIRouter(
     prefix="/quotes",
     tags=["quotes"]
 )
 
-@router.get("/")
-async def get_random_quote():
-    return get_quotes()
-    
+# The quotes are static for the lifetime of a deploy: render them once and
+# let clients cache them, revalidating against the content hash afterwards
+_QUOTES_BODY = FastJSONResponse(get_quotes()).body
+_QUOTES_ETAG = f'"{hashlib.sha256(_QUOTES_BODY).hexdigest()[:32]}"'
+_QUOTES_CACHE_HEADERS = {"Cache-Control": "public, max-age=86400", "Vary": "Accept-Encoding"}
+
+# Compressed once per encoding on first request instead of on every response
+_compressed_bodies = {}
+
+@router.get("/", response_class=FastJSONResponse)
+async def get_random_quote(request: Request):
+    if etag_matches(request, _QUOTES_ETAG):
+        return not_modified(_QUOTES_ETAG, _QUOTES_CACHE_HEADERS)
+    encoding = choose_encoding(request.headers.get("accept-encoding"), available_encodings())
+    if encoding is None:
+        return Response(
+            content=_QUOTES_BODY,
+            media_type="application/json",
+            headers={"ETag": _QUOTES_ETAG, **_QUOTES_CACHE_HEADERS}
+        )
+    if encoding not in _compressed_bodies:
+        _compressed_bodies[encoding] = compress(_QUOTES_BODY, encoding)
+    return Response(
+        content=_compressed_bodies[encoding],
+        media_type="application/json",
+        headers={"ETag": f"W/{_QUOTES_ETAG}", "Content-Encoding": encoding, **_QUOTES_CACHE_HEADERS}
+    )
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from app.services.library_service import (
+    ArchiveTooLargeError,
+    export_library,
+    import_library,
+    iter_lines,
+)
+from app.core.config import settings
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse
+from app.exceptions.global_exceptions import DatabaseConnectionError, ExternalServiceError
+from app.exceptions.httpExceptionsSearch import InvalidRequestError
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/library",
+    tags=["Library"]
+)
+
+@router.get("/export")
+@limiter.limit("5/hour", cost=RouteCost.MONGO_READ + RouteCost.VECTOR_QUERY)
+async def export_library_endpoint(request: Request):
+    """
+    Stream the user's bookmarks, notes, collections and vectors as an
+    NDJSON archive that /library/import restores without re-embedding.
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized export attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    archive = export_library(user_id)
+    try:
+        # Produce the header before answering, so Mongo failures still get a status code
+        first = await archive.__anext__()
+    except (DatabaseConnectionError, ExternalServiceError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Export failed for user %s: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def body():
+        yield first
+        async for chunk in archive:
+            yield chunk
+
+    filename = f"hippocampus-library-{datetime.now():%Y%m%d}.ndjson"
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/import", response_class=FastJSONResponse)
+@limiter.limit("5/hour", cost=RouteCost.VECTOR_WRITE + RouteCost.MONGO_WRITE)
+async def import_library_endpoint(request: Request):
+    """
+    Restore an archive from /library/export into the user's library.
+    The body is the NDJSON archive; documents the user already has are skipped.
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized import attempt - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    try:
+        lines = iter_lines(request.stream(), settings.IMPORT_MAX_BYTES)
+        return FastJSONResponse(await import_library(user_id, lines))
+    except ArchiveTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (DatabaseConnectionError, ExternalServiceError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Import failed for user %s: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
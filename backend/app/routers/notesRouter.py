@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends , Request, HTTPException
-from app.schema.notesSchema import NoteSchema
+from fastapi import APIRouter, Depends , Request, HTTPException, Query
+from typing import List, Optional
+from app.schema.notesSchema import NoteSchema, NoteUpdateSchema
 from app.services.notes_service import *
 from app.exceptions.global_exceptions import create_error_response
-from app.core.rate_limiter import limiter
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse, paged_response
+from app.core.data_version import user_etag, etag_matches, not_modified, cache_headers
+from app.utils.collection_extractor import normalize_tags
+from app.utils.timestamps import RangeEnd, RangeStart
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,9 +17,14 @@ router = APIRouter(
     tags=["notes"]
 )
 
-@router.get("/")
-@limiter.limit("20/minute")
-async def get_all_notes(request: Request):
+@router.get("/", response_class=FastJSONResponse)
+@limiter.limit("20/minute", cost=RouteCost.MONGO_READ)
+async def get_all_notes(
+    request: Request,
+    tags: Optional[List[str]] = Query(default=None, description="Only notes with any of these tags"),
+    date_from: Optional[RangeStart] = Query(default=None, alias="from", description="Saved at or after: epoch seconds or ISO 8601"),
+    date_to: Optional[RangeEnd] = Query(default=None, alias="to", description="Saved at or before: epoch seconds or ISO 8601")
+):
     """
     Get all notes for a user with enhanced error handling.
     """
@@ -28,27 +38,30 @@ async def get_all_notes(request: Request):
                 error_type="auth_error"
             )
 
-        logger.info(f"Retrieving all notes for user {user_id}")
-        result = await get_all_notes_from_db(user_id)
-        logger.info(f"Successfully retrieved {len(result)} notes for user {user_id}")
-        return result
+        etag = await user_etag("notes", user_id)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+
+        result = await get_all_notes_from_db(user_id, normalize_tags(tags), date_from, date_to)
+        logger.debug("Retrieved %d notes for user %s", len(result), user_id)
+        return FastJSONResponse(result, headers=cache_headers(etag))
 
     except ValidationError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         return create_error_response(
             str(e),
             status_code=422,
             error_type="validation_error"
         )
     except DatabaseError as e:
-        logger.error(f"Database error retrieving notes: {str(e)}")
+        logger.error("Database error retrieving notes: %s", e)
         return create_error_response(
             "Unable to retrieve notes at this time",
             status_code=503,
             error_type="database_error"
         )
     except Exception as e:
-        logger.error(f"Unexpected error retrieving notes: {str(e)}", exc_info=True)
+        logger.error("Unexpected error retrieving notes: %s", e, exc_info=True)
         return create_error_response(
             "An unexpected error occurred",
             status_code=500,
@@ -56,7 +69,7 @@ async def get_all_notes(request: Request):
         )
 
 @router.post("/")
-@limiter.limit("15/minute")
+@limiter.limit("15/minute", cost=RouteCost.EMBED + RouteCost.VECTOR_WRITE + RouteCost.MONGO_WRITE)
 async def create_new_note(note: NoteSchema, request: Request):
     """
     Create a new note for a user with enhanced error handling.
@@ -71,48 +84,99 @@ async def create_new_note(note: NoteSchema, request: Request):
                 error_type="auth_error"
             )
 
-        logger.info(f"Creating new note for user {user_id}")
         result = await create_note(note, user_id)
-        logger.info(f"Successfully created note for user {user_id}")
+        logger.info("Created note %s for user %s", result.get("doc_id"), user_id)
         return result
 
     except ValidationError as e:
-        logger.error(f"Validation error creating note: {str(e)}")
+        logger.error("Validation error creating note: %s", e)
         return create_error_response(
             str(e),
             status_code=422,
             error_type="validation_error"
         )
     except DocumentStorageError as e:
-        logger.error(f"Storage error creating note: {str(e)}")
+        logger.error("Storage error creating note: %s", e)
         return create_error_response(
             "Unable to save note at this time",
             status_code=503,
             error_type="storage_error"
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating note: {str(e)}", exc_info=True)
+        logger.error("Unexpected error creating note: %s", e, exc_info=True)
         return create_error_response(
             "An unexpected error occurred",
             status_code=500,
             error_type="internal_error"
         )
 
+def _update_note_cost(kwargs) -> int:
+    # Worst case re-embeds; metadata-only updates could be cheaper, but the
+    # stored note is only read inside the handler
+    note = kwargs["note"]
+    cost = RouteCost.VECTOR_WRITE + RouteCost.MONGO_READ + RouteCost.MONGO_WRITE
+    if note.title is not None or note.note is not None:
+        cost += RouteCost.EMBED
+    return cost
+
 @router.put("/{note_id}")
-@limiter.limit("15/minute")
-async def update_existing_note(note_id: str, note: dict, request: Request):
+@limiter.limit("15/minute", cost=_update_note_cost)
+async def update_existing_note(note_id: str, note: NoteUpdateSchema, request: Request):
     """
-    Update an existing note for a user.
+    Update an existing note for a user. Only the given fields change.
     """
     user_id = getattr(request.state, 'user_id', None)
     if not user_id:
         logger.warning("Unauthorized update attempt - missing user ID")
         raise HTTPException(status_code=401, detail="Authentication required")
-    return await update_note(note_id, note, user_id)
 
-@router.post("/search")
-@limiter.limit("15/minute")
-async def search_notes_by_query(request: Request, query: str , filter: dict = None):
+    try:
+        result = await update_note(note_id, note, user_id)
+        logger.info("Updated note %s for user %s (%s)", note_id, user_id, result["status"])
+        return result
+
+    except DocumentNotFoundError as e:
+        return create_error_response(
+            str(e),
+            status_code=404,
+            error_type="not_found"
+        )
+    except ValidationError as e:
+        logger.error("Validation error updating note: %s", e)
+        return create_error_response(
+            str(e),
+            status_code=422,
+            error_type="validation_error"
+        )
+    except (DocumentStorageError, DatabaseError) as e:
+        logger.error("Storage error updating note: %s", e)
+        return create_error_response(
+            "Unable to update note at this time",
+            status_code=503,
+            error_type="storage_error"
+        )
+    except Exception as e:
+        logger.error("Unexpected error updating note: %s", e, exc_info=True)
+        return create_error_response(
+            "An unexpected error occurred",
+            status_code=500,
+            error_type="internal_error"
+        )
+
+@router.post("/search", response_class=FastJSONResponse)
+@limiter.limit("15/minute", cost=RouteCost.EMBED + RouteCost.VECTOR_QUERY)
+async def search_notes_by_query(
+    request: Request,
+    query: str,
+    filter: dict = None,
+    top_k: int = Query(default=10, ge=1, le=MAX_SEARCH_TOP_K),
+    offset: int = Query(default=0, ge=0),
+    min_score: Optional[float] = Query(default=None, ge=-1.0, le=1.0),
+    fields: Optional[List[str]] = Query(default=None, description="Metadata fields to return; all when omitted"),
+    tags: Optional[List[str]] = Query(default=None, description="Only notes with any of these tags"),
+    date_from: Optional[RangeStart] = Query(default=None, alias="from", description="Saved at or after: epoch seconds or ISO 8601"),
+    date_to: Optional[RangeEnd] = Query(default=None, alias="to", description="Saved at or before: epoch seconds or ISO 8601")
+):
     """
     Search notes for a user based on a query string.
     """
@@ -120,13 +184,30 @@ async def search_notes_by_query(request: Request, query: str , filter: dict = No
     if not user_id:
         logger.warning("Unauthorized search attempt - missing user ID")
         raise HTTPException(status_code=401, detail="Authentication required")
-    return await search_notes(query=query, namespace=user_id, filter=filter)
+    try:
+        documents, next_offset = await search_page(
+            query=query,
+            namespace=user_id,
+            filter=filter,
+            top_k=top_k,
+            offset=offset,
+            min_score=min_score,
+            include_metadata=fields if fields else True,
+            tags=tags,
+            date_from=date_from,
+            date_to=date_to
+        )
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SearchExecutionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return paged_response(documents, next_offset)
 
 @router.delete("/{note_id}")
-@limiter.limit("15/minute")
+@limiter.limit("15/minute", cost=RouteCost.MONGO_WRITE)
 async def delete_existing_note(request: Request, note_id: str):
     """
-    Delete an existing note for a user.
+    Move an existing note to the trash.
     """
     user_id = getattr(request.state, 'user_id', None)
     if not user_id:
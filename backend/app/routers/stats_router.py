@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.services.stats_service import compute_facets, facet_cache
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse
+from app.core.data_version import get_data_version, make_etag, etag_matches, not_modified, cache_headers
+from app.exceptions.global_exceptions import DatabaseConnectionError
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Stats"]
+)
+
+@router.get("/facets", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=RouteCost.MONGO_READ)
+async def get_facets(request: Request):
+    """
+    Counts of the user's bookmarks and notes by collection, tag, site, type
+    and month, for the dashboard sidebar.
+
+    Returns:
+        Dict: 'total' plus one list of {'value', 'count'} per facet
+    """
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized facets request - missing user ID")
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    # One version read serves both the ETag and the cache lookup
+    version = await get_data_version(user_id)
+    etag = make_etag("facets", version) if version else None
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        facets = await facet_cache.get(user_id, version, lambda: compute_facets(user_id))
+        return FastJSONResponse(facets, headers=cache_headers(etag))
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    except Exception as e:
+        logger.error("Unexpected error computing facets: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
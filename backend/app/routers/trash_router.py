@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.services.trash_service import list_trash, purge_document, restore_document
+from app.core.rate_limiter import limiter, RouteCost
+from app.core.responses import FastJSONResponse
+from app.exceptions.global_exceptions import DatabaseConnectionError, ExternalServiceError
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/trash",
+    tags=["Trash"]
+)
+
+def _require_user(request: Request, action: str) -> str:
+    user_id = getattr(request.state, 'user_id', None)
+    if not user_id:
+        logger.warning("Unauthorized trash %s attempt - missing user ID", action)
+        raise HTTPException(status_code=401, detail="Authentication required")
+    return user_id
+
+@router.get("/", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=RouteCost.MONGO_READ)
+async def get_trash(request: Request):
+    """
+    List the user's trashed bookmarks and notes, most recently deleted first.
+    Each item carries `deleted_at` and `purge_after`.
+    """
+    user_id = _require_user(request, "list")
+    try:
+        return FastJSONResponse(await list_trash(user_id))
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise HTTPException(status_code=503, detail="Database service unavailable")
+    except Exception as e:
+        logger.error("Unexpected error listing trash: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/{doc_id}/restore", response_class=FastJSONResponse)
+@limiter.limit("30/minute", cost=RouteCost.MONGO_WRITE)
+async def restore_from_trash(request: Request, doc_id: str):
+    """Restore a trashed bookmark or note; nothing is re-embedded"""
+    user_id = _require_user(request, "restore")
+    try:
+        restored = await restore_document(doc_id, user_id)
+    except (DatabaseConnectionError, ExternalServiceError) as e:
+        logger.error("RESTORE FAILED: %s", e)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Unexpected error restoring '%s': %s", doc_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if restored is None:
+        raise HTTPException(status_code=404, detail="Document not found in trash")
+    return FastJSONResponse({"status": "success", "message": "Document restored", "document": restored})
+
+@router.delete("/{doc_id}", response_class=FastJSONResponse)
+@limiter.limit("15/minute", cost=RouteCost.VECTOR_WRITE + RouteCost.MONGO_WRITE)
+async def purge_from_trash(request: Request, doc_id: str):
+    """Delete a bookmark or note and its vector permanently, without waiting for the purge"""
+    user_id = _require_user(request, "purge")
+    try:
+        result = await purge_document(doc_id, user_id)
+    except (DatabaseConnectionError, ExternalServiceError) as e:
+        logger.error("PURGE FAILED: %s", e)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error("Unexpected error purging '%s': %s", doc_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return FastJSONResponse({
+        "status": "success",
+        "message": "Document deleted permanently",
+        "doc_id": doc_id,
+        "kind": result["kind"],
+        "repair_pending": result["repair"]
+    })
@@ -1,8 +1,12 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 class Link(BaseModel):
     title: str
     note: str
     link: str
-    
-
+    # When SAVE_DUPLICATE_THRESHOLD is set, what a save of a near-duplicate
+    # of a bookmark does: return that bookmark, add this save's tags to it,
+    # or store a copy anyway
+    on_duplicate: Literal["existing", "merge", "save"] = "existing"
@@ -1,7 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class NoteSchema(BaseModel):
     title: str
     note: str
+    collection: Optional[str] = None
+
+class NoteUpdateSchema(BaseModel):
+    # Omitted fields keep their stored value
+    title: Optional[str] = Field(default=None, min_length=1)
+    note: Optional[str] = None
     collection: Optional[str] = None 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Keyword search over bookmarks and notes, on MongoDB text indexes.
+
+Lookups that need no semantics (an exact word from a note, part of a site
+name) skip the embedding and the vector query: each collection's text
+index over title, note and site_name (INDEXES in
+app/core/database_wrapper.py) is prefixed by user_id, so a search
+only reads the user's own entries. Results have the shape of vector
+search results, with Mongo's text score as `score`, which lets
+/links/search fall back to this while Pinecone is unavailable.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.database import live
+from app.core.database_wrapper import safe_collection_memories, safe_collection_notes
+from app.core.embeddings import EMBEDDED_VERSIONS, vector_metadata
+from app.exceptions.httpExceptionsSearch import InvalidRequestError
+from app.services.pinecone_service import paginate_matches, validate_search_window
+from app.utils.collection_extractor import normalize_tags, parse_tags, tags_filter
+from app.utils.timestamps import ts_filter
+
+logger = logging.getLogger(__name__)
+
+TEXT_SCORE = {"$meta": "textScore"}
+
+_PROJECTION = {"_id": 0, EMBEDDED_VERSIONS: 0, "score": TEXT_SCORE}
+
+# Operators of Pinecone metadata filters; they mean the same in Mongo
+_FILTER_OPERATORS = {"$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin", "$exists", "$and", "$or"}
+
+
+def _check_filter(filter: Any) -> None:
+    """Reject anything but a Pinecone-style metadata filter before it reaches Mongo"""
+    if isinstance(filter, list):
+        for item in filter:
+            _check_filter(item)
+    elif isinstance(filter, dict):
+        for key, value in filter.items():
+            if key.startswith("$") and key not in _FILTER_OPERATORS:
+                raise InvalidRequestError(f"Unsupported filter operator {key}")
+            _check_filter(value)
+
+
+async def keyword_search_page(
+    query: str,
+    namespace: Optional[str],
+    filter: Optional[Dict] = None,
+    top_k: int = 10,
+    offset: int = 0,
+    include_metadata=True,
+    tags: Optional[List[str]] = None,
+    date_from: Optional[int] = None,
+    date_to: Optional[int] = None
+) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Search the user's bookmarks and notes for the words in `query`.
+
+    Takes the arguments of search_page except min_score, since text scores
+    are not similarities, and returns one page the same way: documents
+    ordered by text score and the next page's offset (None when there are
+    no more results).
+    """
+    if not namespace:
+        raise InvalidRequestError("Missing user uuid - please login")
+
+    validate_search_window(top_k, offset, None)
+
+    query_tags, terms = parse_tags(query or "")
+    if not terms.strip():
+        raise InvalidRequestError("Keyword search query must not be empty")
+    _check_filter(filter)
+
+    conditions = live({
+        "user_id": namespace,
+        "$text": {"$search": terms},
+        **(tags_filter(normalize_tags(query_tags + (tags or []))) or {}),
+        **(ts_filter(date_from, date_to) or {}),
+    })
+    if filter:
+        conditions["$and"] = [filter]
+
+    # No offset across two collections: read the window up to the end of
+    # the page from both and merge by score, as Pinecone pages are cut
+    window = offset + top_k
+    results = await asyncio.gather(*(
+        collection.find(conditions, projection=_PROJECTION, sort=[("score", TEXT_SCORE)], limit=window)
+        for collection in (safe_collection_memories, safe_collection_notes)
+    ))
+    matches = sorted(
+        (
+            {"id": doc["doc_id"], "score": doc.pop("score"), "metadata": vector_metadata(doc)}
+            for docs in results for doc in docs
+        ),
+        key=lambda match: -match["score"],
+    )[:window]
+    logger.debug("🔤 KEYWORD: %d matches for user %s", len(matches), namespace)
+
+    return paginate_matches(matches, top_k, offset, None, include_metadata)
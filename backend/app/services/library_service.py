@@ -0,0 +1,277 @@
+"""
+Library export and import, vectors included, so a restore never re-embeds.
+
+The archive is NDJSON, one record per line:
+
+    {"type": "header", "format": "hippocampus-library", "version": 1, "user_id": ..., "model": ..., "dimension": ...}
+    {"type": "collections", "collections": [{"name": ..., "memory_count": ...}, ...]}
+    {"type": "bookmark" | "note", "doc": {...}, "vector": "<base64 float16>" | null}
+    {"type": "footer", "counts": {...}}
+
+Vectors are stored as little-endian float16, a quarter of their JSON size;
+the rounding error (~1e-3 relative) does not change cosine rankings in
+practice. Export reads Mongo once and fetches vectors from Pinecone in
+batches of EXPORT_FETCH_BATCH, fetching the next batch while the current
+one is written out. Import inserts documents with insert_many and upserts
+vectors in batches of IMPORT_BATCH_SIZE, with no embedding calls.
+"""
+import asyncio
+import base64
+import logging
+import struct
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.core.database import live
+from app.core.database_wrapper import safe_collection_memories, safe_collection_notes
+from app.core.embeddings import EMBEDDED_VERSIONS, EmbeddingVersion, search_version, vector_metadata
+from app.exceptions.httpExceptionsSearch import InvalidRequestError
+from app.services.user_collections_service import add_collection_to_user, add_memory_counts, get_user_collections
+from app.utils.collection_extractor import document_tags
+from app.utils.timestamps import date_to_ts
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "hippocampus-library"
+ARCHIVE_VERSION = 1
+
+_RECORD_TYPES = {"bookmark": "Bookmark", "note": "Note"}
+
+
+class ArchiveTooLargeError(InvalidRequestError):
+    """Raised when an uploaded archive exceeds IMPORT_MAX_BYTES"""
+
+
+def encode_vector(values: List[float]) -> str:
+    return base64.b64encode(struct.pack(f"<{len(values)}e", *values)).decode("ascii")
+
+
+def decode_vector(data: str, dimension: int) -> List[float]:
+    raw = base64.b64decode(data)
+    if len(raw) != dimension * 2:
+        raise InvalidRequestError(f"Vector has {len(raw) // 2} dimensions, expected {dimension}")
+    return list(struct.unpack(f"<{dimension}e", raw))
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return orjson.dumps(record, default=str) + b"\n"
+
+
+def _export_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in doc.items() if key not in ("_id", EMBEDDED_VERSIONS)}
+
+
+async def export_library(user_id: str) -> AsyncIterator[bytes]:
+    """Yield the archive for one user line by line"""
+    version = await search_version()
+    query = live({"user_id": user_id})
+    bookmarks, notes, collections = await asyncio.gather(
+        safe_collection_memories.find(query, projection={"_id": 0, EMBEDDED_VERSIONS: 0}),
+        safe_collection_notes.find(query, projection={"_id": 0, EMBEDDED_VERSIONS: 0}),
+        get_user_collections(user_id),
+    )
+
+    yield _line({
+        "type": "header",
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "user_id": user_id,
+        "model": version.model,
+        "dimension": version.dimension,
+        "vector_encoding": "float16-le-base64",
+        "exported_at": datetime.now().isoformat(),
+    })
+    yield _line({"type": "collections", "collections": collections})
+
+    records = [("bookmark", doc) for doc in bookmarks] + [("note", doc) for doc in notes]
+    batch_size = settings.EXPORT_FETCH_BATCH
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+    missing = 0
+
+    def fetch(batch):
+        ids = [doc["doc_id"] for _, doc in batch if doc.get("doc_id")]
+        return asyncio.ensure_future(version.safe_index.fetch(ids=ids, namespace=version.namespace))
+
+    next_fetch = fetch(batches[0]) if batches else None
+    try:
+        for i, batch in enumerate(batches):
+            vectors = await next_fetch
+            # Overlap the next Pinecone round trip with encoding this batch
+            next_fetch = fetch(batches[i + 1]) if i + 1 < len(batches) else None
+            chunk = []
+            for record_type, doc in batch:
+                values = vectors.get(doc.get("doc_id"))
+                if values is None:
+                    missing += 1
+                chunk.append(_line({
+                    "type": record_type,
+                    "doc": _export_doc(doc),
+                    "vector": encode_vector(values) if values is not None else None,
+                }))
+            yield b"".join(chunk)
+    finally:
+        # The client went away mid-download (the generator was closed) or a
+        # fetch failed: drop the look-ahead fetch instead of leaving it
+        # running, and read its error if it already failed so none is logged
+        if next_fetch is not None:
+            if not next_fetch.done():
+                next_fetch.cancel()
+            elif not next_fetch.cancelled():
+                next_fetch.exception()
+
+    yield _line({
+        "type": "footer",
+        "counts": {"bookmarks": len(bookmarks), "notes": len(notes), "missing_vectors": missing},
+    })
+    logger.info("Exported library for user %s: %d bookmarks, %d notes", user_id, len(bookmarks), len(notes))
+
+
+def _rekey(doc_id: str, source_user: Optional[str], user_id: str) -> str:
+    """
+    The importer's ID for an archived document. doc_ids are
+    "<user_id>-<timestamp>", Pinecone IDs are global and ownership is read
+    from the prefix (owns_document), so every imported ID is moved onto the
+    importer's prefix: the source user's prefix is replaced, and any other
+    ID (a crafted archive naming someone else's documents) is kept whole
+    behind it.
+    """
+    prefix = f"{user_id}-"
+    if source_user and doc_id.startswith(f"{source_user}-"):
+        return prefix + doc_id[len(source_user) + 1:]
+    if doc_id.startswith(prefix):
+        return doc_id
+    return prefix + doc_id
+
+
+class _ImportBatch:
+    def __init__(self):
+        self.docs: Dict[str, List[Dict[str, Any]]] = {"bookmark": [], "note": []}
+        self.vectors: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.docs["bookmark"]) + len(self.docs["note"])
+
+
+async def _flush(batch: _ImportBatch, version: EmbeddingVersion) -> None:
+    # Vectors first, as on save: a failure leaves no Mongo document without its vector
+    if batch.vectors:
+        await version.safe_index.upsert(vectors=batch.vectors, namespace=version.namespace)
+    for record_type, collection in (("bookmark", safe_collection_memories), ("note", safe_collection_notes)):
+        if batch.docs[record_type]:
+            await collection.insert_many(batch.docs[record_type], ordered=False)
+
+
+async def import_library(user_id: str, lines: AsyncIterator[bytes]) -> Dict[str, int]:
+    """
+    Load an archive into a user's library. Documents whose doc_id the user
+    already has are skipped, so re-running an import is safe. Documents
+    exported without a vector are imported but left for the re-index job.
+    """
+    version = await search_version()
+    header = None
+    archived_collections: List[str] = []
+    counts = {"bookmarks": 0, "notes": 0, "skipped": 0, "missing_vectors": 0}
+    collection_counts: Dict[str, int] = {}
+    batch = _ImportBatch()
+
+    existing = set()
+    for collection in (safe_collection_memories, safe_collection_notes):
+        for doc in await collection.find({"user_id": user_id}, projection={"_id": 0, "doc_id": 1}):
+            existing.add(doc.get("doc_id"))
+
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise InvalidRequestError(f"Invalid archive line: {e}")
+        record_type = record.get("type")
+
+        if header is None:
+            if record_type != "header" or record.get("format") != ARCHIVE_FORMAT:
+                raise InvalidRequestError("Not a library archive")
+            if record.get("version") != ARCHIVE_VERSION:
+                raise InvalidRequestError(f"Unsupported archive version {record.get('version')}")
+            if record.get("model") != version.model or record.get("dimension") != version.dimension:
+                raise InvalidRequestError(
+                    f"Archive vectors are from {record.get('model')} ({record.get('dimension')}d), "
+                    f"this server searches {version.model} ({version.dimension}d)"
+                )
+            header = record
+            continue
+
+        if record_type == "collections":
+            archived_collections = [c.get("name") for c in record.get("collections", []) if c.get("name")]
+            continue
+        if record_type not in _RECORD_TYPES:
+            continue
+
+        doc = dict(record.get("doc") or {})
+        if not doc.get("doc_id") or not doc.get("title"):
+            raise InvalidRequestError("Archive document without doc_id or title")
+        doc_id = _rekey(doc["doc_id"], header.get("user_id") or doc.get("user_id"), user_id)
+        if doc_id in existing:
+            counts["skipped"] += 1
+            continue
+        existing.add(doc_id)
+        doc.update({"doc_id": doc_id, "user_id": user_id, "namespace": user_id, "type": _RECORD_TYPES[record_type]})
+        doc.pop("_id", None)
+        # Archives exported before tags and epoch timestamps were stored
+        if "tags" not in doc:
+            doc["tags"] = document_tags(doc.get("note"), doc.get("collection"))
+        if "ts" not in doc and date_to_ts(doc.get("date")) is not None:
+            doc["ts"] = date_to_ts(doc.get("date"))
+
+        if record.get("vector"):
+            batch.vectors.append({
+                "id": doc_id,
+                "values": decode_vector(record["vector"], version.dimension),
+                "metadata": vector_metadata(doc),
+            })
+            doc[EMBEDDED_VERSIONS] = [version.name]
+        else:
+            counts["missing_vectors"] += 1
+        batch.docs[record_type].append(doc)
+        counts["bookmarks" if record_type == "bookmark" else "notes"] += 1
+
+        collection_name = doc.get("collection")
+        if collection_name and collection_name != "general":
+            collection_counts[collection_name] = collection_counts.get(collection_name, 0) + 1
+
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await _flush(batch, version)
+            batch = _ImportBatch()
+
+    if header is None:
+        raise InvalidRequestError("Empty archive")
+    if len(batch):
+        await _flush(batch, version)
+
+    await add_memory_counts(user_id, collection_counts)
+    for name in archived_collections:
+        if name not in collection_counts and name != "general":
+            await add_collection_to_user(user_id, name)
+    await bump_data_version(user_id)
+    logger.info("Imported library for user %s: %s", user_id, counts)
+    return counts
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Split a streamed request body into lines without buffering all of it"""
+    received = 0
+    pending = b""
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ArchiveTooLargeError(f"Archive is larger than {max_bytes} bytes")
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
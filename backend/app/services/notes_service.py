@@ -1,34 +1,55 @@
 from datetime import datetime
 from typing import Optional , List, Dict
-from app.core.pinecone_wrapper import safe_index, safe_pc
+from app.core.database import live
 from app.core.database_wrapper import safe_collection_notes
 from app.exceptions.httpExceptionsSave import *
 from app.exceptions.httpExceptionsSearch import *
 from app.exceptions.global_exceptions import ExternalServiceError, DatabaseConnectionError
 from app.models.notesModel import *
-from app.utils.collection_extractor import extract_collection_from_text, remove_collection_pattern_from_text
+from app.utils.collection_extractor import document_tags, extract_collection_from_text, tags_filter
+from app.utils.timestamps import document_timestamps, ts_filter
 from app.services.pinecone_service import *
-from app.services.user_collections_service import increment_memory_count
+from app.services.user_collections_service import increment_memory_count, decrement_memory_count
+from app.core.data_version import bump_data_version
+from app.core.background import background_tasks
+from app.services.suggest_service import suggest_index
+from app.services.trash_service import trash_document
+from app.core.embeddings import (
+    EMBEDDED_VERSIONS,
+    document_text,
+    load_state,
+    store_document,
+    update_document_metadata,
+    upsert_document,
+)
 
-async def get_all_notes_from_db(user_id: str):
+async def get_all_notes_from_db(
+    user_id: str,
+    tags: Optional[List[str]] = None,
+    date_from: Optional[int] = None,
+    date_to: Optional[int] = None
+):
     """
     Get all notes for a user with enhanced error handling.
+    With `tags`, only notes having any of them; with `date_from` and
+    `date_to` (epoch seconds, inclusive), only notes saved in that range.
     """
     try:
         if not user_id:
             raise ValidationError("User ID is required")
 
-        notes = await safe_collection_notes.find({"user_id": user_id})
-        return [note_model(note) for note in notes]
+        query = live({"user_id": user_id, **(tags_filter(tags) or {}), **(ts_filter(date_from, date_to) or {})})
+        notes = await safe_collection_notes.find(query, projection=NOTE_PROJECTION)
+        return note_models(notes)
 
     except ValidationError:
         # Re-raise validation errors
         raise
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise DatabaseError(f"Database connection failed: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error retrieving notes: {str(e)}", exc_info=True)
+        logger.error("Unexpected error retrieving notes: %s", e, exc_info=True)
         raise DatabaseError(f"Error retrieving notes: {str(e)}")
 
 
@@ -45,20 +66,15 @@ async def create_note(note: dict, namespace: str):
         collection = None
         if hasattr(note, 'collection') and note.collection:
             collection = note.collection.lower().strip()
-            logger.info(f"📚 COLLECTIONS: Using collection from API field: '{collection}'")
+            logger.debug("📚 COLLECTIONS: Using collection from API field: '%s'", collection)
         else:
             collection = extract_collection_from_text(note.note)
             if collection:
-                logger.info(f"📚 COLLECTIONS: Extracted collection from note text: '{collection}'")
+                logger.debug("📚 COLLECTIONS: Extracted collection from note text: '%s'", collection)
         
         # Default to "general" if no collection specified
         collection = collection or "general"
         
-        # Clean the note text for embedding (remove collection pattern)
-        clean_note = remove_collection_pattern_from_text(note.note) if note.note else note.note
-        text_to_embed = f"{note.title}, {clean_note}"
-        print(f"Embedding text: {text_to_embed}")
-        
         # Prepare metadata with collection information and namespace for filtering
         metadata = {
             "doc_id": doc_id,
@@ -67,56 +83,36 @@ async def create_note(note: dict, namespace: str):
             "title": note.title,
             "note": note.note,  # Keep original note with collection pattern
             "type": "Note",
-            "date": datetime.now().isoformat(),
+            **document_timestamps(),
             "collection": collection,  # Add extracted collection
+            "tags": document_tags(note.note, collection),
         }
 
-        # Generate embeddings using safe wrapper
-        embedding = await safe_pc.embed(
-            model="multilingual-e5-large",
-            inputs=[text_to_embed],
-            parameters={"input_type": "passage", "truncate": "END"}
-        )
-
-        vector = {
-            "id": doc_id,
-            "values": embedding[0]['values'],
-            "metadata": metadata
-        }
-
-        # Upsert using safe wrapper - store in default namespace
-        await safe_index.upsert(
-            vectors=[vector]
-            # No namespace parameter = default namespace
-        )
-
-        await save_note_to_db(metadata)
+        # Embed (title, clean note) and upsert into every write version
+        # while the note is saved to the database; a failed half is rolled back
+        await store_document(doc_id, metadata, save_note_to_db, safe_collection_notes)
         
-        # Track collection and increment memory count if collection was extracted
+        # The collection counter is bookkeeping: count it after the response
+        # (it bumps the data version itself once it lands)
         if collection and collection != "general":
-            try:
-                logger.info(f"📚 COLLECTIONS: Incrementing memory count for collection '{collection}' for user {namespace}")
-                await increment_memory_count(namespace, collection)
-                logger.info(f"📚 COLLECTIONS: Successfully incremented memory count for collection '{collection}' for user {namespace}")
-            except Exception as e:
-                logger.warning(f"📚 COLLECTIONS: Failed to increment memory count for collection '{collection}' for user {namespace}: {str(e)}")
-                # Don't fail the entire save operation if collection tracking fails
-                pass
+            background_tasks.submit("increment_memory_count", increment_memory_count, namespace, collection)
 
+        version = await bump_data_version(namespace)
+        suggest_index.document_saved(namespace, metadata, version)
         return {"status": "saved", "doc_id": doc_id}
 
     except (ValidationError, DocumentStorageError):
         # Re-raise our custom exceptions
         raise
     except ExternalServiceError as e:
-        logger.error(f"Vector database service error: {str(e)}")
+        logger.error("Vector database service error: %s", e)
         raise DocumentStorageError(
             message="Vector database service unavailable",
             user_id=namespace,
             doc_id=doc_id
         ) from e
     except Exception as e:
-        logger.error(f"Unexpected error creating note: {str(e)}", exc_info=True)
+        logger.error("Unexpected error creating note: %s", e, exc_info=True)
         raise DocumentStorageError(
             message="Failed to save note",
             user_id=namespace,
@@ -135,63 +131,123 @@ async def search_notes(query: str, namespace: str , filter: dict = None) -> List
     )
 
 
-async def update_note(note_id: str, note: dict, user_id: str):
+async def update_note(note_id: str, note, user_id: str):
     """
     Update an existing note for a user.
+
+    Only fields present in `note` change. The note is re-embedded only when
+    the embedded text (title and note without its collection pattern)
+    changed; other changes are a Pinecone metadata update with no embed
+    call. Collection counters follow a collection move.
     """
-    # Placeholder for actual implementation
-    note["id"] = note_id
-    note["user_id"] = user_id
-    return note
+    try:
+        stored = await safe_collection_notes.find_one(live({"doc_id": note_id, "user_id": user_id}))
+        if not stored:
+            raise DocumentNotFoundError("Note not found", user_id=user_id, doc_id=note_id)
+        _id = stored.pop("_id")
+        stored.pop(EMBEDDED_VERSIONS, None)
+
+        title = stored.get("title") if note.title is None else note.title
+        note_text = stored.get("note") if note.note is None else note.note
+
+        # Same precedence as create_note: explicit field, then the note text, then "general"
+        if note.collection:
+            collection = note.collection.lower().strip()
+        elif note.note is not None:
+            collection = extract_collection_from_text(note.note) or "general"
+        else:
+            collection = stored.get("collection") or "general"
+
+        tags = document_tags(note_text, collection)
+
+        changes = {
+            field: value
+            for field, value in (("title", title), ("note", note_text), ("collection", collection), ("tags", tags))
+            if stored.get(field) != value
+        }
+        if not changes:
+            return {"status": "unchanged", "doc_id": note_id, "reembedded": False}
+        changes["updated_at"] = datetime.now().isoformat()
+        metadata = {**stored, **changes}
+
+        # The collection pattern doesn't affect the vector
+        reembed = document_text(metadata) != document_text(stored)
+
+        if reembed:
+            await upsert_document(note_id, metadata)
+        else:
+            await update_document_metadata(note_id, changes)
+
+        # Only the active version is known to be current: a re-index batch
+        # in flight may overwrite the pending one, so the job redoes this note
+        active, _ = await load_state()
+        await safe_collection_notes.update_one(
+            live({"doc_id": note_id, "user_id": user_id}),
+            {"$set": {**changes, EMBEDDED_VERSIONS: [active]}}
+        )
+    except DocumentNotFoundError:
+        raise
+    except ExternalServiceError as e:
+        logger.error("Vector database service error: %s", e)
+        raise DocumentStorageError(
+            message="Vector database service unavailable",
+            user_id=user_id,
+            doc_id=note_id
+        ) from e
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise DatabaseError(f"Database connection failed: {str(e)}", user_id=user_id, doc_id=note_id) from e
+    except Exception as e:
+        logger.error("Unexpected error updating note: %s", e, exc_info=True)
+        raise DocumentStorageError(
+            message="Failed to update note",
+            user_id=user_id,
+            doc_id=note_id
+        ) from e
+
+    if "collection" in changes:
+        old_collection = stored.get("collection")
+        if old_collection and old_collection != "general":
+            background_tasks.submit("decrement_memory_count", decrement_memory_count, user_id, old_collection)
+        if collection != "general":
+            background_tasks.submit("increment_memory_count", increment_memory_count, user_id, collection)
+
+    version = await bump_data_version(user_id)
+    suggest_index.document_saved(user_id, metadata, version)
+    logger.debug("📝 NOTES: Updated note %s (%s), reembedded=%s", note_id, ", ".join(changes), reembed)
+    # The fields the notes listing returns, without Mongo-only ones (namespace, updated_at)
+    response = note_model({"_id": _id, **{field: metadata[field] for field in NOTE_FIELDS if field in metadata}})
+    return {"status": "updated", "doc_id": note_id, "reembedded": reembed, "note": response}
 
 
 async def delete_note(doc_id: str, namespace: str):
     """
-    Delete an existing note for a user using metadata filtering.
+    Move a note to the trash; it can be restored until the purge collector
+    deletes it with its vector (see trash_service).
     """
     try:
-        # Delete from vector database using metadata filtering
-        vector_result = await delete_from_vector_db(doc_id, namespace)
-        
-        # Delete from regular database  
-        db_result = await delete_note_from_db(doc_id)
+        result = await trash_document(doc_id, namespace, safe_collection_notes)
+        if result is None:
+            logger.warning("No note found with doc_id: %s", doc_id)
+            db_result = {"status": "not_found", "doc_id": doc_id}
+        else:
+            db_result = {"status": "trashed", **result}
         
         return {
             "status": "success",
-            "message": "Note deleted successfully",
+            "message": "Note moved to trash",
             "doc_id": doc_id,
-            "vector_result": vector_result,
             "db_result": db_result
         }
         
     except Exception as e:
-        logger.error(f"Error deleting note: {str(e)}", exc_info=True)
+        logger.error("Error deleting note: %s", e, exc_info=True)
         raise DocumentStorageError(
             message="Failed to delete note",
             user_id=namespace,
             doc_id=doc_id
         ) from e
 
-# Add the missing delete_note_from_db function
-async def delete_note_from_db(doc_id: str):
-    """
-    Delete note from database by doc_id.
-    """
-    try:
-        result = await safe_collection_notes.delete_one({"doc_id": doc_id})
-        if result.deleted_count == 0:
-            logger.warning(f"No note found with doc_id: {doc_id}")
-            return {"status": "not_found", "doc_id": doc_id}
-        
-        return {"status": "deleted", "doc_id": doc_id, "deleted_count": result.deleted_count}
-        
-    except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
-        raise DatabaseError(f"Database connection failed: {str(e)}")
-    except Exception as e:
-        logger.error(f"Unexpected error deleting note from database: {str(e)}", exc_info=True)
-        raise DatabaseError(f"Error deleting note: {str(e)}")
-
 # ======Mongo DB Functions========
 
 async def save_note_to_db(note_data: dict):
@@ -202,7 +258,6 @@ async def save_note_to_db(note_data: dict):
         if not note_data:
             raise ValidationError("Note data is required")
 
-        print(f"Saving note to DB: {note_data}")
         result = await safe_collection_notes.insert_one(note_data)
 
         if not result.inserted_id:
@@ -215,8 +270,8 @@ async def save_note_to_db(note_data: dict):
         # Re-raise validation errors
         raise
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise DatabaseError(f"Database connection failed: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error saving note: {str(e)}", exc_info=True)
+        logger.error("Unexpected error saving note: %s", e, exc_info=True)
         raise DatabaseError(f"Database error: {str(e)}")
\ No newline at end of file
@@ -1,16 +1,35 @@
+import asyncio
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple
 import logging
-from app.core.pinecone_wrapper import safe_index, safe_pc
 from app.core.config import settings
+from app.core.database_wrapper import safe_collection_memories
 from app.schema.link_schema import Link as LinkSchema
 from app.utils.site_name_extractor import extract_site_name
-from app.utils.collection_extractor import extract_collection_from_text, remove_collection_pattern_from_text
+from app.utils.collection_extractor import normalize_tags, parse_tags, remove_collection_pattern_from_text, tags_filter
+from app.utils.timestamps import document_timestamps, ts_filter
 from app.services.memories_service import save_memory_to_db
-from app.services.user_collections_service import increment_memory_count
+from app.services.user_collections_service import decrement_memory_count, increment_memory_count
 from app.exceptions.httpExceptionsSearch import *
 from app.exceptions.httpExceptionsSave import *
 from app.exceptions.global_exceptions import ExternalServiceError
+from app.core.logging_config import lazy
+from app.core.data_version import VersionedCache, bump_data_version
+from app.core.background import background_tasks
+from app.services.suggest_service import suggest_index
+from app.services.trash_service import trash_document
+from app.core.database import live
+from app.core.embeddings import (
+    EMBEDDED_VERSIONS,
+    EmbeddingVersion,
+    document_text,
+    embed_texts,
+    load_state,
+    owns_document,
+    search_version,
+    store_document,
+    update_document_metadata,
+)
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -22,8 +41,6 @@ async def save_to_vector_db(obj: LinkSchema, namespace: str):
     timestamp = datetime.now().strftime("%Y-%d-%m#%H-%M-%S")
     doc_id = f"{namespace}-{timestamp}"
 
-    print(f"Saving document with ID: {doc_id}")
-
     logger_context = {
         "user_id": namespace,
         "doc_id": doc_id,
@@ -31,14 +48,11 @@ async def save_to_vector_db(obj: LinkSchema, namespace: str):
     }
 
     try:
-        # Extract site name and collection from note field
+        # Extract site name and tags from note field; the first tag is the collection, default to "general"
         site_name = await extract_site_name(obj.link) or "Unknown Site"
-        collection = extract_collection_from_text(obj.note) or "general"  # Extract collection from note field only, default to "general"
+        tags = parse_tags(obj.note).tags
+        collection = tags[0] if tags else "general"
         
-        # Clean the note text for embedding (remove collection pattern)
-        clean_note = remove_collection_pattern_from_text(obj.note) if obj.note else obj.note
-        text_to_embed = f"{obj.title}, {clean_note}, {site_name}"
-
         metadata = {
             "doc_id": doc_id,
             "user_id": namespace,
@@ -48,63 +62,47 @@ async def save_to_vector_db(obj: LinkSchema, namespace: str):
             "source_url": obj.link,
             "site_name": site_name,
             "type": "Bookmark",
-            "date": datetime.now().isoformat(),
+            **document_timestamps(),
             "collection": collection, #catagory that memory belongs to 
+            "tags": tags,
         }
 
-        logger.info(f"📤 SAVE: Text being embedded: '{text_to_embed}'")
-        logger.info(f"📊 SAVE: Metadata being saved: {metadata}")
-        
-        # Generate E5 embeddings using safe wrapper
-        embedding = await safe_pc.embed(
-            model="multilingual-e5-large",
-            inputs=[text_to_embed],
-            parameters={"input_type": "passage", "truncate": "END"}
-        )
-        
-        logger.info(f"🦖 SAVE: Embedding generated successfully, dimensions: {len(embedding[0]['values'])}")
+        logger.debug("📤 SAVE: Embedding doc %s", doc_id)
 
-        # Prepare and upsert vector
-        vector = {
-            "id": doc_id,
-            "values": embedding[0]['values'],
-            "metadata": metadata
-        }
-        
-        logger.info(f"📤 SAVE: Vector payload being sent to Pinecone:")
-        logger.info(f"   ├─ ID: {vector['id']}")
-        logger.info(f"   ├─ Values length: {len(vector['values'])}")
-        logger.info(f"   └─ Metadata: {vector['metadata']}")
-
-        # Upsert using safe wrapper - store in default namespace
-        upsert_result = await safe_index.upsert(
-            vectors=[vector]
-            # No namespace parameter = default namespace
+        embedded = None
+        if settings.SAVE_DUPLICATE_THRESHOLD is not None and obj.on_duplicate != "save":
+            # The upsert needs this embedding anyway: compute it first and spend
+            # one top-1 query on it before anything is written
+            active = await search_version()
+            values = (await embed_texts(active, [document_text(metadata)], "passage"))[0]
+            duplicate = await find_duplicate(active, values, namespace)
+            if duplicate is not None:
+                return await resolve_duplicate(duplicate, tags, namespace, obj.on_duplicate)
+            embedded = {active.name: values}
+
+        # Embed (title, clean note, site name) and upsert into every write version
+        # while the document is saved to the database; a failed half is rolled back
+        upsert_result = await store_document(
+            doc_id, metadata, save_memory_to_db, safe_collection_memories, embedded
         )
         
-        logger.info(f"📥 SAVE: Pinecone upsert result: {upsert_result}")
-
-        # Save to database
-        await save_memory_to_db(metadata)
+        logger.debug("📥 SAVE: Pinecone upsert result: %s", upsert_result)
         
-        # Track collection and increment memory count if collection was extracted
+        # The collection counter is bookkeeping: count it after the response
+        # (it bumps the data version itself once it lands)
         if collection and collection != "general":
-            try:
-                logger.info(f"📚 COLLECTIONS: Incrementing memory count for collection '{collection}' for user {namespace}")
-                await increment_memory_count(namespace, collection)
-                logger.info(f"📚 COLLECTIONS: Successfully incremented memory count for collection '{collection}' for user {namespace}")
-            except Exception as e:
-                logger.warning(f"📚 COLLECTIONS: Failed to increment memory count for collection '{collection}' for user {namespace}: {str(e)}")
-                # Don't fail the entire save operation if collection tracking fails
-                pass
+            background_tasks.submit("increment_memory_count", increment_memory_count, namespace, collection)
 
+        version = await bump_data_version(namespace)
+        suggest_index.document_saved(namespace, metadata, version)
+        logger.info("Saved document", extra=logger_context)
         return {"status": "saved", "doc_id": doc_id}
 
     except (InvalidURLError, DocumentStorageError):
         # Re-raise our custom exceptions
         raise
     except ExternalServiceError as e:
-        logger.error(f"Vector database service error: {str(e)}")
+        logger.error("Vector database service error: %s", e)
         raise DocumentStorageError(
             message="Vector database service unavailable",
             user_id=namespace,
@@ -118,13 +116,160 @@ async def save_to_vector_db(obj: LinkSchema, namespace: str):
             doc_id=doc_id
         ) from e
 
-async def search_vector_db(
+async def find_duplicate(version: EmbeddingVersion, values: List[float], namespace: str) -> Optional[Dict]:
+    """The user's bookmark nearest to `values`, when it is at least SAVE_DUPLICATE_THRESHOLD similar"""
+    results = await version.safe_index.query(
+        vector=values,
+        namespace=version.namespace,
+        top_k=1,
+        include_metadata=True,
+        include_values=False,
+        filter=_build_search_filter(namespace, None, {"type": {"$eq": "Bookmark"}})
+    )
+    matches = results['matches']
+    if matches and matches[0]['score'] >= settings.SAVE_DUPLICATE_THRESHOLD:
+        return matches[0]
+    return None
+
+
+async def resolve_duplicate(match, tags: List[str], namespace: str, on_duplicate: str) -> Dict[str, Any]:
+    """
+    Answer a save that repeats the bookmark in `match`. With "merge" the
+    save's tags are added to it; its text is kept, so its vector still fits.
+    As on save, the first tag is the collection: a bookmark without tags
+    moves to the first merged one, and the collection counters follow.
+    """
+    doc_id = match['id']
+    memory = dict(match['metadata'])
+    status = "duplicate"
+    if on_duplicate == "merge":
+        status = "merged"
+        merged = normalize_tags((memory.get("tags") or []) + tags)
+        if merged != (memory.get("tags") or []):
+            old_collection = memory.get("collection") or "general"
+            collection = old_collection if memory.get("tags") else merged[0]
+            changes = {"tags": merged, "collection": collection}
+            memory.update(changes)
+            await update_document_metadata(doc_id, changes)
+            # As in update_note: a re-index batch in flight may overwrite the pending version
+            active, _ = await load_state()
+            await safe_collection_memories.update_one(
+                live({"doc_id": doc_id, "user_id": namespace}),
+                {"$set": {**changes, EMBEDDED_VERSIONS: [active]}}
+            )
+            if collection != old_collection:
+                if old_collection != "general":
+                    background_tasks.submit("decrement_memory_count", decrement_memory_count, namespace, old_collection)
+                if collection != "general":
+                    background_tasks.submit("increment_memory_count", increment_memory_count, namespace, collection)
+            version = await bump_data_version(namespace)
+            suggest_index.document_saved(namespace, memory, version)
+
+    logger.info("📎 SAVE: Near-duplicate of %s (score %.3f), %s", doc_id, match['score'], status)
+    return {"status": status, "doc_id": doc_id, "score": match['score'], "memory": memory}
+
+
+# Pinecone caps top_k at 1000 when metadata is requested
+MAX_SEARCH_WINDOW = 1000
+MAX_SEARCH_TOP_K = 100
+
+
+def _select_metadata(metadata: Dict, include_metadata) -> Optional[Dict]:
+    if include_metadata is True:
+        return metadata
+    if not include_metadata:
+        return None
+    return {field: metadata[field] for field in include_metadata if field in metadata}
+
+
+def _search_document(match, include_metadata) -> Dict:
+    metadata = match['metadata']
+    # Clean the note content for display (remove collection pattern)
+    clean_note = remove_collection_pattern_from_text(metadata['note'])
+    if metadata.get('type') == 'Bookmark':
+        page_content = f"Title: {metadata['title']}\nNote: {clean_note}\nSource: {metadata['source_url']}"
+    else:
+        page_content = f"Title: {metadata['title']}\nNote: {clean_note}"
+    document = {
+        "id": match['id'],
+        "score": match['score'],
+        "page_content": page_content,
+    }
+    selected = _select_metadata(metadata, include_metadata)
+    if selected is not None:
+        document["metadata"] = selected
+    return document
+
+
+def _build_search_filter(namespace: str, filter: Optional[Dict], *clauses: Optional[Dict]) -> Dict:
+    # Create user filter using metadata; trashed documents are flagged deleted
+    user_filter = {"namespace": {"$eq": namespace}, "deleted": {"$ne": True}}
+    # Tag and date range clauses (None when not requested), then the caller's filter
+    filters_to_combine = [user_filter] + [f for f in (*clauses, filter) if f]
+    if len(filters_to_combine) == 1:
+        return user_filter
+    return {"$and": filters_to_combine}
+
+
+def validate_search_window(top_k: int, offset: int, min_score: Optional[float]) -> None:
+    if not 1 <= top_k <= MAX_SEARCH_TOP_K:
+        raise InvalidRequestError(f"top_k must be between 1 and {MAX_SEARCH_TOP_K}")
+    if offset < 0 or offset + top_k > MAX_SEARCH_WINDOW:
+        raise InvalidRequestError(f"offset + top_k must not exceed {MAX_SEARCH_WINDOW}")
+    if min_score is not None and not -1.0 <= min_score <= 1.0:
+        raise InvalidRequestError("min_score must be between -1 and 1")
+
+
+def paginate_matches(
+    matches: List,
+    top_k: int,
+    offset: int,
+    min_score: Optional[float],
+    include_metadata=True
+) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Cut one page out of a score-ordered match list. The score cutoff is
+    applied before any document is built, and the next offset is only
+    returned when Pinecone filled the whole window and no match fell
+    below min_score, i.e. when a deeper page can still hold results.
+    """
+    page = matches[offset:offset + top_k]
+    exhausted = len(matches) < offset + top_k
+    if min_score is not None:
+        kept = 0
+        for match in page:
+            if match['score'] < min_score:
+                exhausted = True
+                break
+            kept += 1
+        page = page[:kept]
+    documents = [_search_document(match, include_metadata) for match in page]
+    next_offset = None if exhausted else offset + top_k
+    return documents, next_offset
+
+
+async def search_page(
     query: str,
     namespace: Optional[str],
     filter: Optional[Dict] = None,
-    top_k: int = 10
-) -> List[Dict]:
-    """Search using E5 embeddings with metadata filtering for user isolation"""
+    top_k: int = 10,
+    offset: int = 0,
+    min_score: Optional[float] = None,
+    include_metadata=True,
+    tags: Optional[List[str]] = None,
+    date_from: Optional[int] = None,
+    date_to: Optional[int] = None
+) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Search using E5 embeddings with metadata filtering for user isolation.
+
+    Returns one page of results, each with its similarity score, and the
+    offset of the next page (None when there are no more results).
+    `include_metadata` is True for all metadata fields, False for none,
+    or a list of field names to return. @tags in the query and `tags`
+    restrict results to documents with any of those tags; `date_from` and
+    `date_to` (epoch seconds, inclusive) to documents saved in that range.
+    """
 
     if not namespace:
         raise InvalidRequestError("Missing user uuid - please login")
@@ -132,173 +277,234 @@ async def search_vector_db(
     if not query or len(query.strip()) < 3:
         raise InvalidRequestError("Search query must be at least 3 characters")
 
+    validate_search_window(top_k, offset, min_score)
+
     try:
-        # Extract collection from query if present
-        query_collection = extract_collection_from_text(query)
-        clean_query = remove_collection_pattern_from_text(query)
-        
-        # Create user filter using metadata
-        user_filter = {"namespace": {"$eq": namespace}}
-        
-        # If collection was extracted from query, add it to filter using proper Pinecone syntax
-        if query_collection:
-            collection_filter = {"collection": {"$eq": query_collection}}
-            # Combine user filter, collection filter and existing filters
-            filters_to_combine = [user_filter, collection_filter]
-            if filter:
-                filters_to_combine.append(filter)
-            filter = {"$and": filters_to_combine}
-        else:
-            # Just combine user filter with existing filter if present
-            if filter:
-                filter = {"$and": [user_filter, filter]}
-            else:
-                filter = user_filter
-        
-        logger.info(f"📤 SEARCH: Query being embedded: '{clean_query}'")
-        logger.info(f"🎯 SEARCH: Final filter being applied: {filter}")
-        
-        # Generate query embedding using clean query (without collection pattern)
-        embedding = await safe_pc.embed(
-            model="multilingual-e5-large",
-            inputs=[clean_query],
-            parameters={"input_type": "query", "truncate": "END"}
+        query_tags, clean_query = parse_tags(query)
+        filter = _build_search_filter(
+            namespace, filter, tags_filter(normalize_tags(query_tags + (tags or []))), ts_filter(date_from, date_to)
         )
         
-        logger.info(f"🦖 SEARCH: Query embedding generated, dimensions: {len(embedding[0]['values'])}")
+        logger.debug("🎯 SEARCH: Final filter being applied: %s", filter)
         
-        search_params = {
-            "vector": embedding[0]['values'],
-            "top_k": top_k,
-            "include_metadata": True,
-            "filter": filter
-        }
+        # Generate query embedding using clean query (without collection pattern)
+        version = await search_version()
+        vector = (await embed_texts(version, [clean_query], "query"))[0]
         
-        logger.info(f"📤 SEARCH: Search parameters being sent to Pinecone:")
-        logger.info(f"   ├─ Vector dimensions: {len(search_params['vector'])}")
-        logger.info(f"   ├─ Top K: {search_params['top_k']}")
-        logger.info(f"   ├─ Include metadata: {search_params['include_metadata']}")
-        logger.info(f"   └─ Filter: {search_params['filter']}")
-
-        # Perform vector search using safe wrapper - search in default namespace with metadata filter
-        results = await safe_index.query(**search_params)
+        # Pinecone has no offset: fetch the window up to the end of the requested page
+        results = await version.safe_index.query(
+            vector=vector,
+            namespace=version.namespace,
+            top_k=offset + top_k,
+            include_metadata=True,
+            include_values=False,
+            filter=filter
+        )
         
-        logger.info(f"📥 SEARCH: Pinecone search results received:")
-        logger.info(f"   ├─ Matches count: {len(results.get('matches', []))}")
-        logger.info(f"   └─ Raw results: {results}")
-
-        # Build plain dictionaries (no Langchain Document) to return
-        documents: List[Dict] = []
-
-        if documents is None:
-            print("No documents found in the search results")
-
-        for match in results['matches']:
-            doc_id = match['id']
-            metadata = match['metadata']
-            print(f"{namespace} , Processing document ID: {doc_id} with metadata: {metadata}")
-
-
-            if metadata.get('type') == 'Bookmark':
-                # Clean the note content for display (remove collection pattern)
-                clean_note = remove_collection_pattern_from_text(metadata['note'])
-                documents.append({
-                    "id": doc_id,
-                    "page_content": f"Title: {metadata['title']}\nNote: {clean_note}\nSource: {metadata['source_url']}",
-                    "metadata": metadata
-                })
-
-            else:
-                # For notes, clean the note content for display (remove collection pattern)
-                clean_note = remove_collection_pattern_from_text(metadata['note'])
-                documents.append({
-                    "id": doc_id,
-                    "page_content": f"Title: {metadata['title']}\nNote: {clean_note}",
-                    "metadata": metadata
-                })
-
-        if not documents:
-            raise SearchExecutionError("No documents found matching query")
+        logger.debug(
+            "📥 SEARCH: Pinecone returned %s matches (top_k=%s)",
+            lazy(lambda: len(results.get('matches', []))),
+            offset + top_k,
+        )
 
-        return documents
+        return paginate_matches(results['matches'], top_k, offset, min_score, include_metadata)
 
-    except (InvalidRequestError, SearchExecutionError):
+    except InvalidRequestError:
         # Re-raise our custom exceptions
         raise
     except ExternalServiceError as e:
-        logger.error(f"Vector database service error: {str(e)}")
+        logger.error("Vector database service error: %s", e)
         raise SearchExecutionError(f"Vector database service unavailable: {str(e)}")
     except Exception as e:
         logger.error("Search failed", extra={"user_id": namespace}, exc_info=True)
-        return []  # Return empty list if search fails gracefully
+        return [], None  # Return empty page if search fails gracefully
+
+async def search_vector_db(
+    query: str,
+    namespace: Optional[str],
+    filter: Optional[Dict] = None,
+    top_k: int = 10,
+    offset: int = 0,
+    min_score: Optional[float] = None,
+    include_metadata=True,
+    tags: Optional[List[str]] = None,
+    date_from: Optional[int] = None,
+    date_to: Optional[int] = None
+) -> List[Dict]:
+    """Search using E5 embeddings with metadata filtering for user isolation"""
+    documents, _ = await search_page(
+        query=query,
+        namespace=namespace,
+        filter=filter,
+        top_k=top_k,
+        offset=offset,
+        min_score=min_score,
+        include_metadata=include_metadata,
+        tags=tags,
+        date_from=date_from,
+        date_to=date_to
+    )
+    return documents
 
-async def delete_from_vector_db(doc_id: str, namespace: str):
+async def search_batch(
+    queries: List[Dict[str, Any]],
+    namespace: Optional[str],
+    include_metadata=True
+) -> Dict[str, Dict]:
     """
-    Delete document from vector database using metadata filtering instead of namespace isolation
+    Run several searches with a single embedding call.
+
+    Each entry in `queries` holds `query` plus optional `key`, `collection`,
+    `tags`, `date_from`, `date_to`, `filter`, `top_k`, `offset` and `min_score`. The query texts are embedded
+    together, then the Pinecone queries run concurrently, at most
+    SEARCH_BATCH_CONCURRENCY at a time. Results are keyed by `key`
+    (defaulting to the query text); a query that fails gets an `error`
+    entry instead of failing the whole batch.
+    """
+
+    if not namespace:
+        raise InvalidRequestError("Missing user uuid - please login")
+    if not queries:
+        raise InvalidRequestError("At least one query is required")
+    if len(queries) > settings.SEARCH_BATCH_MAX_QUERIES:
+        raise InvalidRequestError(f"At most {settings.SEARCH_BATCH_MAX_QUERIES} queries per batch")
+
+    # Validate everything before spending an embedding call
+    planned = []
+    for item in queries:
+        query = item["query"]
+        key = item.get("key") or query
+        if not query or len(query.strip()) < 3:
+            raise InvalidRequestError(f"Search query '{key}' must be at least 3 characters")
+        top_k = item.get("top_k", 10)
+        offset = item.get("offset", 0)
+        min_score = item.get("min_score")
+        validate_search_window(top_k, offset, min_score)
+
+        query_tags, text = parse_tags(query)
+        tags = normalize_tags(query_tags + [item.get("collection")] + (item.get("tags") or []))
+        planned.append({
+            "key": key,
+            "text": text or query,
+            "filter": _build_search_filter(
+                namespace, item.get("filter"), tags_filter(tags), ts_filter(item.get("date_from"), item.get("date_to"))
+            ),
+            "top_k": top_k,
+            "offset": offset,
+            "min_score": min_score,
+        })
+
+    keys = [plan["key"] for plan in planned]
+    if len(set(keys)) != len(keys):
+        raise InvalidRequestError("Duplicate query keys in batch; set a distinct 'key' per query")
+
+    # Identical texts share one embedding
+    texts = list(dict.fromkeys(plan["text"] for plan in planned))
+
+    version = await search_version()
+    try:
+        embedding = await embed_texts(version, texts, "query")
+    except ExternalServiceError as e:
+        logger.error("Vector database service error: %s", e)
+        raise SearchExecutionError(f"Vector database service unavailable: {str(e)}")
+    vectors = dict(zip(texts, embedding))
+
+    semaphore = asyncio.Semaphore(settings.SEARCH_BATCH_CONCURRENCY)
+
+    async def run(plan: Dict) -> Dict:
+        try:
+            async with semaphore:
+                results = await version.safe_index.query(
+                    vector=vectors[plan["text"]],
+                    namespace=version.namespace,
+                    top_k=plan["offset"] + plan["top_k"],
+                    include_metadata=True,
+                    include_values=False,
+                    filter=plan["filter"]
+                )
+            documents, next_offset = paginate_matches(
+                results['matches'], plan["top_k"], plan["offset"], plan["min_score"], include_metadata
+            )
+            return {"results": documents, "next_offset": next_offset}
+        except ExternalServiceError as e:
+            logger.error("Vector database service error: %s", e)
+            return {"results": [], "next_offset": None, "error": "Vector database service unavailable"}
+        except Exception:
+            logger.error("Batch search query failed", extra={"user_id": namespace}, exc_info=True)
+            return {"results": [], "next_offset": None, "error": "Search failed"}
+
+    outcomes = await asyncio.gather(*(run(plan) for plan in planned))
+    logger.debug("📥 SEARCH: batch of %d queries, %d embedded", len(planned), len(texts))
+    return dict(zip(keys, outcomes))
+
+async def similar_documents(doc_id: str, namespace: Optional[str], top_k: int = 10) -> Optional[List[Dict]]:
+    """
+    The user's documents nearest to one of their own, queried with its
+    stored vector, so no embedding call is made. None when the user has
+    no such document (or it is in the trash).
+    """
+    if not namespace:
+        raise InvalidRequestError("Missing user uuid - please login")
+    validate_search_window(top_k, 0, None)
+    if not owns_document(namespace, doc_id):
+        return None
+
+    try:
+        version = await search_version()
+        vectors = await version.safe_index.fetch(ids=[doc_id], namespace=version.namespace, include_metadata=True)
+        stored = vectors.get(doc_id)
+        if stored is None or stored["metadata"].get("deleted"):
+            return None
+
+        results = await version.safe_index.query(
+            vector=stored["values"],
+            namespace=version.namespace,
+            top_k=top_k,
+            include_metadata=True,
+            include_values=False,
+            filter=_build_search_filter(namespace, None, {"doc_id": {"$ne": doc_id}})
+        )
+        documents, _ = paginate_matches(results['matches'], top_k, 0, None)
+        logger.debug("📥 SIMILAR: %d neighbors of %s", len(documents), doc_id)
+        return documents
+    except ExternalServiceError as e:
+        logger.error("Vector database service error: %s", e)
+        raise SearchExecutionError(f"Vector database service unavailable: {str(e)}")
+
+
+# Neighbor lists per (user, document, top_k), valid until the user's next write
+similar_cache = VersionedCache(max_entries=settings.SIMILAR_CACHE_SIZE)
+
+async def delete_bookmark(doc_id: str, namespace: str):
+    """
+    Move a bookmark to the trash. Only the Mongo document is stamped here;
+    the vector is hidden in the background and purged with the document
+    after the retention window (see trash_service).
     """
-    logger.info(f"=== VECTOR DB DELETE STARTED ===")
-    logger.info(f"delete_from_vector_db called with doc_id: '{doc_id}', namespace: '{namespace}'")
-    
     try:
-        # Input validation with detailed logging
         if not doc_id:
-            logger.error(f"VALIDATION FAILED: doc_id is empty or None: '{doc_id}'")
             raise InvalidRequestError("Document ID is required")
         if not namespace:
-            logger.error(f"VALIDATION FAILED: namespace is empty or None: '{namespace}'")
             raise InvalidRequestError("Namespace is required")
-            
-        logger.info(f"Input validation passed - doc_id: '{doc_id}', namespace: '{namespace}'")
-        
-        # Check vector database connection
-        logger.info("Checking vector database connection...")
-        try:
-            # Test connection with index stats
-            stats = await safe_index.describe_index_stats()
-            logger.info(f"Vector DB connection successful. Index stats: {stats}")
-        except Exception as conn_e:
-            logger.error(f"Vector DB connection test failed: {str(conn_e)}")
-            raise VectorDBConnectionError(f"Failed to connect to vector database: {str(conn_e)}")
-        
-        # Create metadata filter to ensure we only delete documents belonging to this user
-        delete_filter = {
-            "$and": [
-                {"namespace": {"$eq": namespace}},
-                {"doc_id": {"$eq": doc_id}}
-            ]
-        }
-        
-        # Perform the delete operation using metadata filter instead of namespace
-        logger.info(f"Attempting to delete vector with id: '{doc_id}' for user: '{namespace}' using metadata filter")
-        
-        delete_result = await safe_index.delete(
-            filter=delete_filter
-            # No namespace parameter = delete from default namespace using filter
-        )
-        
-        logger.info(f"Vector database delete operation completed. Result: {delete_result}")
-        logger.info(f"=== VECTOR DB DELETE COMPLETED SUCCESSFULLY ===")
-        
-        return {"status": "deleted", "doc_id": doc_id, "namespace": namespace, "delete_result": delete_result}
 
-    except InvalidRequestError as e:
-        logger.error(f"VECTOR DB DELETE FAILED: Validation error - {str(e)}")
-        # Re-raise validation errors
-        raise
-    except VectorDBConnectionError as e:
-        logger.error(f"VECTOR DB DELETE FAILED: Connection error - {str(e)}")
+        result = await trash_document(doc_id, namespace, safe_collection_memories)
+        if result is None:
+            raise DocumentNotFoundError("Document not found", user_id=namespace, doc_id=doc_id)
+        return {"status": "trashed", **result}
+
+    except (InvalidRequestError, DocumentNotFoundError):
         raise
     except ExternalServiceError as e:
-        logger.error(f"VECTOR DB DELETE FAILED: External service error - {str(e)}")
+        logger.error("DELETE FAILED: External service error - %s", e)
         raise DocumentStorageError(
             message="Vector database service unavailable",
             user_id=namespace,
             doc_id=doc_id
         ) from e
     except Exception as e:
-        logger.error(f"VECTOR DB DELETE FAILED: Unexpected error - doc_id: '{doc_id}', namespace: '{namespace}', error: {str(e)}", exc_info=True)
+        logger.error("DELETE FAILED: Unexpected error - doc_id: '%s', namespace: '%s', error: %s", doc_id, namespace, e, exc_info=True)
         raise DocumentStorageError(
-            message="Failed to delete document from vector database",
+            message="Failed to delete document",
             user_id=namespace,
             doc_id=doc_id
         ) from e
\ No newline at end of file
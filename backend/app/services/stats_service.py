@@ -0,0 +1,86 @@
+"""
+Library facet counts for the dashboard sidebar.
+
+One aggregation answers the whole sidebar: bookmarks are unioned with
+notes ($unionWith, MongoDB 4.4+) and a $facet stage counts them by
+collection, tag, site, type and month in the same pass. Trashed
+documents are left out.
+
+Results are cached per user under the data version they were computed
+at, so any write (which bumps the version) invalidates them without this
+module hearing about it. With several workers that holds on each of them
+because they share a Redis version store (see app/core/data_version.py).
+"""
+import logging
+import time
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.data_version import VersionedCache
+from app.core.database import COLLECTION_NOTES, live
+from app.core.database_wrapper import safe_collection_memories
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = {"_id": 0, "collection": 1, "tags": 1, "site_name": 1, "type": 1, "date": 1}
+
+
+def _counts(field: Any, *stages: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        *stages,
+        {"$group": {"_id": field, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+def facet_pipeline(user_id: str) -> List[Dict[str, Any]]:
+    match = {"$match": live({"user_id": user_id})}
+    return [
+        match,
+        {"$project": _FIELDS},
+        {"$unionWith": {
+            "coll": COLLECTION_NOTES,
+            # Every note is a Note, including those saved before `type` was stored
+            "pipeline": [match, {"$project": _FIELDS}, {"$set": {"type": "Note"}}],
+        }},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            # Bookmarks saved before collections existed count as "general"
+            "collections": _counts({"$ifNull": ["$collection", "general"]}),
+            "tags": _counts("$tags", {"$unwind": "$tags"}),
+            "sites": _counts("$site_name", {"$match": {"site_name": {"$exists": True}}}) + [
+                {"$limit": settings.FACETS_SITE_LIMIT},
+            ],
+            "types": _counts("$type"),
+            # `date` is ISO 8601, so its first 7 bytes are the month
+            "months": [
+                {"$match": {"date": {"$exists": True}}},
+                {"$group": {"_id": {"$substrBytes": ["$date", 0, 7]}, "count": {"$sum": 1}}},
+                {"$sort": {"_id": -1}},
+            ],
+        }},
+    ]
+
+
+def _format(result: Dict[str, Any]) -> Dict[str, Any]:
+    total = result.get("total") or [{"count": 0}]
+    facets = {"total": total[0]["count"]}
+    for name in ("collections", "tags", "sites", "types", "months"):
+        # Null and empty values (a missing field) are not a facet value
+        facets[name] = [{"value": row["_id"], "count": row["count"]} for row in result.get(name, []) if row["_id"]]
+    return facets
+
+
+async def compute_facets(user_id: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    results = await safe_collection_memories.aggregate(facet_pipeline(user_id))
+    facets = _format(results[0] if results else {})
+    logger.debug(
+        "📊 STATS: Computed facets for user %s (%d docs) in %.1fms",
+        user_id, facets["total"], (time.perf_counter() - start) * 1000,
+    )
+    return facets
+
+
+# Facets per user, under the data version they were computed at
+facet_cache = VersionedCache(max_entries=settings.FACETS_MAX_USERS)
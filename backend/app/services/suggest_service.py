@@ -0,0 +1,231 @@
+"""
+Search-as-you-type suggestions from a per-user in-memory prefix index.
+
+Each user's index is a sorted array of (key, kind, text) tuples, where the
+keys are the normalized bookmark and note titles, site names and
+collection names, plus every word-start suffix of them so "rep" also
+finds "Notes on replication". A lookup is one bisect and a short scan.
+
+Indexes are built from Mongo on first use, updated in place when this
+worker saves or deletes a document, and rebuilt when the user's data
+version moved without us (a write on another worker, a collection
+change). Users idle for SUGGEST_IDLE_SECONDS, or beyond SUGGEST_MAX_USERS,
+are dropped and rebuilt on their next keystroke.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.data_version import get_data_version
+from app.core.database import live
+from app.core.database_wrapper import safe_collection_memories, safe_collection_notes
+
+logger = logging.getLogger(__name__)
+
+# Fields read from Mongo to build an index
+SUGGEST_PROJECTION = {"_id": 0, "doc_id": 1, "title": 1, "site_name": 1, "collection": 1, "tags": 1, "type": 1}
+
+# Defaults that would match nearly everything and help nobody
+_IGNORED_VALUES = {"general", "unknown site"}
+
+# Word-start suffixes indexed per term, so very long titles stay cheap
+_MAX_WORDS_PER_TERM = 12
+
+Entry = Tuple[str, str, str]  # (normalized key, kind, display text)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def document_terms(doc: Dict) -> List[Tuple[str, str]]:
+    """(kind, text) pairs a document contributes to the index"""
+    terms = []
+    if doc.get("title"):
+        terms.append(("note" if doc.get("type") == "Note" else "bookmark", doc["title"]))
+    site = doc.get("site_name")
+    if site and normalize(site) not in _IGNORED_VALUES:
+        terms.append(("site", site))
+    # Every tag is suggested as a collection; documents saved before tags only have the first
+    for tag in dict.fromkeys([doc.get("collection"), *(doc.get("tags") or ())]):
+        if tag and normalize(tag) not in _IGNORED_VALUES:
+            terms.append(("collection", tag))
+    return terms
+
+
+def term_entries(kind: str, text: str) -> Iterable[Entry]:
+    words = normalize(text).split(" ")
+    for i in range(min(len(words), _MAX_WORDS_PER_TERM)):
+        yield (" ".join(words[i:]), kind, text)
+
+
+class PrefixIndex:
+    """Sorted, reference-counted entries for one user"""
+
+    __slots__ = ("_entries", "_refs", "_docs")
+
+    def __init__(self, docs: Iterable[Dict] = ()):
+        self._refs: Dict[Entry, int] = {}
+        self._docs: Dict[str, List[Tuple[str, str]]] = {}
+        for doc in docs:
+            self._register(doc)
+        # Sort once on build; incremental updates insert in place
+        self._entries: List[Entry] = sorted(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _register(self, doc: Dict) -> List[Entry]:
+        """Count a document's entries and return the ones that are new"""
+        terms = document_terms(doc)
+        self._docs[doc.get("doc_id")] = terms
+        added = []
+        for kind, text in terms:
+            for entry in term_entries(kind, text):
+                count = self._refs.get(entry, 0)
+                if count == 0:
+                    added.append(entry)
+                self._refs[entry] = count + 1
+        return added
+
+    def add(self, doc: Dict) -> None:
+        self.remove(doc.get("doc_id"))
+        for entry in self._register(doc):
+            insort(self._entries, entry)
+
+    def remove(self, doc_id: Optional[str]) -> None:
+        terms = self._docs.pop(doc_id, None)
+        if not terms:
+            return
+        for kind, text in terms:
+            for entry in term_entries(kind, text):
+                count = self._refs.get(entry, 0) - 1
+                if count > 0:
+                    self._refs[entry] = count
+                    continue
+                self._refs.pop(entry, None)
+                i = bisect_left(self._entries, entry)
+                if i < len(self._entries) and self._entries[i] == entry:
+                    del self._entries[i]
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict[str, str]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(results) < limit:
+            key, kind, text = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            if (kind, text) not in seen:
+                seen.add((kind, text))
+                results.append({"text": text, "type": kind})
+            i += 1
+        return results
+
+
+class _UserIndex:
+    __slots__ = ("index", "version", "last_used")
+
+    def __init__(self, index: PrefixIndex, version: Optional[str]):
+        self.index = index
+        self.version = version
+        self.last_used = time.monotonic()
+
+
+class SuggestIndexCache:
+    """Per-user prefix indexes, least recently used first"""
+
+    def __init__(self, max_users: int = 1000, idle_seconds: float = 900):
+        self.max_users = max_users
+        self.idle_seconds = idle_seconds
+        self._users: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._users:
+            user_id, oldest = next(iter(self._users.items()))
+            if len(self._users) <= self.max_users and oldest.last_used >= cutoff:
+                break
+            del self._users[user_id]
+            logger.debug("🔤 SUGGEST: Evicted index for user %s", user_id)
+
+    async def _load(self, user_id: str) -> List[Dict]:
+        query = live({"user_id": user_id})
+        bookmarks, notes = await asyncio.gather(
+            safe_collection_memories.find(query, projection=SUGGEST_PROJECTION),
+            safe_collection_notes.find(query, projection=SUGGEST_PROJECTION),
+        )
+        for note in notes:
+            note.setdefault("type", "Note")
+        return bookmarks + notes
+
+    async def _get(self, user_id: str) -> _UserIndex:
+        # Read the version before loading: a write landing mid-build leaves
+        # the index one version behind, and the next lookup rebuilds it
+        version = await get_data_version(user_id)
+        current = self._users.get(user_id)
+        if current is not None and (version is None or current.version == version):
+            return current
+
+        lock = self._build_locks.setdefault(user_id, asyncio.Lock())
+        try:
+            async with lock:
+                current = self._users.get(user_id)
+                if current is not None and (version is None or current.version == version):
+                    return current
+                start = time.perf_counter()
+                current = _UserIndex(PrefixIndex(await self._load(user_id)), version)
+                self._users[user_id] = current
+                logger.debug(
+                    "🔤 SUGGEST: Built index for user %s (%d docs) in %.1fms",
+                    user_id, len(current.index), (time.perf_counter() - start) * 1000,
+                )
+                return current
+        finally:
+            if not lock.locked():
+                self._build_locks.pop(user_id, None)
+
+    async def suggest(self, user_id: str, prefix: str, limit: int = 8) -> List[Dict[str, str]]:
+        if not normalize(prefix):
+            return []
+        current = await self._get(user_id)
+        current.last_used = time.monotonic()
+        self._users.move_to_end(user_id)
+        self._evict()
+        return current.index.lookup(prefix, limit)
+
+    def document_saved(self, user_id: str, doc: Dict, version: Optional[str]) -> None:
+        """Apply a save made by this worker; users without an index are skipped"""
+        current = self._users.get(user_id)
+        if current is None:
+            return
+        current.index.add(doc)
+        current.version = version
+
+    def document_deleted(self, user_id: str, doc_id: str, version: Optional[str]) -> None:
+        """Apply a delete made by this worker; users without an index are skipped"""
+        current = self._users.get(user_id)
+        if current is None:
+            return
+        current.index.remove(doc_id)
+        current.version = version
+
+    def clear(self) -> None:
+        self._users.clear()
+
+
+suggest_index = SuggestIndexCache(
+    max_users=settings.SUGGEST_MAX_USERS,
+    idle_seconds=settings.SUGGEST_IDLE_SECONDS,
+)
@@ -0,0 +1,133 @@
+"""
+Soft delete: deleting a bookmark or note moves it to the trash.
+
+Deleting only stamps the Mongo document with `deleted_at` and returns.
+Listings skip stamped documents (app.core.database.live), and the vector is flagged
+`deleted: true` by a background task so search skips it too (search
+filters on `deleted != true`). Nothing is re-embedded on restore: the
+stamp is removed and the flag cleared.
+
+Trashed documents can be restored for TRASH_RETENTION_DAYS. After that,
+app/jobs/purge_trash.py deletes them and their vectors in batches.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.background import background_tasks
+from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.core.database import DELETED_AT, TRASHED, live
+from app.core.database_wrapper import SafeCollection, safe_collection_memories, safe_collection_notes
+from app.core.embeddings import remove_document, update_document_metadata
+from app.models.bookmarkModels import BOOKMARK_FIELDS, bookmarkModel
+from app.models.notesModel import NOTE_FIELDS, note_model
+from app.services.suggest_service import suggest_index
+
+logger = logging.getLogger(__name__)
+
+_KINDS = (
+    ("bookmark", safe_collection_memories, BOOKMARK_FIELDS, bookmarkModel),
+    ("note", safe_collection_notes, NOTE_FIELDS, note_model),
+)
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> str:
+    """Documents trashed before this (ISO, like `deleted_at`) are past restoring"""
+    return ((now or datetime.now()) - timedelta(days=settings.TRASH_RETENTION_DAYS)).isoformat()
+
+
+def _purge_after(deleted_at: str) -> str:
+    return (datetime.fromisoformat(deleted_at) + timedelta(days=settings.TRASH_RETENTION_DAYS)).isoformat()
+
+
+async def sync_vector_visibility(doc_id: str, collection: SafeCollection) -> None:
+    """Set the vector's `deleted` flag from the document's current state"""
+    doc = await collection.find_one({"doc_id": doc_id}, projection={"_id": 0, DELETED_AT: 1})
+    if doc is None:
+        # Purged meanwhile; its vector went with it
+        return
+    await update_document_metadata(doc_id, {"deleted": bool(doc.get(DELETED_AT))})
+
+
+async def trash_document(doc_id: str, user_id: str, collection: SafeCollection) -> Optional[Dict[str, Any]]:
+    """Move a user's document to the trash; None when they have no such live document"""
+    deleted_at = datetime.now().isoformat()
+    result = await collection.update_one(
+        live({"doc_id": doc_id, "user_id": user_id}),
+        {"$set": {DELETED_AT: deleted_at}}
+    )
+    if result.matched_count == 0:
+        return None
+
+    # Reading the state back (rather than setting True) keeps a quick restore from being undone
+    background_tasks.submit("hide_trashed_vector", sync_vector_visibility, doc_id, collection)
+    version = await bump_data_version(user_id)
+    suggest_index.document_deleted(user_id, doc_id, version)
+    logger.debug("🗑️ TRASH: Moved %s to the trash for user %s", doc_id, user_id)
+    return {"doc_id": doc_id, DELETED_AT: deleted_at, "purge_after": _purge_after(deleted_at)}
+
+
+async def list_trash(user_id: str) -> List[Dict[str, Any]]:
+    """The user's trashed bookmarks and notes, most recently deleted first"""
+    async def load(kind, collection, fields, model):
+        projection = dict.fromkeys(fields + (DELETED_AT,), 1)
+        docs = await collection.find({"user_id": user_id, **TRASHED}, projection=projection)
+        items = []
+        for doc in docs:
+            item = model(doc)
+            item["kind"] = kind
+            item["purge_after"] = _purge_after(doc[DELETED_AT])
+            items.append(item)
+        return items
+
+    groups = await asyncio.gather(*(load(*kind) for kind in _KINDS))
+    items = [item for group in groups for item in group]
+    items.sort(key=lambda item: item[DELETED_AT], reverse=True)
+    return items
+
+
+async def restore_document(doc_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Take a document out of the trash; None when it is not there (or past retention)"""
+    for kind, collection, fields, model in _KINDS:
+        result = await collection.update_one(
+            {"doc_id": doc_id, "user_id": user_id, DELETED_AT: {"$gte": retention_cutoff()}},
+            {"$unset": {DELETED_AT: ""}}
+        )
+        if result.matched_count == 0:
+            continue
+
+        doc = await collection.find_one({"doc_id": doc_id, "user_id": user_id}, projection=dict.fromkeys(fields, 1))
+        try:
+            # Inline, so the document is searchable again when the response arrives
+            await update_document_metadata(doc_id, {"deleted": False})
+        except Exception as e:
+            logger.warning("🗑️ TRASH: Unhiding vector %s failed, retrying in the background: %s", doc_id, e)
+            background_tasks.submit("unhide_restored_vector", sync_vector_visibility, doc_id, collection)
+
+        version = await bump_data_version(user_id)
+        if doc:
+            suggest_index.document_saved(user_id, doc, version)
+        logger.debug("🗑️ TRASH: Restored %s %s for user %s", kind, doc_id, user_id)
+        return {"kind": kind, **model(doc or {"doc_id": doc_id})}
+    return None
+
+
+async def purge_document(doc_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Delete a user's document and its vector now, in or out of the trash"""
+    found = await asyncio.gather(*(
+        collection.find_one({"doc_id": doc_id, "user_id": user_id}, projection={"_id": 0, DELETED_AT: 1})
+        for _, collection, _, _ in _KINDS
+    ))
+    for (kind, collection, _, _), doc in zip(_KINDS, found):
+        if doc is None:
+            continue
+        result = await remove_document(doc_id, user_id, collection)
+        if result["deleted_count"] == 0:
+            return None
+        if DELETED_AT not in doc:
+            version = await bump_data_version(user_id)
+            suggest_index.document_deleted(user_id, doc_id, version)
+        return {"kind": kind, "doc_id": doc_id, **result}
+    return None
@@ -1,49 +1,75 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
+import asyncio
 import logging
 from app.core.database_wrapper import safe_collection_user_collections
 from app.models.user_collections_model import user_collections_model
 from app.exceptions.global_exceptions import DatabaseConnectionError
+from app.core.data_version import bump_data_version, get_data_version, make_etag
 from pymongo.errors import PyMongoError
 
 logger = logging.getLogger(__name__)
 
+def _collections_version_key(user_id: str) -> str:
+    """
+    The collections document gets a data version of its own: counters
+    change in background tasks after every save, and bumping the user's
+    version there would invalidate the user's caches a second time.
+    """
+    return f"{user_id}:collections"
+
+async def _bump_collections_version(user_id: str) -> Optional[str]:
+    return await bump_data_version(_collections_version_key(user_id))
+
+async def collections_etag(user_id: str) -> Optional[str]:
+    """ETag for GET /collections: changes with the user's data and with the counters"""
+    versions = await asyncio.gather(get_data_version(user_id), get_data_version(_collections_version_key(user_id)))
+    if None in versions:
+        return None
+    return make_etag("collections", ".".join(versions))
+
 async def ensure_user_collection_exists(user_id: str) -> dict:
     """
     Ensure that a user document exists in the user_collections table.
     If it doesn't exist, create it with an empty collections array.
     """
     try:
-        logger.info(f"📚 COLLECTIONS: Ensuring user collection document exists for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Ensuring user collection document exists for user %s", user_id)
         
         # Check if user document already exists
         existing_doc = await safe_collection_user_collections.find_one({"userId": user_id})
         
         if existing_doc:
-            logger.info(f"📚 COLLECTIONS: User collection document already exists for user {user_id}")
+            logger.debug("📚 COLLECTIONS: User collection document already exists for user %s", user_id)
             return user_collections_model(existing_doc)
         
-        # Create new user collections document
+        # Create new user collections document; an upsert, so concurrent
+        # first writes for a user end up with one document
         new_user_collections = {
             "userId": user_id,
             "collections": []
         }
         
-        result = await safe_collection_user_collections.insert_one(new_user_collections)
+        result = await safe_collection_user_collections.update_one(
+            {"userId": user_id},
+            {"$setOnInsert": {"collections": []}},
+            upsert=True
+        )
         
-        if not result.inserted_id:
-            raise Exception("Failed to create user collections document")
+        if not result.upserted_id:
+            # Created concurrently since the lookup
+            return user_collections_model(await safe_collection_user_collections.find_one({"userId": user_id}))
         
-        logger.info(f"📚 COLLECTIONS: Created new user collection document for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Created new user collection document for user %s", user_id)
         return user_collections_model(new_user_collections)
         
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error ensuring user collection exists: {str(e)}")
+        logger.error("Database error ensuring user collection exists: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error ensuring user collection exists: {str(e)}", exc_info=True)
+        logger.error("Unexpected error ensuring user collection exists: %s", e, exc_info=True)
         raise Exception(f"Error ensuring user collection exists: {str(e)}")
 
 async def add_collection_to_user(user_id: str, collection_name: str) -> bool:
@@ -53,7 +79,7 @@ async def add_collection_to_user(user_id: str, collection_name: str) -> bool:
     This function only creates the collection - use increment_memory_count to add memories.
     """
     try:
-        logger.info(f"📚 COLLECTIONS: Adding collection '{collection_name}' to user {user_id}")
+        logger.debug("📚 COLLECTIONS: Adding collection '%s' to user %s", collection_name, user_id)
         
         # Ensure user document exists
         await ensure_user_collection_exists(user_id)
@@ -68,7 +94,7 @@ async def add_collection_to_user(user_id: str, collection_name: str) -> bool:
         })
         
         if existing_doc:
-            logger.info(f"📚 COLLECTIONS: Collection '{collection_name}' already exists for user {user_id}")
+            logger.debug("📚 COLLECTIONS: Collection '%s' already exists for user %s", collection_name, user_id)
             return False
         
         # Add collection as object with memory_count 0
@@ -79,22 +105,55 @@ async def add_collection_to_user(user_id: str, collection_name: str) -> bool:
         )
         
         if result.modified_count > 0:
-            logger.info(f"📚 COLLECTIONS: Successfully added collection '{collection_name}' to user {user_id}")
+            logger.debug("📚 COLLECTIONS: Successfully added collection '%s' to user %s", collection_name, user_id)
+            await _bump_collections_version(user_id)
             return True
         else:
-            logger.warning(f"📚 COLLECTIONS: No changes made when adding collection '{collection_name}' to user {user_id}")
+            logger.warning("📚 COLLECTIONS: No changes made when adding collection '%s' to user %s", collection_name, user_id)
             return False
             
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error adding collection to user: {str(e)}")
+        logger.error("Database error adding collection to user: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error adding collection to user: {str(e)}", exc_info=True)
+        logger.error("Unexpected error adding collection to user: %s", e, exc_info=True)
         raise Exception(f"Error adding collection to user: {str(e)}")
 
+async def _add_to_count(user_id: str, collection_name: str, count: int) -> bool:
+    """
+    Add `count` to a collection's memory count, creating the collection as
+    needed. Every step is a single-document update that holds whatever a
+    concurrent call did in between, so parallel calls never lose a count.
+    Returns True if the count was updated.
+    """
+    # Common case: the collection exists
+    result = await safe_collection_user_collections.update_one(
+        {"userId": user_id, "collections.name": collection_name},
+        {"$inc": {"collections.$.memory_count": count}}
+    )
+    if result.modified_count > 0:
+        return True
+
+    # Mongo rejects $pull and $push on one path in one update: drop the
+    # old string format first, then add the object unless another call
+    # already did, then count
+    await safe_collection_user_collections.update_one(
+        {"userId": user_id, "collections": collection_name},
+        {"$pull": {"collections": collection_name}}
+    )
+    await safe_collection_user_collections.update_one(
+        {"userId": user_id, "collections.name": {"$ne": collection_name}},
+        {"$push": {"collections": {"name": collection_name, "memory_count": 0}}}
+    )
+    result = await safe_collection_user_collections.update_one(
+        {"userId": user_id, "collections.name": collection_name},
+        {"$inc": {"collections.$.memory_count": count}}
+    )
+    return result.modified_count > 0
+
 async def increment_memory_count(user_id: str, collection_name: str) -> bool:
     """
     Increment the memory count for a specific collection.
@@ -102,62 +161,86 @@ async def increment_memory_count(user_id: str, collection_name: str) -> bool:
     Returns True if count was incremented successfully.
     """
     try:
-        logger.info(f"📚 COLLECTIONS: Incrementing memory count for collection '{collection_name}' for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Incrementing memory count for collection '%s' for user %s", collection_name, user_id)
         
         # Ensure user document exists
         await ensure_user_collection_exists(user_id)
         
-        # First, try to increment if collection exists in new format
-        result = await safe_collection_user_collections.update_one(
-            {"userId": user_id, "collections.name": collection_name},
-            {"$inc": {"collections.$.memory_count": 1}}
-        )
-        
-        if result.modified_count > 0:
-            logger.info(f"📚 COLLECTIONS: Successfully incremented memory count for collection '{collection_name}' for user {user_id}")
-            return True
-        
-        # Check if collection exists in old format (string) and convert it
-        existing_doc = await safe_collection_user_collections.find_one({
-            "userId": user_id,
-            "collections": collection_name
-        })
-        
-        if existing_doc:
-            # Remove old string format and add new object format with count 1
-            await safe_collection_user_collections.update_one(
-                {"userId": user_id},
-                {
-                    "$pull": {"collections": collection_name},
-                    "$addToSet": {"collections": {"name": collection_name, "memory_count": 1}}
-                }
-            )
-            logger.info(f"📚 COLLECTIONS: Converted and incremented collection '{collection_name}' from old format for user {user_id}")
-            return True
-        
-        # Collection doesn't exist, create it with count 1
-        collection_obj = {"name": collection_name, "memory_count": 1}
+        if not await _add_to_count(user_id, collection_name, 1):
+            # Raise rather than return False, so a background retry gets the count in
+            raise Exception(f"collection '{collection_name}' not found after creating it")
+
+        logger.debug("📚 COLLECTIONS: Successfully incremented memory count for collection '%s' for user %s", collection_name, user_id)
+        await _bump_collections_version(user_id)
+        return True
+            
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise
+    except PyMongoError as e:
+        logger.error("Database error incrementing memory count: %s", e)
+        raise Exception(f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error("Unexpected error incrementing memory count: %s", e, exc_info=True)
+        raise Exception(f"Error incrementing memory count: {str(e)}")
+
+async def add_memory_counts(user_id: str, counts: Dict[str, int]) -> None:
+    """
+    Add several memories per collection at once (bulk imports).
+    Collections are created as needed; one update per collection.
+    """
+    try:
+        await ensure_user_collection_exists(user_id)
+        changed = False
+        for collection_name, count in counts.items():
+            if count:
+                changed = await _add_to_count(user_id, collection_name, count) or changed
+        if changed:
+            await _bump_collections_version(user_id)
+
+    except DatabaseConnectionError as e:
+        logger.error("Database connection error: %s", e)
+        raise
+    except PyMongoError as e:
+        logger.error("Database error adding memory counts: %s", e)
+        raise Exception(f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error("Unexpected error adding memory counts: %s", e, exc_info=True)
+        raise Exception(f"Error adding memory counts: {str(e)}")
+
+async def decrement_memory_count(user_id: str, collection_name: str) -> bool:
+    """
+    Decrement the memory count for a specific collection, never below zero.
+    Returns True if count was decremented.
+    """
+    try:
+        logger.debug("📚 COLLECTIONS: Decrementing memory count for collection '%s' for user %s", collection_name, user_id)
+
         result = await safe_collection_user_collections.update_one(
-            {"userId": user_id},
-            {"$addToSet": {"collections": collection_obj}}
+            {
+                "userId": user_id,
+                "collections": {"$elemMatch": {"name": collection_name, "memory_count": {"$gt": 0}}}
+            },
+            {"$inc": {"collections.$.memory_count": -1}}
         )
-        
+
         if result.modified_count > 0:
-            logger.info(f"📚 COLLECTIONS: Created new collection '{collection_name}' with memory count 1 for user {user_id}")
+            logger.debug("📚 COLLECTIONS: Successfully decremented memory count for collection '%s' for user %s", collection_name, user_id)
+            await _bump_collections_version(user_id)
             return True
         else:
-            logger.warning(f"📚 COLLECTIONS: Failed to create or increment collection '{collection_name}' for user {user_id}")
+            logger.debug("📚 COLLECTIONS: No positive count for collection '%s' for user %s", collection_name, user_id)
             return False
-            
+
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error incrementing memory count: {str(e)}")
+        logger.error("Database error decrementing memory count: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error incrementing memory count: {str(e)}", exc_info=True)
-        raise Exception(f"Error incrementing memory count: {str(e)}")
+        logger.error("Unexpected error decrementing memory count: %s", e, exc_info=True)
+        raise Exception(f"Error decrementing memory count: {str(e)}")
 
 async def get_user_collections(user_id: str) -> List[dict]:
     """
@@ -165,7 +248,7 @@ async def get_user_collections(user_id: str) -> List[dict]:
     Returns list of objects with 'name' and 'memory_count' fields.
     """
     try:
-        logger.info(f"📚 COLLECTIONS: Retrieving collections for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Retrieving collections for user %s", user_id)
         
         # Ensure user document exists first
         await ensure_user_collection_exists(user_id)
@@ -174,25 +257,25 @@ async def get_user_collections(user_id: str) -> List[dict]:
         user_doc = await safe_collection_user_collections.find_one({"userId": user_id})
         
         if not user_doc:
-            logger.warning(f"📚 COLLECTIONS: No collections document found for user {user_id}")
+            logger.warning("📚 COLLECTIONS: No collections document found for user %s", user_id)
             return []
         
         # Use the model formatter to handle both old and new formats
         formatted_data = user_collections_model(user_doc)
         collections = formatted_data.get("collections", [])
         
-        logger.info(f"📚 COLLECTIONS: Retrieved {len(collections)} collections for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Retrieved %s collections for user %s", len(collections), user_id)
         
         return collections
         
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error retrieving user collections: {str(e)}")
+        logger.error("Database error retrieving user collections: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error retrieving user collections: {str(e)}", exc_info=True)
+        logger.error("Unexpected error retrieving user collections: %s", e, exc_info=True)
         raise Exception(f"Error retrieving user collections: {str(e)}")
 
 async def remove_collection_from_user(user_id: str, collection_name: str) -> bool:
@@ -201,7 +284,7 @@ async def remove_collection_from_user(user_id: str, collection_name: str) -> boo
     Returns True if collection was removed, False if it didn't exist.
     """
     try:
-        logger.info(f"📚 COLLECTIONS: Removing collection '{collection_name}' from user {user_id}")
+        logger.debug("📚 COLLECTIONS: Removing collection '%s' from user %s", collection_name, user_id)
         
         result = await safe_collection_user_collections.update_one(
             {"userId": user_id},
@@ -209,20 +292,21 @@ async def remove_collection_from_user(user_id: str, collection_name: str) -> boo
         )
         
         if result.modified_count > 0:
-            logger.info(f"📚 COLLECTIONS: Successfully removed collection '{collection_name}' from user {user_id}")
+            logger.debug("📚 COLLECTIONS: Successfully removed collection '%s' from user %s", collection_name, user_id)
+            await _bump_collections_version(user_id)
             return True
         else:
-            logger.info(f"📚 COLLECTIONS: Collection '{collection_name}' was not found for user {user_id}")
+            logger.debug("📚 COLLECTIONS: Collection '%s' was not found for user %s", collection_name, user_id)
             return False
             
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error removing collection from user: {str(e)}")
+        logger.error("Database error removing collection from user: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error removing collection from user: {str(e)}", exc_info=True)
+        logger.error("Unexpected error removing collection from user: %s", e, exc_info=True)
         raise Exception(f"Error removing collection from user: {str(e)}")
 
 async def check_collection_exists_for_user(user_id: str, collection_name: str) -> bool:
@@ -230,23 +314,23 @@ async def check_collection_exists_for_user(user_id: str, collection_name: str) -
     Check if a specific collection exists for a user.
     """
     try:
-        logger.debug(f"📚 COLLECTIONS: Checking if collection '{collection_name}' exists for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Checking if collection '%s' exists for user %s", collection_name, user_id)
         
         existing_doc = await safe_collection_user_collections.find_one(
             {"userId": user_id, "collections": collection_name}
         )
         
         exists = existing_doc is not None
-        logger.debug(f"📚 COLLECTIONS: Collection '{collection_name}' {'exists' if exists else 'does not exist'} for user {user_id}")
+        logger.debug("📚 COLLECTIONS: Collection '%s' %s for user %s", collection_name, 'exists' if exists else 'does not exist', user_id)
         
         return exists
         
     except DatabaseConnectionError as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise
     except PyMongoError as e:
-        logger.error(f"Database error checking collection existence: {str(e)}")
+        logger.error("Database error checking collection existence: %s", e)
         raise Exception(f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error checking collection existence: {str(e)}", exc_info=True)
+        logger.error("Unexpected error checking collection existence: %s", e, exc_info=True)
         raise Exception(f"Error checking collection existence: {str(e)}")
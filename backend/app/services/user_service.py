@@ -1,4 +1,4 @@
-from app.core.database import collection
+from app.core.database_wrapper import safe_collection
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,7 +8,7 @@ async def create_user_if_not_exists(data: dict):
     """
     Create a user if they do not exist in the database.
     """
-    logger.info(f"👤 USER SERVICE: Checking/creating user from JWT payload")
+    logger.debug("👤 USER SERVICE: Checking/creating user from JWT payload")
     
     # Extract data from the decoded JWT
     user_id = data.get("sub")
@@ -18,28 +18,28 @@ async def create_user_if_not_exists(data: dict):
     last_sign_in_at = data.get("updated_at")  # Last sign-in is "updated_at"
     issuer = data.get("iss")  # Top-level claim
 
-    logger.info(f"   ├─ User ID: {user_id}")
-    logger.info(f"   ├─ Email: {email}")
-    logger.info(f"   ├─ Role: {role}")
-    logger.info(f"   ├─ Issuer: {issuer}")
-    logger.info(f"   ├─ Created at: {created_at}")
-    logger.info(f"   └─ Last sign in: {last_sign_in_at}")
+    logger.debug("   ├─ User ID: %s", user_id)
+    logger.debug("   ├─ Email: %s", email)
+    logger.debug("   ├─ Role: %s", role)
+    logger.debug("   ├─ Issuer: %s", issuer)
+    logger.debug("   ├─ Created at: %s", created_at)
+    logger.debug("   └─ Last sign in: %s", last_sign_in_at)
 
     # User metadata (e.g., name, picture)
     user_metadata = data.get("user_metadata", {})
     full_name = user_metadata.get("full_name")
     picture = user_metadata.get("picture")
     
-    logger.info(f"   ├─ Full name: {full_name}")
-    logger.info(f"   └─ Picture present: {bool(picture)}")
+    logger.debug("   ├─ Full name: %s", full_name)
+    logger.debug("   └─ Picture present: %s", bool(picture))
 
     # App metadata (e.g., auth provider)
     app_metadata = data.get("app_metadata", {})
     provider = app_metadata.get("provider")
     providers = app_metadata.get("providers")
     
-    logger.info(f"   ├─ Provider: {provider}")
-    logger.info(f"   └─ Providers: {providers}")
+    logger.debug("   ├─ Provider: %s", provider)
+    logger.debug("   └─ Providers: %s", providers)
 
     # Combine into user_data
     user_data = {
@@ -55,49 +55,49 @@ async def create_user_if_not_exists(data: dict):
         "providers": providers
     }
 
-    logger.info(f"🔍 USER SERVICE: Checking if user exists in database")
+    logger.debug("🔍 USER SERVICE: Checking if user exists in database")
     if not await user_exists(user_id):
-        logger.info(f"➕ USER SERVICE: User not found, creating new user")
+        logger.debug("➕ USER SERVICE: User not found, creating new user")
         await create_user(user_data)
-        logger.info(f"✅ USER SERVICE: New user created successfully")
+        logger.debug("✅ USER SERVICE: New user created successfully")
     else:
-        logger.info(f"✅ USER SERVICE: User already exists, skipping creation")
+        logger.debug("✅ USER SERVICE: User already exists, skipping creation")
     
     return user_data
 
 
 async def user_exists(user_id: str):
-    logger.info(f"🔍 USER SERVICE: Checking if user exists")
-    logger.info(f"   └─ User ID: {user_id}")
+    logger.debug("🔍 USER SERVICE: Checking if user exists")
+    logger.debug("   └─ User ID: %s", user_id)
     
-    query = collection.find_one({"id": user_id})
+    query = await safe_collection.find_one({"id": user_id})
     exists = query is not None
     
-    logger.info(f"   └─ User exists: {exists}")
+    logger.debug("   └─ User exists: %s", exists)
     if exists:
-        logger.info(f"   └─ Found user data keys: {list(query.keys()) if query else 'None'}")
+        logger.debug("   └─ Found user data keys: %s", list(query.keys()) if query else 'None')
     
     return exists
 
 
 async def create_user(user_data: dict):
-    logger.info(f"➕ USER SERVICE: Creating new user in database")
-    logger.info(f"   ├─ User ID: {user_data.get('id')}")
-    logger.info(f"   ├─ Email: {user_data.get('email')}")
-    logger.info(f"   ├─ Full name: {user_data.get('full_name')}")
-    logger.info(f"   └─ Data keys: {list(user_data.keys())}")
+    logger.debug("➕ USER SERVICE: Creating new user in database")
+    logger.debug("   ├─ User ID: %s", user_data.get('id'))
+    logger.debug("   ├─ Email: %s", user_data.get('email'))
+    logger.debug("   ├─ Full name: %s", user_data.get('full_name'))
+    logger.debug("   └─ Data keys: %s", list(user_data.keys()))
     
     try:
-        result = collection.insert_one(user_data)
-        logger.info(f"✅ USER SERVICE: User created successfully")
-        logger.info(f"   ├─ Inserted ID: {result.inserted_id}")
-        logger.info(f"   └─ Acknowledged: {result.acknowledged}")
+        result = await safe_collection.insert_one(user_data)
+        logger.debug("✅ USER SERVICE: User created successfully")
+        logger.debug("   ├─ Inserted ID: %s", result.inserted_id)
+        logger.debug("   └─ Acknowledged: %s", result.acknowledged)
         return user_data
     except Exception as e:
-        logger.error(f"❌ USER SERVICE: Failed to create user in database")
-        logger.error(f"   ├─ Error type: {type(e).__name__}")
-        logger.error(f"   ├─ Error message: {str(e)}")
-        logger.error(f"   └─ This may cause issues with user data persistence")
+        logger.error("❌ USER SERVICE: Failed to create user in database")
+        logger.error("   ├─ Error type: %s", type(e).__name__)
+        logger.error("   ├─ Error message: %s", e)
+        logger.error("   └─ This may cause issues with user data persistence")
         raise
 
     
\ No newline at end of file
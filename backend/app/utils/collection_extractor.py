@@ -1,9 +1,69 @@
 import re
-from typing import Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# @tagname where tagname can contain letters, numbers, underscores, hyphens;
+# the trailing whitespace goes with it when the tag is removed
+_TAG_PATTERN = re.compile(r'@([a-zA-Z0-9_-]+)\s*')
+MAX_TAG_LENGTH = 50
+
+
+class TaggedText(NamedTuple):
+    tags: List[str]
+    text: Optional[str]
+
+
+def parse_tags(text: Optional[str]) -> TaggedText:
+    """
+    Split text into its @tags and the text without them, in one pass
+
+    Tags are lowercased and de-duplicated in order of appearance; tags
+    longer than MAX_TAG_LENGTH are dropped. When nothing but tags is left,
+    the original text is kept as the cleaned text.
+
+    Examples:
+        parse_tags("Read @books on @ML and @books") -> (["books", "ml"], "Read on and")
+        parse_tags("@music") -> (["music"], "@music")
+    """
+    if not text or not isinstance(text, str):
+        return TaggedText([], text)
+
+    tags: Dict[str, None] = {}
+
+    def take(match) -> str:
+        tag = match.group(1).lower()
+        if len(tag) <= MAX_TAG_LENGTH:
+            tags[tag] = None
+        return ''
+
+    cleaned = _TAG_PATTERN.sub(take, text).strip()
+    return TaggedText(list(tags), cleaned or text)
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """Tags given explicitly (API fields), in the form parse_tags produces; '@' is optional"""
+    normalized: Dict[str, None] = {}
+    for tag in tags or ():
+        tag = (tag or '').strip().lstrip('@').lower()
+        if tag and len(tag) <= MAX_TAG_LENGTH:
+            normalized[tag] = None
+    return list(normalized)
+
+
+def document_tags(text: Optional[str], collection: Optional[str] = None) -> List[str]:
+    """A document's tags: its collection (unless "general") first, then the @tags in its text"""
+    tags = parse_tags(text).tags
+    if collection and collection != "general":
+        tags = normalize_tags([collection, *tags])
+    return tags
+
+
+def tags_filter(tags: Optional[List[str]]) -> Optional[Dict]:
+    """Filter for documents with any of `tags`; the same clause works in Mongo and Pinecone"""
+    return {"tags": {"$in": tags}} if tags else None
+
 def extract_collection_from_text(text: Optional[str]) -> Optional[str]:
     """
     Extract collection name from text using the pattern @collectionname
@@ -12,34 +72,15 @@ def extract_collection_from_text(text: Optional[str]) -> Optional[str]:
         text: The text to search for collection pattern
         
     Returns:
-        The extracted collection name or None if no pattern found
+        The first tag in the text (the collection) or None if no pattern found
         
     Examples:
         extract_collection_from_text("This is about @books machine learning") -> "books"
         extract_collection_from_text("Regular text without pattern") -> None
         extract_collection_from_text("@music my favorite songs") -> "music"
     """
-    if not text or not isinstance(text, str):
-        return None
-    
-    # Pattern to match @collectionname where collectionname can contain letters, numbers, underscores, hyphens
-    pattern = r'@([a-zA-Z0-9_-]+)'
-    
-    try:
-        match = re.search(pattern, text.strip())
-        if match:
-            collection_name = match.group(1).lower().strip()
-            # Validate collection name (basic validation)
-            if len(collection_name) > 0 and len(collection_name) <= 50:
-                logger.info(f"Extracted collection: '{collection_name}' from text")
-                return collection_name
-            else:
-                logger.warning(f"Invalid collection name length: '{collection_name}'")
-                return None
-        return None
-    except Exception as e:
-        logger.error(f"Error extracting collection from text: {str(e)}")
-        return None
+    tags = parse_tags(text).tags
+    return tags[0] if tags else None
 
 def remove_collection_pattern_from_text(text: Optional[str]) -> Optional[str]:
     """
@@ -49,20 +90,9 @@ def remove_collection_pattern_from_text(text: Optional[str]) -> Optional[str]:
         text: The text to clean
         
     Returns:
-        Text with collection pattern removed
+        Text with every collection pattern removed
         
     Examples:
         remove_collection_pattern_from_text("This is about @books machine learning") -> "This is about machine learning"
     """
-    if not text or not isinstance(text, str):
-        return text
-    
-    # Pattern to match @collectionname 
-    pattern = r'@[a-zA-Z0-9_-]+\s*'
-    
-    try:
-        cleaned_text = re.sub(pattern, '', text).strip()
-        return cleaned_text if cleaned_text else text
-    except Exception as e:
-        logger.error(f"Error removing collection pattern from text: {str(e)}")
-        return text 
\ No newline at end of file
+    return parse_tags(text).text
@@ -15,23 +15,23 @@ async def decodeJWT(access_token: str) -> dict:
     """
     Decode Supabase JWT token using the proper JWT secret
     """
-    logger.info(f"🔑 JWT DECODE: Starting JWT token validation")
+    logger.debug("🔑 JWT DECODE: Starting JWT token validation")
     
     # Clean the token input
     original_token_length = len(access_token) if access_token else 0
     access_token = access_token.strip()
-    logger.info(f"   ├─ Original token length: {original_token_length}")
-    logger.info(f"   ├─ Cleaned token length: {len(access_token)}")
+    logger.debug("   ├─ Original token length: %s", original_token_length)
+    logger.debug("   ├─ Cleaned token length: %s", len(access_token))
     
     # Remove Bearer prefix if present
     if access_token.lower().startswith("bearer "):
         access_token = access_token[7:].strip()
-        logger.info(f"   ├─ Removed Bearer prefix, final length: {len(access_token)}")
+        logger.debug("   ├─ Removed Bearer prefix, final length: %s", len(access_token))
 
     # Use the proper JWT secret for Supabase tokens
     jwt_secret = settings.SUPABASE_JWT_SECRET.strip()
-    logger.info(f"   ├─ JWT secret configured: {bool(jwt_secret)}")
-    logger.info(f"   ├─ JWT secret length: {len(jwt_secret) if jwt_secret else 0}")
+    logger.debug("   ├─ JWT secret configured: %s", bool(jwt_secret))
+    logger.debug("   ├─ JWT secret length: %s", len(jwt_secret) if jwt_secret else 0)
     
     if not jwt_secret:
         logger.error("❌ JWT DECODE: Supabase JWT secret is missing in configuration")
@@ -42,12 +42,12 @@ async def decodeJWT(access_token: str) -> dict:
 
     expected_audience = "authenticated"
     expected_issuer = f"{settings.SUPABASE_URL}/auth/v1"
-    logger.info(f"   ├─ Expected audience: {expected_audience}")
-    logger.info(f"   ├─ Expected issuer: {expected_issuer}")
-    logger.info(f"   └─ Supabase URL: {settings.SUPABASE_URL}")
+    logger.debug("   ├─ Expected audience: %s", expected_audience)
+    logger.debug("   ├─ Expected issuer: %s", expected_issuer)
+    logger.debug("   └─ Supabase URL: %s", settings.SUPABASE_URL)
 
     try:
-        logger.info(f"🔍 JWT DECODE: Attempting to decode token with HS256 algorithm")
+        logger.debug("🔍 JWT DECODE: Attempting to decode token with HS256 algorithm")
         # Decode with Supabase-specific settings
         payload = jwt.decode(
             token=access_token,
@@ -64,14 +64,14 @@ async def decodeJWT(access_token: str) -> dict:
             issuer=expected_issuer
         )
 
-        logger.info(f"✅ JWT DECODE: Token decoded successfully")
-        logger.info(f"   ├─ Payload keys: {list(payload.keys())}")
-        logger.info(f"   ├─ Subject (user_id): {payload.get('sub', 'Missing')}")
-        logger.info(f"   ├─ Email: {payload.get('email', 'Missing')}")
-        logger.info(f"   ├─ Audience: {payload.get('aud', 'Missing')}")
-        logger.info(f"   ├─ Issuer: {payload.get('iss', 'Missing')}")
-        logger.info(f"   ├─ Issued at: {payload.get('iat', 'Missing')}")
-        logger.info(f"   └─ Expires at: {payload.get('exp', 'Missing')}")
+        logger.debug("✅ JWT DECODE: Token decoded successfully")
+        logger.debug("   ├─ Payload keys: %s", list(payload.keys()))
+        logger.debug("   ├─ Subject (user_id): %s", payload.get('sub', 'Missing'))
+        logger.debug("   ├─ Email: %s", payload.get('email', 'Missing'))
+        logger.debug("   ├─ Audience: %s", payload.get('aud', 'Missing'))
+        logger.debug("   ├─ Issuer: %s", payload.get('iss', 'Missing'))
+        logger.debug("   ├─ Issued at: %s", payload.get('iat', 'Missing'))
+        logger.debug("   └─ Expires at: %s", payload.get('exp', 'Missing'))
 
         # Validate required claims
         if 'sub' not in payload:
@@ -88,17 +88,17 @@ async def decodeJWT(access_token: str) -> dict:
                 detail="Token has no expiration"
             )
 
-        logger.info(f"✅ JWT DECODE: All required claims validated successfully")
+        logger.debug("✅ JWT DECODE: All required claims validated successfully")
         return payload
 
     except ExpiredSignatureError as e:
-        logger.warning(f"⏰ JWT DECODE: Token has expired: {str(e)}")
-        logger.warning(f"   └─ Raising TokenExpiredError for refresh handling")
+        logger.warning("⏰ JWT DECODE: Token has expired: %s", e)
+        logger.warning("   └─ Raising TokenExpiredError for refresh handling")
         raise TokenExpiredError("Token has expired")
     except JWTError as e:
-        logger.warning(f"❌ JWT DECODE: JWT decoding failed: {str(e)}")
-        logger.warning(f"   ├─ Error type: {type(e).__name__}")
-        logger.warning(f"   └─ This indicates token format or signature issues")
+        logger.warning("❌ JWT DECODE: JWT decoding failed: %s", e)
+        logger.warning("   ├─ Error type: %s", type(e).__name__)
+        logger.warning("   └─ This indicates token format or signature issues")
         # Enhanced error diagnostics
         debug_info = {
             "token_length": len(access_token),
@@ -107,15 +107,15 @@ async def decodeJWT(access_token: str) -> dict:
             "expected_audience": expected_audience,
             "expected_issuer": expected_issuer
         }
-        logger.debug(f"🔍 JWT DECODE: Debug info: {debug_info}")
+        logger.debug("🔍 JWT DECODE: Debug info: %s", debug_info)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"💥 JWT DECODE: Unexpected error during JWT decoding: {str(e)}")
-        logger.error(f"   ├─ Error type: {type(e).__name__}")
-        logger.error(f"   └─ This is likely a configuration or system error")
+        logger.error("💥 JWT DECODE: Unexpected error during JWT decoding: %s", e)
+        logger.error("   ├─ Error type: %s", type(e).__name__)
+        logger.error("   └─ This is likely a configuration or system error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Token validation error"
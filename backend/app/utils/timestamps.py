@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Annotated, Any, Dict, Optional
+
+from pydantic import BeforeValidator
+
+# Documents carry `date` (ISO 8601, for display) and `ts` (epoch seconds),
+# since Pinecone range filters only compare numbers
+
+
+def document_timestamps(when: Optional[datetime] = None) -> Dict[str, Any]:
+    """The `date` and `ts` fields stamped on a new document"""
+    when = when or datetime.now()
+    return {"date": when.isoformat(), "ts": int(when.timestamp())}
+
+
+def date_to_ts(date: Any) -> Optional[int]:
+    """`ts` for a stored `date`; None when it is missing or unreadable"""
+    if not isinstance(date, str):
+        return None
+    try:
+        return int(datetime.fromisoformat(date).timestamp())
+    except ValueError:
+        return None
+
+
+def to_epoch(value: Any, end_of_day: bool = False) -> int:
+    """
+    Epoch seconds from epoch seconds or an ISO 8601 date or datetime.
+    A bare date is its first second, or its last with `end_of_day`, so
+    from=2024-05-01&to=2024-05-31 covers all of May.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("expected epoch seconds or an ISO 8601 date")
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{value}' is not epoch seconds or an ISO 8601 date") from None
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, seconds=-1)
+    return int(parsed.timestamp())
+
+
+# Request fields for the lower and upper bound of a date range
+RangeStart = Annotated[int, BeforeValidator(to_epoch)]
+RangeEnd = Annotated[int, BeforeValidator(partial(to_epoch, end_of_day=True))]
+
+
+def ts_filter(date_from: Optional[int] = None, date_to: Optional[int] = None) -> Optional[Dict]:
+    """Filter on `ts` between the bounds, inclusive; the same clause works in Mongo and Pinecone"""
+    bounds = {}
+    if date_from is not None:
+        bounds["$gte"] = date_from
+    if date_to is not None:
+        bounds["$lte"] = date_to
+    return {"ts": bounds} if bounds else None
@@ -0,0 +1,19 @@
+"""
+Offline benchmarks for the backend hot paths.
+
+Settings are required at import time, so placeholder values are provided
+for anything not already set in the environment; no benchmark talks to
+the real services.
+"""
+import os
+
+for _name in (
+    "SUPABASE_URL", "SUPABASE_API_KEY", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY",
+    "SUPABASE_JWT_SECRET", "PINECONE_API_KEY", "PINECONE_INDEX", "GEMINI_API_KEY",
+):
+    os.environ.setdefault(_name, "benchmark")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("MONGODB_COLLECTION_USER", "users")
+os.environ.setdefault("MONGODB_COLLECTION_NOTES", "notes")
+os.environ.setdefault("MONGODB_COLLECTION_MEMORIES", "memories")
@@ -0,0 +1,115 @@
+"""
+Compression CPU cost against bytes saved for the app's typical payloads:
+the full library from /links/get, a search response with full metadata,
+a small /collections/ response, and an NDJSON stream flushed per chunk.
+
+The last column estimates end-to-end time (CPU + transfer) on a slow
+link, which is what decides whether a codec/level is worth it.
+
+Run from the backend directory:
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --items 2000 --bandwidth-mbps 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import orjson
+
+import benchmarks  # noqa: F401  (placeholder settings)
+from app.core.compression import _Compressor, available_encodings
+from app.core.config import settings
+from app.models.bookmarkModels import BOOKMARK_PROJECTION, bookmarkModels
+from benchmarks.bench_serialization import make_docs, project
+
+# Levels tried per codec; the configured default is always included
+LEVELS = {
+    "gzip": ("COMPRESSION_GZIP_LEVEL", (1, 6, 9)),
+    "br": ("COMPRESSION_BROTLI_QUALITY", (1, 4, 8)),
+    "zstd": ("COMPRESSION_ZSTD_LEVEL", (1, 3, 9)),
+}
+
+
+def payloads(items: int) -> List[Tuple[str, List[bytes], bool]]:
+    """(name, chunks, streamed) per payload"""
+    library = bookmarkModels(project(make_docs(items, "Bookmark"), BOOKMARK_PROJECTION))
+    search = [
+        {
+            "id": doc["doc_id"],
+            "page_content": f"Title: {doc['title']}\nNote: {doc['note']}\nSource: {doc['source_url']}",
+            "metadata": {**doc, "namespace": doc["user_id"]},
+        }
+        for doc in library[:10]
+    ]
+    collections = [{"name": "reading", "memory_count": 12}, {"name": "ai", "memory_count": 5}]
+    lines = [orjson.dumps(doc) + b"\n" for doc in library]
+    ndjson = [b"".join(lines[i:i + 100]) for i in range(0, len(lines), 100)]
+    return [
+        (f"GET /links/get ({items} items)", [orjson.dumps(library)], False),
+        ("POST /links/search (top 10)", [orjson.dumps(search)], False),
+        ("GET /collections/", [orjson.dumps(collections)], False),
+        (f"NDJSON stream ({len(ndjson)} chunks)", ndjson, True),
+    ]
+
+
+def run_codec(encoding: str, chunks: List[bytes], streamed: bool) -> int:
+    compressor = _Compressor(encoding)
+    size = 0
+    for chunk in chunks:
+        size += len(compressor.compress(chunk, flush=streamed))
+    return size + len(compressor.finish())
+
+
+def time_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bandwidth-mbps", type=float, default=2.0,
+                        help="link speed used for the end-to-end estimate")
+    args = parser.parse_args(argv)
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+
+    encodings = available_encodings()
+    print(f"encodings available: {', '.join(encodings)}; "
+          f"threshold {settings.COMPRESSION_MIN_SIZE} bytes; link {args.bandwidth_mbps} Mbps\n")
+    header = f"{'payload':<34} {'codec':<8} {'cpu ms':>8} {'bytes':>10} {'ratio':>7} {'saved/cpu ms':>13} {'e2e ms':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for name, chunks, streamed in payloads(args.items):
+        raw = sum(len(chunk) for chunk in chunks)
+        print(f"{name:<34} {'identity':<8} {0:>8.2f} {raw:>10} {1:>7.2f} {'':>13} {raw / bytes_per_ms:>9.1f}")
+        if not streamed and raw < settings.COMPRESSION_MIN_SIZE:
+            print(f"{'':<34} (below threshold, sent uncompressed)")
+            continue
+        for encoding in encodings:
+            setting, levels = LEVELS[encoding]
+            default = getattr(settings, setting)
+            for level in sorted(set(levels) | {default}):
+                setattr(settings, setting, level)
+                try:
+                    size = run_codec(encoding, chunks, streamed)
+                    cpu = time_ms(lambda: run_codec(encoding, chunks, streamed), args.repeat)
+                finally:
+                    setattr(settings, setting, default)
+                label = f"{encoding}-{level}" + ("*" if level == default else "")
+                saved_per_ms = (raw - size) / cpu if cpu else 0.0
+                e2e = cpu + size / bytes_per_ms
+                print(f"{'':<34} {label:<8} {cpu:>8.2f} {size:>10} {raw / size:>7.2f} {saved_per_ms:>13.0f} {e2e:>9.1f}")
+    print("\n* configured default")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
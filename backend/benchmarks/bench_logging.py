@@ -0,0 +1,112 @@
+"""
+Per-request logging cost: eager f-string INFO logging on a stream handler
+(the previous setup) versus the queue-based pipeline with lazy DEBUG args.
+
+Run from the backend directory:
+    python -m benchmarks.bench_logging
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+from app.core.logging_config import DeferredQueueHandler, DebugSamplingFilter, JsonFormatter, lazy
+
+REQUESTS = 2000
+
+# A search response roughly the size Pinecone returns for top_k=10
+RESULTS = {
+    "matches": [
+        {
+            "id": f"user-2025-01-01#00-00-{i:02d}",
+            "score": 0.8,
+            "metadata": {
+                "doc_id": f"user-2025-01-01#00-00-{i:02d}",
+                "title": "A reasonably long bookmark title " * 2,
+                "note": "Some note text @reading " * 8,
+                "source_url": "https://example.com/some/long/path",
+                "collection": "reading",
+            },
+        }
+        for i in range(10)
+    ]
+}
+FILTER = {"namespace": {"$eq": "user"}}
+
+
+def eager_request(logger: logging.Logger) -> None:
+    """The logging calls a search request used to make"""
+    logger.info(f"Incoming request: POST /links/search")
+    logger.info(f"🔍 AUTH CHECK: Request details:")
+    logger.info(f"   ├─ Authorization header: {'Bearer abc'[:50]}")
+    logger.info(f"Access token valid for user: user")
+    logger.info(f"📝 SEARCH: Original query received: 'some query'")
+    logger.info(f"🎯 SEARCH: Filter received: {FILTER}")
+    logger.info(f"📤 SEARCH: Query being embedded: 'some query'")
+    logger.info(f"🎯 SEARCH: Final filter being applied: {FILTER}")
+    logger.info(f"   ├─ Matches count: {len(RESULTS['matches'])}")
+    logger.info(f"   └─ Raw results: {RESULTS}")
+    for match in RESULTS["matches"]:
+        logger.info(f"user , Processing document ID: {match['id']} with metadata: {match['metadata']}")
+
+
+def lazy_request(logger: logging.Logger) -> None:
+    """The logging calls a search request makes now"""
+    logger.debug("Incoming request: %s %s", "POST", "/links/search")
+    logger.debug("Access token valid for user: %s", "user")
+    logger.debug("🎯 SEARCH: Final filter being applied: %s", FILTER)
+    logger.debug(
+        "📥 SEARCH: Pinecone returned %s matches (top_k=%s)",
+        lazy(lambda: len(RESULTS["matches"])),
+        10,
+    )
+    logger.debug("📥 SEARCH: %s results for user %s", 10, "user")
+
+
+def measure(fn, logger: logging.Logger) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        fn(logger)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main() -> None:
+    devnull = open(os.devnull, "w")
+
+    eager_logger = logging.getLogger("bench.eager")
+    eager_logger.propagate = False
+    stream = logging.StreamHandler(devnull)
+    stream.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    eager_logger.addHandler(stream)
+    eager_logger.setLevel(logging.INFO)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    json_stream = logging.StreamHandler(devnull)
+    json_stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, json_stream)
+    listener.start()
+
+    queued_logger = logging.getLogger("bench.queued")
+    queued_logger.propagate = False
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(0.1))
+    queued_logger.addHandler(queue_handler)
+
+    rows = []
+    queued_logger.setLevel(logging.INFO)
+    rows.append(("eager f-strings, INFO, stream handler", measure(eager_request, eager_logger)))
+    rows.append(("lazy args, INFO, queue handler", measure(lazy_request, queued_logger)))
+    queued_logger.setLevel(logging.DEBUG)
+    rows.append(("lazy args, DEBUG sampled 10%, queue handler", measure(lazy_request, queued_logger)))
+
+    listener.stop()
+    devnull.close()
+
+    print(f"{'configuration':<46} {'µs/request':>12}")
+    for name, cost in rows:
+        print(f"{name:<46} {cost:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Router benchmarks: full HTTP round trips through the ASGI app (auth
+middleware, rate limiter, routing, serialization) against the fakes.
+"""
+from typing import List
+
+import httpx
+from jose import jwt
+
+from benchmarks.bench_services import USER_ID, seed_library
+from benchmarks.fakes import FakeBackends
+from benchmarks.harness import BenchResult, run_benchmark
+
+
+def _token() -> str:
+    from app.core.config import settings
+    return jwt.encode(
+        {"sub": USER_ID, "aud": "authenticated"},
+        settings.SUPABASE_JWT_SECRET,
+        algorithm="HS256",
+    )
+
+
+async def run(backends: FakeBackends, iterations: int, concurrency: int, library_size: int) -> List[BenchResult]:
+    from app.core.database_wrapper import ensure_indexes
+    from app.core.rate_limiter import limiter
+    from app.main import app
+
+    # Limits would reject nearly every request in a tight benchmark loop
+    limiter.enabled = False
+
+    backends.reset()
+    # The lifespan does not run under ASGITransport; keyword search needs its text index
+    await ensure_indexes()
+    library = seed_library(backends, library_size)
+    deletable = seed_library(backends, iterations + 10, prefix="delete")
+    deletable_notes = seed_library(backends, iterations + 10, prefix="note-delete", doc_type="Note")
+    headers = {"Authorization": f"Bearer {_token()}"}
+    transport = httpx.ASGITransport(app=app)
+    results = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def expect(response: httpx.Response) -> None:
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.url} -> {response.status_code}")
+
+        async def save(i):
+            await expect(await client.post("/links/save", json={
+                "title": f"Saved page {i}", "note": "Worth re-reading @reading", "link": f"https://example.com/{i}",
+            }))
+
+        async def search(i):
+            await expect(await client.post("/links/search", json={"query": "consensus protocols @reading"}))
+
+        async def keyword_search(i):
+            await expect(await client.get("/links/search/keyword", params={"q": "consensus replication"}))
+
+        async def similar(i):
+            await expect(await client.get(f"/links/{library[0]}/similar"))
+
+        async def list_links(i):
+            await expect(await client.get("/links/get"))
+
+        async def delete_link(i):
+            await expect(await client.delete("/links/delete", params={"doc_id_pincone": deletable[i]}))
+
+        async def list_notes(i):
+            await expect(await client.get("/notes/"))
+
+        async def create(i):
+            await expect(await client.post("/notes/", json={"title": f"Note {i}", "note": "Remember this @ideas"}))
+
+        async def search_notes(i):
+            await expect(await client.post("/notes/search", params={"query": "consensus protocols"}))
+
+        async def delete_note(i):
+            await expect(await client.delete(f"/notes/{deletable_notes[i]}"))
+
+        async def collections(i):
+            await expect(await client.get("/collections/"))
+
+        async def facets(i):
+            await expect(await client.get("/stats/facets"))
+
+        async def quotes(i):
+            await expect(await client.get("/quotes/"))
+
+        for name, operation, warmup in (
+            ("router.POST /links/save", save, 5),
+            ("router.POST /links/search", search, 5),
+            ("router.GET /links/search/keyword", keyword_search, 5),
+            ("router.GET /links/{doc_id}/similar", similar, 5),
+            ("router.GET /links/get", list_links, 5),
+            ("router.DELETE /links/delete", delete_link, 0),
+            ("router.GET /notes/", list_notes, 5),
+            ("router.POST /notes/", create, 5),
+            ("router.POST /notes/search", search_notes, 5),
+            ("router.DELETE /notes/{note_id}", delete_note, 0),
+            ("router.GET /collections/", collections, 5),
+            ("router.GET /stats/facets", facets, 5),
+            ("router.GET /quotes/", quotes, 5),
+        ):
+            results.append(await run_benchmark(name, operation, iterations, concurrency, warmup=warmup))
+    return results
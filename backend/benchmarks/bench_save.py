@@ -0,0 +1,80 @@
+"""
+Save-path latency: the embed + upsert and the Mongo insert run one after
+the other (the old flow) versus concurrently (store_document), under the
+simulated dependency latencies, at the default Mongo round trip and at a
+slower one.
+
+Run from the backend directory:
+    python -m benchmarks.bench_save
+    python -m benchmarks.bench_save --iterations 300 --concurrency 8 --slow-mongo-ms 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import Latency, install_fakes  # noqa: E402
+from benchmarks.harness import format_table, run_benchmark  # noqa: E402
+
+USER_ID = "bench-user"
+
+
+async def measure(latency: Latency, label: str, iterations: int, concurrency: int):
+    backends = install_fakes(latency)
+    backends.reset()
+
+    from app.core.database_wrapper import safe_collection_memories
+    from app.core.embeddings import EMBEDDED_VERSIONS, store_document, upsert_document
+    from app.services.memories_service import save_memory_to_db
+
+    def metadata(i: int, variant: str) -> dict:
+        doc_id = f"{USER_ID}-{variant}-{i}"
+        return {
+            "doc_id": doc_id,
+            "user_id": USER_ID,
+            "namespace": USER_ID,
+            "title": f"Saved page {i}",
+            "note": "Worth re-reading @reading",
+            "source_url": f"https://example.com/{i}",
+            "site_name": "example.com",
+            "type": "Bookmark",
+            "collection": "reading",
+        }
+
+    async def sequential(i):
+        doc = metadata(i, "seq")
+        written = await upsert_document(doc["doc_id"], doc)
+        await save_memory_to_db({**doc, EMBEDDED_VERSIONS: list(written)})
+
+    async def concurrent(i):
+        doc = metadata(i, "conc")
+        await store_document(doc["doc_id"], doc, save_memory_to_db, safe_collection_memories)
+
+    return [
+        await run_benchmark(f"save sequential ({label})", sequential, iterations, concurrency),
+        await run_benchmark(f"save concurrent ({label})", concurrent, iterations, concurrency),
+    ]
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--slow-mongo-ms", type=float, default=40.0,
+                        help="Mongo round trip for the second run, e.g. a cross-region cluster")
+    args = parser.parse_args(argv)
+
+    defaults = Latency()
+    results = await measure(defaults, f"mongo {defaults.mongo * 1000:.0f}ms", args.iterations, args.concurrency)
+    results += await measure(
+        Latency(mongo=args.slow_mongo_ms / 1000), f"mongo {args.slow_mongo_ms:.0f}ms",
+        args.iterations, args.concurrency,
+    )
+    print(format_table(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
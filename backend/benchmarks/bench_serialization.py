@@ -0,0 +1,118 @@
+"""
+Response serialization cost for large list responses: the previous path
+(per-field .get model, jsonable_encoder, stdlib json) versus projection
+models rendered by FastJSONResponse, for 10k bookmarks and notes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --items 50000 --repeat 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import benchmarks  # noqa: F401  (placeholder settings)
+from app.core.responses import FastJSONResponse
+from app.models.bookmarkModels import BOOKMARK_PROJECTION, bookmarkModels
+from app.models.notesModel import NOTE_PROJECTION, note_models
+
+
+def legacy_bookmark_model(item):
+    """bookmarkModel as it was before projections"""
+    return {
+        'id': str(item.get('_id', '')) if item.get('_id') else None,
+        'doc_id': item.get('doc_id', None),
+        'user_id': item.get('user_id', None),
+        'title': item.get('title', None),
+        'type': item.get('type', None),
+        'note': item.get('note', None),
+        'source_url': item.get('source_url', None),
+        'site_name': item.get('site_name', None),
+        'date': item.get('date', None),
+        'collection': item.get('collection', None)
+    }
+
+
+def legacy_note_model(item):
+    """note_model as it was before projections"""
+    return {
+        'id': str(item.get('_id', '')) if item.get('_id') else None,
+        'doc_id': item.get('doc_id', None),
+        'user_id': item.get('user_id', None),
+        'type': item.get('type', None),
+        'title': item.get('title', None),
+        'note': item.get('note', None),
+        'date': item.get('date', None),
+        'collection': item.get('collection', None)
+    }
+
+
+def make_docs(count: int, doc_type: str) -> List[dict]:
+    docs = []
+    for i in range(count):
+        doc = {
+            "_id": ObjectId(),
+            "doc_id": f"bench-user-2025-01-01#00-00-{i:06d}",
+            "user_id": "bench-user",
+            "title": f"A reasonably long saved page title number {i}",
+            "type": doc_type,
+            "note": "Some note text about why this was saved @reading " * 4,
+            "date": "2025-01-01T00:00:00",
+            "collection": "reading" if i % 3 else None,
+        }
+        if doc_type == "Bookmark":
+            doc["source_url"] = f"https://example.com/articles/{i}/a-long-slug-for-the-article"
+            doc["site_name"] = "Example"
+        docs.append(doc)
+    return docs
+
+
+def project(docs: List[dict], projection: dict) -> List[dict]:
+    """What Mongo hands back for a projected find"""
+    return [{k: v for k, v in doc.items() if k == "_id" or k in projection} for doc in docs]
+
+
+def time_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("bookmarks", make_docs(args.items, "Bookmark"), legacy_bookmark_model, bookmarkModels, BOOKMARK_PROJECTION),
+        ("notes", make_docs(args.items, "Note"), legacy_note_model, note_models, NOTE_PROJECTION),
+    ]
+
+    print(f"{'response (' + str(args.items) + ' items)':<32} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8} {'bytes':>10}")
+    for name, docs, legacy_model, models, projection in cases:
+        projected = project(docs, projection)
+
+        def legacy():
+            return JSONResponse(jsonable_encoder([legacy_model(doc) for doc in docs])).body
+
+        def fast():
+            return FastJSONResponse(models(projected)).body
+
+        legacy_ms = time_ms(legacy, args.repeat)
+        fast_ms = time_ms(fast, args.repeat)
+        print(f"{name:<32} {legacy_ms:>10.1f} {fast_ms:>10.1f} {legacy_ms / fast_ms:>7.1f}x {len(fast()):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Service-layer benchmarks: each hot-path service function called directly
+against the in-memory fakes.
+"""
+from typing import List
+
+from bson import ObjectId
+
+from benchmarks.fakes import FakeBackends, fake_embedding
+from benchmarks.harness import BenchResult, run_benchmark
+
+USER_ID = "bench-user"
+
+
+def seed_library(
+    backends: FakeBackends,
+    size: int,
+    user_id: str = USER_ID,
+    prefix: str = "seed",
+    doc_type: str = "Bookmark",
+) -> List[str]:
+    """Insert `size` bookmarks (or notes) straight into the fakes, bypassing simulated latency"""
+    from app.core.config import settings
+    from app.utils.timestamps import document_timestamps
+
+    collection_name = (
+        settings.MONGODB_COLLECTION_NOTES if doc_type == "Note" else settings.MONGODB_COLLECTION_MEMORIES
+    )
+    target = backends.collections[collection_name]
+    doc_ids = []
+    for i in range(size):
+        doc_id = f"{user_id}-{prefix}-{i}"
+        collection = ("reading", "ai", "music", "general")[i % 4]
+        metadata = {
+            "doc_id": doc_id,
+            "user_id": user_id,
+            "namespace": user_id,
+            "title": f"Bookmark {i} about distributed systems",
+            "note": f"Notes on consensus and replication @{collection}",
+            "source_url": f"https://example.com/articles/{i}",
+            "site_name": "example.com",
+            "type": doc_type,
+            **document_timestamps(),
+            "collection": collection,
+            "tags": [collection],
+        }
+        backends.index.vectors[doc_id] = {
+            "id": doc_id,
+            "values": fake_embedding(metadata["title"]),
+            "metadata": dict(metadata),
+        }
+        target.docs.append({"_id": ObjectId(), **metadata})
+        doc_ids.append(doc_id)
+    return doc_ids
+
+
+async def run(backends: FakeBackends, iterations: int, concurrency: int, library_size: int) -> List[BenchResult]:
+    from app.core.config import settings
+    from app.schema.link_schema import Link
+    from app.schema.notesSchema import NoteSchema
+    from app.services.memories_service import get_all_bookmarks_from_db
+    from app.services.notes_service import create_note, get_all_notes_from_db
+    from app.services.pinecone_service import delete_bookmark, save_to_vector_db, search_vector_db
+    from app.services.suggest_service import suggest_index
+    from app.services.user_collections_service import increment_memory_count
+
+    backends.reset()
+    seed_library(backends, library_size)
+    deletable = seed_library(backends, iterations + 10, prefix="delete")
+    results = []
+
+    async def save(i):
+        link = Link(title=f"Saved page {i}", note="Worth re-reading @reading", link=f"https://example.com/{i}")
+        await save_to_vector_db(obj=link, namespace=USER_ID)
+
+    async def search(i):
+        await search_vector_db(query="consensus protocols @reading", namespace=USER_ID)
+
+    async def note(i):
+        await create_note(NoteSchema(title=f"Note {i}", note="Remember this @ideas"), USER_ID)
+
+    async def list_bookmarks(i):
+        await get_all_bookmarks_from_db(USER_ID)
+
+    async def list_notes(i):
+        await get_all_notes_from_db(USER_ID)
+
+    async def increment(i):
+        await increment_memory_count(USER_ID, "reading")
+
+    async def suggest(i):
+        await suggest_index.suggest(USER_ID, ("b", "bookmark 1", "distrib", "exam", "rea")[i % 5])
+
+    async def delete(i):
+        doc_id = deletable[i] if i >= 0 else deletable[-1 + i]
+        await delete_bookmark(doc_id=doc_id, namespace=USER_ID)
+
+    for name, operation in (
+        ("service.save_to_vector_db", save),
+        ("service.search_vector_db", search),
+        ("service.create_note", note),
+        ("service.get_all_bookmarks_from_db", list_bookmarks),
+        ("service.get_all_notes_from_db", list_notes),
+        ("service.increment_memory_count", increment),
+        ("service.suggest (warm index)", suggest),
+        ("service.delete (trash)", delete),
+    ):
+        results.append(await run_benchmark(name, operation, iterations, concurrency))
+
+    # Saves that pass the near-duplicate check: embed first, then one top-1 query
+    threshold = settings.SAVE_DUPLICATE_THRESHOLD
+    settings.SAVE_DUPLICATE_THRESHOLD = 0.99
+    try:
+        results.append(await run_benchmark("service.save (duplicate check)", save, iterations, concurrency))
+    finally:
+        settings.SAVE_DUPLICATE_THRESHOLD = threshold
+    return results
@@ -0,0 +1,119 @@
+"""
+Cold-start cost: how long `import app.main` takes in a fresh interpreter,
+which modules dominate it (from `python -X importtime`), and how long the
+lifespan prewarm takes against the simulated backends.
+
+Importing the app must not touch the network; run with real credentials
+unset and the import still completes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --top 25
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the benchmarks package first so placeholder settings are in place
+IMPORT_SNIPPET = "import benchmarks; import app.main"
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import(runs: int) -> Tuple[List[float], str]:
+    """Wall time of a fresh-interpreter import, plus the last importtime report"""
+    samples = []
+    report = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import app.main failed:\n{proc.stderr[-2000:]}")
+        report = proc.stderr
+    return samples, report
+
+
+def parse_importtime(report: str) -> List[Tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) rows from `-X importtime` output"""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            rows.append((int(fields[0]), int(fields[1]), fields[2].rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def top_level_packages(rows: List[Tuple[int, int, str]]) -> List[Tuple[str, int]]:
+    """Self time summed per top-level package"""
+    totals: Dict[str, int] = {}
+    for self_us, _, module in rows:
+        package = module.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+async def measure_prewarm(runs: int) -> List[float]:
+    """Lifespan startup time against the fakes at their default latencies"""
+    from benchmarks.fakes import Latency, install_fakes
+
+    install_fakes(Latency(jitter=0))
+    from app.main import app, lifespan
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        async with lifespan(app):
+            samples.append((time.perf_counter() - start) * 1000)
+        install_fakes(Latency(jitter=0))
+    return samples
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    samples, report = measure_import(args.runs)
+    rows = parse_importtime(report)
+    print(f"import app.main (fresh interpreter, {args.runs} runs): "
+          f"median {statistics.median(samples):.1f}ms, min {min(samples):.1f}ms, max {max(samples):.1f}ms")
+
+    print(f"\n{'module (cumulative)':<60} {'ms':>8}")
+    for _, cumulative_us, module in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{module.strip():<60} {cumulative_us / 1000:>8.1f}")
+
+    print(f"\n{'package (self time)':<60} {'ms':>8}")
+    for package, self_us in top_level_packages(rows)[:args.top]:
+        print(f"{package:<60} {self_us / 1000:>8.1f}")
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    prewarm = asyncio.run(measure_prewarm(args.runs))
+    print(f"\nlifespan prewarm against fakes: median {statistics.median(prewarm):.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
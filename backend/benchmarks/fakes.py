@@ -0,0 +1,667 @@
+"""
+In-memory stand-ins for Pinecone and MongoDB.
+
+The fakes implement just enough of the pinecone / pymongo surface used by
+the wrappers in app.core, and sleep for a configurable simulated latency
+on every remote call so benchmark numbers reflect the number and order of
+round trips a code path makes, not just its CPU cost.
+"""
+import copy
+import hashlib
+import random
+import re
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, WriteError
+
+EMBEDDING_DIMENSION = 1024
+
+
+@dataclass
+class Latency:
+    """Simulated round-trip latency per remote call, in seconds"""
+    embed: float = 0.080
+    query: float = 0.040
+    upsert: float = 0.050
+    delete: float = 0.030
+    stats: float = 0.030
+    mongo: float = 0.005
+    jitter: float = 0.25  # lognormal sigma; 0 disables jitter
+    seed: int = 1234
+    _rng: random.Random = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def sleep(self, base: float) -> None:
+        if base <= 0:
+            return
+        if self.jitter:
+            base *= self._rng.lognormvariate(0, self.jitter)
+        time.sleep(base)
+
+    @classmethod
+    def zero(cls) -> "Latency":
+        return cls(embed=0, query=0, upsert=0, delete=0, stats=0, mongo=0, jitter=0)
+
+
+# ---------------------------------------------------------------------------
+# Filter matching shared by the Mongo and Pinecone fakes
+# ---------------------------------------------------------------------------
+
+def _resolve(doc: Any, path: str) -> List[Any]:
+    """Return every value reachable by a dotted path, descending into arrays"""
+    values = [doc]
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict) and part in item:
+                        next_values.append(item[part])
+            elif isinstance(value, dict) and part in value:
+                next_values.append(value[part])
+        values = next_values
+    return values
+
+
+def _expand(values: List[Any]) -> List[Any]:
+    expanded = []
+    for value in values:
+        expanded.append(value)
+        if isinstance(value, list):
+            expanded.extend(value)
+    return expanded
+
+
+def _match_condition(values: List[Any], condition: Any) -> bool:
+    candidates = _expand(values)
+    if not isinstance(condition, dict) or not any(k.startswith("$") for k in condition):
+        return condition in candidates
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = operand in candidates
+        elif op == "$ne":
+            ok = operand not in candidates
+        elif op == "$in":
+            ok = any(c in operand for c in candidates)
+        elif op == "$nin":
+            ok = not any(c in operand for c in candidates)
+        elif op == "$all":
+            ok = all(item in candidates for item in operand)
+        elif op == "$elemMatch":
+            ok = any(isinstance(c, dict) and matches(c, operand) for c in candidates)
+        elif op == "$exists":
+            ok = bool(values) == bool(operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            compare = {
+                "$gt": lambda a: a > operand,
+                "$gte": lambda a: a >= operand,
+                "$lt": lambda a: a < operand,
+                "$lte": lambda a: a <= operand,
+            }[op]
+            ok = any(
+                c is not None and not isinstance(c, (list, dict)) and compare(c)
+                for c in candidates
+            )
+        else:
+            raise NotImplementedError(f"Fake filter operator {op} is not supported")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: Dict[str, Any], filter_dict: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Mongo/Pinecone style filter against a document"""
+    for key, condition in (filter_dict or {}).items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _match_condition(_resolve(doc, key), condition):
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Pinecone
+# ---------------------------------------------------------------------------
+
+def fake_embedding(text: str, dimension: int = EMBEDDING_DIMENSION) -> List[float]:
+    """Deterministic pseudo-embedding so identical inputs map to identical vectors"""
+    seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(dimension)]
+
+
+class FakeIndex:
+    """In-memory Pinecone index keyed by vector ID, one dict per namespace"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        # The default namespace; other namespaces live in `namespaces`
+        self.vectors: Dict[str, Dict[str, Any]] = {}
+        self.namespaces: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def _space(self, namespace: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        if not namespace:
+            return self.vectors
+        return self.namespaces.setdefault(namespace, {})
+
+    def upsert(self, vectors: List[Dict], namespace: Optional[str] = None, **kwargs):
+        self.latency.sleep(self.latency.upsert)
+        space = self._space(namespace)
+        for vector in vectors:
+            space[vector["id"]] = {
+                "id": vector["id"],
+                "values": list(vector["values"]),
+                "metadata": dict(vector.get("metadata") or {}),
+            }
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector: List[float] = None, namespace: Optional[str] = None,
+              top_k: int = 10, include_metadata: bool = True, filter: Dict = None,
+              include_values: bool = False, **kwargs):
+        self.latency.sleep(self.latency.query)
+        # Score on a prefix of the vector; the fake models round trips, not ranking quality
+        probe = (vector or [])[:16]
+        scored = []
+        for stored in self._space(namespace).values():
+            if not matches(stored["metadata"], filter):
+                continue
+            score = sum(a * b for a, b in zip(probe, stored["values"][:16])) / 16
+            scored.append((score, stored))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        result = []
+        for score, stored in scored[:top_k]:
+            match = {"id": stored["id"], "score": score}
+            if include_metadata:
+                match["metadata"] = dict(stored["metadata"])
+            if include_values:
+                match["values"] = list(stored["values"])
+            result.append(match)
+        return {"matches": result, "namespace": namespace or ""}
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        self.latency.sleep(self.latency.query)
+        space = self._space(namespace)
+        return {"vectors": {
+            i: {"id": i, "values": list(space[i]["values"]), "metadata": dict(space[i]["metadata"])}
+            for i in ids if i in space
+        }}
+
+    def update(self, id: str, values: List[float] = None, set_metadata: Dict = None,
+               namespace: Optional[str] = None, **kwargs):
+        self.latency.sleep(self.latency.upsert)
+        stored = self._space(namespace).get(id)
+        if stored is not None:
+            if values is not None:
+                stored["values"] = list(values)
+            stored["metadata"].update(set_metadata or {})
+        return {}
+
+    def delete(self, ids: List[str] = None, namespace: Optional[str] = None,
+               filter: Dict = None, delete_all: bool = False, **kwargs):
+        self.latency.sleep(self.latency.delete)
+        space = self._space(namespace)
+        if delete_all:
+            space.clear()
+        for vector_id in ids or []:
+            space.pop(vector_id, None)
+        if filter:
+            for vector_id in [k for k, v in space.items() if matches(v["metadata"], filter)]:
+                del space[vector_id]
+        return {}
+
+    def describe_index_stats(self, **kwargs):
+        self.latency.sleep(self.latency.stats)
+        namespaces = {"": self.vectors, **self.namespaces}
+        return {
+            "dimension": EMBEDDING_DIMENSION,
+            "total_vector_count": sum(len(space) for space in namespaces.values()),
+            "namespaces": {name: {"vector_count": len(space)} for name, space in namespaces.items()},
+        }
+
+
+class _FakeInference:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = 0
+
+    def embed(self, model: str, inputs: List[str], parameters: Dict = None, **kwargs):
+        self.latency.sleep(self.latency.embed)
+        self.calls += 1
+        return [{"values": fake_embedding(text)} for text in inputs]
+
+
+class FakePineconeClient:
+    """Stand-in for pinecone.Pinecone exposing only the inference API"""
+
+    def __init__(self, latency: Latency):
+        self.inference = _FakeInference(latency)
+
+
+# ---------------------------------------------------------------------------
+# MongoDB
+# ---------------------------------------------------------------------------
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Shallow copies: callers never mutate nested values, and deep copies would
+    # make the fake's own CPU cost dominate list benchmarks
+    if not projection:
+        return dict(doc)
+    include = {k for k, v in projection.items() if v and not isinstance(v, dict)}
+    exclude = {k for k, v in projection.items() if not v}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if "_id" not in exclude and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if k not in exclude}
+
+
+class FakeCursor:
+    """Minimal pymongo cursor: iteration plus sort/skip/limit chaining"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: int = 1):
+        keys = key_or_list if isinstance(key_or_list, list) else [(key_or_list, direction)]
+        for key, order in reversed(keys):
+            self._docs.sort(key=lambda d: (d.get(key) is None, d.get(key)), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def __iter__(self):
+        docs = self._docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return iter(docs)
+
+
+_WORD = re.compile(r"\w+")
+
+TEXT_SCORE = {"$meta": "textScore"}
+
+
+def _text_score(doc: Dict[str, Any], search: str, weights: Dict[str, int]) -> float:
+    """Weighted count of the document's words that occur in the search; no stemming or phrases"""
+    words = set(_WORD.findall(search.lower()))
+    return float(sum(
+        weight * sum(1 for word in _WORD.findall(str(doc.get(field) or "").lower()) if word in words)
+        for field, weight in weights.items()
+    ))
+
+
+def _evaluate(doc: Dict[str, Any], expression: Any) -> Any:
+    """The aggregation expressions the app uses: field paths, $ifNull, $substrBytes"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        values = _resolve(doc, expression[1:])
+        return values[0] if values else None
+    if isinstance(expression, dict) and len(expression) == 1:
+        op, args = next(iter(expression.items()))
+        if op == "$ifNull":
+            for arg in args:
+                value = _evaluate(doc, arg)
+                if value is not None:
+                    return value
+            return None
+        if op == "$substrBytes":
+            value, start, length = (_evaluate(doc, arg) for arg in args)
+            return (value if isinstance(value, str) else "")[start:start + length]
+        if op.startswith("$"):
+            raise NotImplementedError(f"Fake expression operator {op} is not supported")
+    return expression
+
+
+def _group(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for doc in docs:
+        key = _evaluate(doc, spec["_id"])
+        group = groups.setdefault(repr(key), {"_id": key})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, arg), = accumulator.items()
+            if op != "$sum":
+                raise NotImplementedError(f"Fake accumulator {op} is not supported")
+            group[field] = group.get(field, 0) + (_evaluate(doc, arg) or 0)
+    return list(groups.values())
+
+
+class FakeCollection:
+    """In-memory collection with the pymongo methods SafeCollection calls"""
+
+    def __init__(self, name: str, latency: Latency, database: Optional[Dict[str, "FakeCollection"]] = None):
+        self.name = name
+        self.latency = latency
+        self.docs: List[Dict[str, Any]] = []
+        self.indexes: List[Any] = []
+        # Sibling collections, for $unionWith
+        self.database = database if database is not None else {}
+        # Updates run on worker threads; each one is atomic, as in MongoDB
+        self._write_lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        self.latency.sleep(self.latency.mongo)
+
+    def insert_one(self, document: Dict[str, Any], **kwargs):
+        self._round_trip()
+        document.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(document))
+        return types.SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True, **kwargs):
+        self._round_trip()
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self.docs.append(copy.deepcopy(document))
+        return types.SimpleNamespace(inserted_ids=[d["_id"] for d in documents], acknowledged=True)
+
+    def find_one(self, filter_dict: Dict[str, Any] = None, projection=None, **kwargs):
+        self._round_trip()
+        for doc in self.docs:
+            if matches(doc, filter_dict):
+                return _project(doc, projection)
+        return None
+
+    def find(self, filter_dict: Dict[str, Any] = None, projection=None, sort=None, limit: int = 0, **kwargs):
+        self._round_trip()
+        if filter_dict and "$text" in filter_dict:
+            docs = self._text_search(filter_dict, projection)
+        else:
+            docs = [_project(d, projection) for d in self.docs if matches(d, filter_dict)]
+        cursor = FakeCursor(docs)
+        if sort:
+            # {"$meta": "textScore"} sorts by the projected score, best first
+            cursor.sort([(key, -1 if order == TEXT_SCORE else order) for key, order in sort])
+        return cursor.limit(limit) if limit else cursor
+
+    def _text_weights(self) -> Dict[str, int]:
+        for keys, options in self.indexes:
+            fields = [field for field, kind in keys if kind == "text"]
+            if fields:
+                weights = options.get("weights", {})
+                return {field: weights.get(field, 1) for field in fields}
+        raise OperationFailure("text index required for $text query", code=27)
+
+    def _text_search(self, filter_dict: Dict[str, Any], projection) -> List[Dict[str, Any]]:
+        weights = self._text_weights()
+        search = filter_dict["$text"]["$search"]
+        rest = {k: v for k, v in filter_dict.items() if k != "$text"}
+        meta = [k for k, v in (projection or {}).items() if v == TEXT_SCORE]
+        projection = {k: v for k, v in (projection or {}).items() if k not in meta}
+        docs = []
+        for doc in self.docs:
+            score = _text_score(doc, search, weights) if matches(doc, rest) else 0
+            if score:
+                docs.append({**_project(doc, projection), **dict.fromkeys(meta, score)})
+        return docs
+
+    def _pipeline(self, docs: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if matches(d, spec)]
+            elif op == "$project":
+                docs = [_project(d, spec) for d in docs]
+            elif op in ("$set", "$addFields"):
+                docs = [{**d, **{k: _evaluate(d, v) for k, v in spec.items()}} for d in docs]
+            elif op == "$unionWith":
+                other = self.database.get(spec["coll"])
+                docs = docs + (self._pipeline(list(other.docs), spec.get("pipeline", [])) if other else [])
+            elif op == "$unwind":
+                field = spec[1:]
+                docs = [{**d, field: value} for d in docs for value in (d.get(field) or [])]
+            elif op == "$group":
+                docs = _group(docs, spec)
+            elif op == "$sort":
+                FakeCursor(docs).sort(list(spec.items()))
+            elif op == "$limit":
+                docs = docs[:spec]
+            elif op == "$count":
+                docs = [{spec: len(docs)}] if docs else []
+            elif op == "$facet":
+                docs = [{name: self._pipeline(list(docs), sub) for name, sub in spec.items()}]
+            else:
+                raise NotImplementedError(f"Fake aggregation stage {op} is not supported")
+        return docs
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs):
+        self._round_trip()
+        return iter(self._pipeline(list(self.docs), pipeline))
+
+    def count_documents(self, filter_dict: Dict[str, Any] = None, **kwargs):
+        self._round_trip()
+        return sum(1 for d in self.docs if matches(d, filter_dict))
+
+    def update_one(self, filter_dict: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs):
+        self._round_trip()
+        with self._write_lock:
+            return self._update_one(filter_dict, update, upsert)
+
+    def _update_one(self, filter_dict: Dict[str, Any], update: Dict[str, Any], upsert: bool):
+        for doc in self.docs:
+            if matches(doc, filter_dict):
+                modified = _apply_update(doc, update, filter_dict)
+                return types.SimpleNamespace(matched_count=1, modified_count=int(modified), upserted_id=None)
+        if upsert:
+            doc = {k: v for k, v in filter_dict.items() if not k.startswith("$") and not isinstance(v, dict)}
+            doc.setdefault("_id", ObjectId())
+            _apply_update(doc, update, filter_dict, inserting=True)
+            self.docs.append(doc)
+            return types.SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return types.SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    def update_many(self, filter_dict: Dict[str, Any], update: Dict[str, Any], **kwargs):
+        self._round_trip()
+        with self._write_lock:
+            return self._update_many(filter_dict, update)
+
+    def _update_many(self, filter_dict: Dict[str, Any], update: Dict[str, Any]):
+        matched = modified = 0
+        for doc in self.docs:
+            if matches(doc, filter_dict):
+                matched += 1
+                modified += int(_apply_update(doc, update, filter_dict))
+        return types.SimpleNamespace(matched_count=matched, modified_count=modified, upserted_id=None)
+
+    def delete_one(self, filter_dict: Dict[str, Any], **kwargs):
+        self._round_trip()
+        for i, doc in enumerate(self.docs):
+            if matches(doc, filter_dict):
+                del self.docs[i]
+                return types.SimpleNamespace(deleted_count=1)
+        return types.SimpleNamespace(deleted_count=0)
+
+    def delete_many(self, filter_dict: Dict[str, Any], **kwargs):
+        self._round_trip()
+        kept = [doc for doc in self.docs if not matches(doc, filter_dict)]
+        deleted = len(self.docs) - len(kept)
+        self.docs[:] = kept
+        return types.SimpleNamespace(deleted_count=deleted)
+
+    def create_index(self, keys, **kwargs):
+        self._round_trip()
+        self.indexes.append((keys, kwargs))
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def _positional_index(array: List[Any], field_prefix: str, filter_dict: Dict[str, Any]) -> int:
+    conditions = {
+        key[len(field_prefix) + 1:]: value
+        for key, value in filter_dict.items()
+        if key.startswith(field_prefix + ".")
+    }
+    element_match = filter_dict.get(field_prefix)
+    if isinstance(element_match, dict) and "$elemMatch" in element_match:
+        conditions.update(element_match["$elemMatch"])
+    for i, item in enumerate(array):
+        if isinstance(item, dict) and matches(item, conditions):
+            return i
+    raise ValueError("The positional operator did not find the match needed from the query")
+
+
+def _check_conflicts(update: Dict[str, Any]) -> None:
+    """Mongo refuses an update touching one path (or a path and its parent) twice"""
+    paths = [path.split(".") for fields in update.values() for path in fields]
+    for i, path in enumerate(paths):
+        for other in paths[i + 1:]:
+            shorter = min(len(path), len(other))
+            if path[:shorter] == other[:shorter]:
+                conflict = ".".join(path[:shorter])
+                raise WriteError(
+                    f"Updating the path '{'.'.join(other)}' would create a conflict at '{conflict}'", code=40
+                )
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], filter_dict: Dict[str, Any], inserting: bool = False) -> bool:
+    _check_conflicts(update)
+    before = copy.deepcopy(doc)
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            parts = path.split(".")
+            if "$" in parts:
+                pos = parts.index("$")
+                prefix = ".".join(parts[:pos])
+                parts[pos] = str(_positional_index(_resolve(doc, prefix)[0], prefix, filter_dict))
+            target = doc
+            for part in parts[:-1]:
+                target = target[int(part)] if isinstance(target, list) else target.setdefault(part, {})
+            last = parts[-1]
+            if isinstance(target, list):
+                last = int(last)
+            if op in ("$set", "$setOnInsert"):
+                target[last] = value
+            elif op == "$unset":
+                if isinstance(target, dict):
+                    target.pop(last, None)
+            elif op == "$inc":
+                target[last] = (target[last] if isinstance(target, list) else target.get(last, 0)) + value
+            elif op == "$addToSet":
+                array = target.setdefault(last, [])
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                array.extend(item for item in items if item not in array)
+            elif op == "$push":
+                target.setdefault(last, []).append(value)
+            elif op == "$pull":
+                array = target.get(last, [])
+                if isinstance(value, dict):
+                    target[last] = [item for item in array if not (isinstance(item, dict) and matches(item, value))]
+                else:
+                    target[last] = [item for item in array if item != value]
+            else:
+                raise NotImplementedError(f"Fake update operator {op} is not supported")
+    return doc != before
+
+
+class _FakeAdmin:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def command(self, name: str, *args, **kwargs):
+        self.latency.sleep(self.latency.mongo)
+        return {"ok": 1.0}
+
+
+class FakeMongoClient:
+    """Stand-in for MongoClient: admin ping plus client[db][collection] lookups"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.admin = _FakeAdmin(latency)
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, db_name: str) -> "_FakeDatabase":
+        return _FakeDatabase(self)
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeDatabase:
+    def __init__(self, client: FakeMongoClient):
+        self._client = client
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        collections = self._client.collections
+        if name not in collections:
+            collections[name] = FakeCollection(name, self._client.latency, collections)
+        return collections[name]
+
+
+# ---------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FakeBackends:
+    latency: Latency
+    index: FakeIndex
+    pc: FakePineconeClient
+    mongo: FakeMongoClient
+    collections: Dict[str, FakeCollection]
+
+    def reset(self) -> None:
+        from app.services.suggest_service import suggest_index
+
+        self.index.vectors.clear()
+        self.index.namespaces.clear()
+        for collection in self.collections.values():
+            collection.docs.clear()
+        # Seeding writes straight to the fakes without bumping data versions
+        suggest_index.clear()
+
+
+def install_fakes(latency: Optional[Latency] = None) -> FakeBackends:
+    """
+    Point the app's Pinecone and Mongo clients at in-memory fakes.
+
+    The clients are created lazily, so this only has to run before the
+    first request; the shared client slots are filled with the fakes.
+    """
+    latency = latency or Latency()
+    index = FakeIndex(latency)
+    pc = FakePineconeClient(latency)
+
+    from app.core import database, database_wrapper, pineConeDB, pinecone_wrapper
+
+    pineConeDB._pc = pc
+    pineConeDB._index = index
+    pinecone_wrapper.safe_index._index = index
+    pinecone_wrapper.safe_pc._client = pc
+
+    mongo = FakeMongoClient(latency)
+    database._client = mongo
+    database._collections.clear()
+    for safe in _safe_collections(database_wrapper):
+        safe._collection = mongo["benchmark"][safe._name]
+
+    return FakeBackends(latency=latency, index=index, pc=pc, mongo=mongo, collections=mongo.collections)
+
+
+def _safe_collections(module) -> Iterable[Any]:
+    from app.core.database_wrapper import SafeCollection
+    return [value for value in vars(module).values() if isinstance(value, SafeCollection)]
@@ -0,0 +1,155 @@
+"""
+Timing harness: runs an async operation under a fixed concurrency,
+reports throughput and latency percentiles, and keeps a history of runs
+so regressions between commits are visible.
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "results", "history.jsonl")
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    concurrency: int
+    throughput: float  # operations per second
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    errors: int
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[rank]
+
+
+async def run_benchmark(
+    name: str,
+    operation: Callable[[int], Awaitable[object]],
+    iterations: int = 200,
+    concurrency: int = 1,
+    warmup: int = 5,
+) -> BenchResult:
+    """
+    Call `operation(i)` `iterations` times with at most `concurrency`
+    calls in flight. Exceptions are counted, not raised.
+    """
+    for i in range(warmup):
+        try:
+            await operation(-1 - i)
+        except Exception:
+            pass
+
+    samples: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < iterations:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                errors += 1
+            samples.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    samples.sort()
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        concurrency=concurrency,
+        throughput=iterations / wall if wall else 0.0,
+        mean_ms=statistics.fmean(samples) if samples else 0.0,
+        p50_ms=_percentile(samples, 50),
+        p95_ms=_percentile(samples, 95),
+        p99_ms=_percentile(samples, 99),
+        max_ms=samples[-1] if samples else 0.0,
+        errors=errors,
+    )
+
+
+def format_table(results: List[BenchResult]) -> str:
+    header = f"{'benchmark':<36} {'ops/s':>9} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err':>4}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<36} {r.throughput:>9.1f} {r.mean_ms:>8.2f} {r.p50_ms:>8.2f} "
+            f"{r.p95_ms:>8.2f} {r.p99_ms:>8.2f} {r.max_ms:>8.2f} {r.errors:>4}"
+        )
+    return "\n".join(lines)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_previous(history_path: str = DEFAULT_HISTORY) -> Dict[str, dict]:
+    """Latest recorded result per benchmark name"""
+    previous: Dict[str, dict] = {}
+    if not os.path.exists(history_path):
+        return previous
+    with open(history_path) as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                previous[entry["name"]] = entry
+    return previous
+
+
+def record(results: List[BenchResult], config: dict, history_path: str = DEFAULT_HISTORY) -> None:
+    """Append results to the JSONL history file"""
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    stamp = datetime.now(timezone.utc).isoformat()
+    revision = _git_revision()
+    with open(history_path, "a") as fh:
+        for result in results:
+            entry = {"recorded_at": stamp, "revision": revision, "config": config, **asdict(result)}
+            fh.write(json.dumps(entry) + "\n")
+
+
+def find_regressions(
+    results: List[BenchResult],
+    previous: Dict[str, dict],
+    tolerance: float = 0.15,
+) -> List[str]:
+    """Benchmarks whose p95 grew or throughput dropped by more than `tolerance`"""
+    regressions = []
+    for r in results:
+        before = previous.get(r.name)
+        if not before:
+            continue
+        if before["p95_ms"] and r.p95_ms > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r.name}: p95 {before['p95_ms']:.2f}ms -> {r.p95_ms:.2f}ms")
+        if before["throughput"] and r.throughput < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{r.name}: throughput {before['throughput']:.1f}/s -> {r.throughput:.1f}/s"
+            )
+    return regressions
@@ -0,0 +1,91 @@
+"""
+Run the offline benchmark suite against in-memory Pinecone and Mongo fakes.
+
+Run from the backend directory:
+    python -m benchmarks.run                      # services + routers
+    python -m benchmarks.run --suite services --iterations 500 --concurrency 8
+    python -m benchmarks.run --record --fail-on-regression
+
+Results are printed as a table; with --record they are appended to
+benchmarks/results/history.jsonl and compared with the previous run.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Keep benchmark output readable; logging cost is covered by bench_logging
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.fakes import Latency, install_fakes  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_HISTORY,
+    find_regressions,
+    format_table,
+    load_previous,
+    record,
+)
+
+
+def parse_args(argv=None):
+    defaults = Latency()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=("services", "routers", "all"), default="all")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--library-size", type=int, default=500,
+                        help="bookmarks seeded for the benchmark user")
+    parser.add_argument("--embed-ms", type=float, default=defaults.embed * 1000)
+    parser.add_argument("--query-ms", type=float, default=defaults.query * 1000)
+    parser.add_argument("--upsert-ms", type=float, default=defaults.upsert * 1000)
+    parser.add_argument("--delete-ms", type=float, default=defaults.delete * 1000)
+    parser.add_argument("--mongo-ms", type=float, default=defaults.mongo * 1000)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter,
+                        help="lognormal sigma applied to every simulated latency")
+    parser.add_argument("--record", action="store_true", help="append results to the history file")
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative p95/throughput change before flagging a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = parse_args(argv)
+    latency = Latency(
+        embed=args.embed_ms / 1000,
+        query=args.query_ms / 1000,
+        upsert=args.upsert_ms / 1000,
+        delete=args.delete_ms / 1000,
+        stats=args.query_ms / 1000,
+        mongo=args.mongo_ms / 1000,
+        jitter=args.jitter,
+    )
+    backends = install_fakes(latency)
+
+    from benchmarks import bench_routers, bench_services
+
+    results = []
+    if args.suite in ("services", "all"):
+        results += await bench_services.run(backends, args.iterations, args.concurrency, args.library_size)
+    if args.suite in ("routers", "all"):
+        results += await bench_routers.run(backends, args.iterations, args.concurrency, args.library_size)
+
+    print(format_table(results))
+
+    previous = load_previous(args.history)
+    regressions = find_regressions(results, previous, args.tolerance)
+    if regressions:
+        print("\nRegressions against the previous recorded run:")
+        for line in regressions:
+            print(f"  {line}")
+
+    if args.record:
+        config = {k: v for k, v in vars(args).items() if k not in ("record", "history", "fail_on_regression")}
+        record(results, config, args.history)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
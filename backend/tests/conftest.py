@@ -0,0 +1,15 @@
+"""
+Tests run against the in-memory fakes from benchmarks/, like the
+benchmarks themselves: run `python -m pytest` from the backend directory.
+"""
+import pytest
+
+from benchmarks.fakes import FakeBackends, Latency, install_fakes
+
+_backends = install_fakes(Latency.zero())
+
+
+@pytest.fixture
+def backends() -> FakeBackends:
+    _backends.reset()
+    return _backends
@@ -0,0 +1,13 @@
+import pytest
+
+from app.core.data_version import MemoryVersionStore, create_version_store
+
+
+def test_memory_store_serves_a_single_worker():
+    assert isinstance(create_version_store("memory://", workers=1), MemoryVersionStore)
+
+
+def test_memory_store_refuses_several_workers():
+    # Each worker would keep its own versions and answer 304 to ETags another one invalidated
+    with pytest.raises(ValueError, match="cannot serve 4 workers"):
+        create_version_store("memory://", workers=4)
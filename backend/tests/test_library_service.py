@@ -0,0 +1,47 @@
+import asyncio
+
+import orjson
+
+from app.core.embeddings import search_version
+from app.services.library_service import ARCHIVE_FORMAT, ARCHIVE_VERSION, _rekey, encode_vector, import_library
+
+
+def test_rekey_moves_source_ids_onto_the_importer():
+    assert _rekey("old-2024-01-01#10-00-00", "old", "new") == "new-2024-01-01#10-00-00"
+    assert _rekey("new-2024-01-01#10-00-00", "new", "new") == "new-2024-01-01#10-00-00"
+    assert _rekey("new-2024-01-01#10-00-00", None, "new") == "new-2024-01-01#10-00-00"
+
+
+def test_rekey_never_keeps_another_users_id():
+    # A crafted archive naming the victim's documents, with no or a forged source user
+    assert _rekey("victim-2024", None, "attacker") == "attacker-victim-2024"
+    assert _rekey("victim-2024", "attacker", "attacker") == "attacker-victim-2024"
+    assert _rekey("victim-2024", "someone", "attacker") == "attacker-victim-2024"
+
+
+def _archive(records):
+    async def lines():
+        for record in records:
+            yield orjson.dumps(record)
+    return lines()
+
+
+def test_import_cannot_overwrite_another_users_vector(backends):
+    victim_vector = [0.5] * 1024
+    backends.index.upsert([{"id": "victim-1", "values": victim_vector, "metadata": {"namespace": "victim"}}])
+
+    async def run():
+        version = await search_version()
+        header = {
+            "type": "header", "format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION,
+            "model": version.model, "dimension": version.dimension,
+        }
+        doc = {"doc_id": "victim-1", "title": "Mine now", "note": "", "user_id": "attacker"}
+        return await import_library("attacker", _archive([
+            header, {"type": "bookmark", "doc": doc, "vector": encode_vector([0.25] * 1024)},
+        ]))
+
+    assert asyncio.run(run())["bookmarks"] == 1
+    assert backends.index.vectors["victim-1"]["values"] == victim_vector
+    assert backends.index.vectors["victim-1"]["metadata"]["namespace"] == "victim"
+    assert backends.index.vectors["attacker-victim-1"]["metadata"]["namespace"] == "attacker"
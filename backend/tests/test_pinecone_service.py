@@ -0,0 +1,39 @@
+import asyncio
+
+from app.core.background import background_tasks
+from app.core.database_wrapper import safe_collection_memories
+from app.services.pinecone_service import resolve_duplicate
+
+
+def _merge(backends, stored, tags):
+    backends.index.upsert([{"id": "u-1", "values": [0.5] * 1024, "metadata": dict(stored)}])
+
+    async def run():
+        await safe_collection_memories.insert_one(dict(stored))
+        match = {"id": "u-1", "score": 0.99, "metadata": dict(stored)}
+        result = await resolve_duplicate(match, tags, "u", "merge")
+        await background_tasks.drain(timeout=5)
+        return result
+
+    result = asyncio.run(run())
+    counters = backends.collections["user_collections"].docs
+    return result, counters[0]["collections"] if counters else []
+
+
+def test_merge_into_untagged_bookmark_moves_it_and_counts_it(backends):
+    stored = {"doc_id": "u-1", "user_id": "u", "namespace": "u", "title": "Raft", "collection": "general", "tags": []}
+    result, collections = _merge(backends, stored, ["reading", "papers"])
+
+    assert result["memory"]["collection"] == "reading"
+    assert backends.collections["memories"].docs[0]["collection"] == "reading"
+    assert backends.index.vectors["u-1"]["metadata"]["collection"] == "reading"
+    assert collections == [{"name": "reading", "memory_count": 1}]
+
+
+def test_merge_into_tagged_bookmark_keeps_its_collection(backends):
+    stored = {"doc_id": "u-1", "user_id": "u", "namespace": "u", "title": "Raft", "collection": "papers", "tags": ["papers"]}
+    result, collections = _merge(backends, stored, ["reading"])
+
+    assert result["memory"]["tags"] == ["papers", "reading"]
+    assert result["memory"]["collection"] == "papers"
+    assert collections == []
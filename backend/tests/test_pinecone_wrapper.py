@@ -0,0 +1,20 @@
+from app.core.pinecone_wrapper import PineconeWrapper
+
+
+def test_one_probe_per_recheck_window(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.core.pinecone_wrapper.time.monotonic", lambda: clock[0])
+    monkeypatch.setattr("app.core.pinecone_wrapper.settings.PINECONE_RECHECK_SECONDS", 30.0)
+    wrapper = PineconeWrapper()
+    wrapper.mark_unhealthy()
+
+    assert [wrapper.allow_request() for _ in range(3)] == [False] * 3
+
+    # The window has passed: only the first caller probes Pinecone
+    clock[0] = 131.0
+    assert [wrapper.allow_request() for _ in range(3)] == [True, False, False]
+
+    # The probe failed; the next window again allows one
+    wrapper.mark_unhealthy()
+    clock[0] = 162.0
+    assert [wrapper.allow_request() for _ in range(2)] == [True, False]
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.core.database import DELETED_AT
+from app.core.database_wrapper import safe_collection_memories
+from app.core.embeddings import EMBEDDED_VERSIONS, get_version
+from app.jobs import reindex
+from app.jobs.reindex import RateBudget, reindex_batch
+
+
+def test_document_trashed_during_its_batch_is_not_marked(backends, monkeypatch):
+    embed_texts = reindex.embed_texts
+
+    async def embed_and_trash(version, texts, input_type):
+        # The user moves the bookmark to the trash while the batch embeds
+        await safe_collection_memories.update_one({"doc_id": "u-1"}, {"$set": {DELETED_AT: 1700000000}})
+        return await embed_texts(version, texts, input_type)
+
+    monkeypatch.setattr(reindex, "embed_texts", embed_and_trash)
+
+    async def run():
+        await safe_collection_memories.insert_one({"doc_id": "u-1", "user_id": "u", "title": "Title", "note": "", "updated_at": 1})
+        docs = await safe_collection_memories.find({})
+        counts = await reindex_batch(safe_collection_memories, get_version("v1"), docs, RateBudget(10_000))
+        return counts, await safe_collection_memories.find_one({"doc_id": "u-1"})
+
+    counts, doc = asyncio.run(run())
+    assert counts == {"processed": 0, "deleted": 0, "retried": 1}
+    assert EMBEDDED_VERSIONS not in doc
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.core.data_version import get_data_version
+from app.core.database_wrapper import safe_collection_user_collections
+from app.exceptions.global_exceptions import DatabaseConnectionError
+from app.services.user_collections_service import add_memory_counts, collections_etag, increment_memory_count
+
+
+def _collections(backends):
+    return backends.collections["user_collections"].docs[0]["collections"]
+
+
+def test_fake_rejects_conflicting_update_operators(backends):
+    async def run():
+        await safe_collection_user_collections.insert_one({"userId": "u", "collections": ["a"]})
+        await safe_collection_user_collections.update_one(
+            {"userId": "u"}, {"$pull": {"collections": "a"}, "$addToSet": {"collections": {"name": "a"}}}
+        )
+
+    # As MongoDB does: ConflictingUpdateOperators, surfaced by SafeCollection
+    with pytest.raises(DatabaseConnectionError) as excinfo:
+        asyncio.run(run())
+    assert "would create a conflict at 'collections'" in excinfo.value.details["error"]
+
+
+def test_add_memory_counts_creates_converts_and_increments(backends):
+    async def run():
+        await safe_collection_user_collections.insert_one(
+            {"userId": "u", "collections": ["legacy", {"name": "kept", "memory_count": 2}]}
+        )
+        await add_memory_counts("u", {"new": 3, "legacy": 4, "kept": 5})
+
+    asyncio.run(run())
+    assert sorted(_collections(backends), key=lambda c: c["name"]) == [
+        {"name": "kept", "memory_count": 7},
+        {"name": "legacy", "memory_count": 4},
+        {"name": "new", "memory_count": 3},
+    ]
+
+
+def test_increment_memory_count_converts_legacy_string(backends):
+    async def run():
+        await safe_collection_user_collections.insert_one({"userId": "u", "collections": ["legacy"]})
+        return await increment_memory_count("u", "legacy")
+
+    assert asyncio.run(run()) is True
+    assert _collections(backends) == [{"name": "legacy", "memory_count": 1}]
+
+
+def test_concurrent_increments_are_not_lost(backends, monkeypatch):
+    # A round trip long enough for the increments to interleave
+    monkeypatch.setattr(backends.collections["user_collections"].latency, "mongo", 0.002)
+
+    async def run():
+        return await asyncio.gather(*(increment_memory_count("u", "reading") for _ in range(4)))
+
+    assert asyncio.run(run()) == [True] * 4
+    assert len(backends.collections["user_collections"].docs) == 1
+    assert _collections(backends) == [{"name": "reading", "memory_count": 4}]
+
+
+def test_counter_updates_keep_the_user_data_version(backends):
+    async def run():
+        user_version = await get_data_version("u")
+        etag = await collections_etag("u")
+        await increment_memory_count("u", "reading")
+        return user_version == await get_data_version("u"), etag != await collections_etag("u")
+
+    assert asyncio.run(run()) == (True, True)